@@ -0,0 +1,65 @@
+"""
+    benchmarks.bench_clean_object
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compares clean_object with the regex per key implementation it replaced.
+    Run with ``python -m benchmarks.bench_clean_object``.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import re
+import timeit
+
+from footballdata.datasets import Fixture
+from footballdata.utils import clean_object
+
+
+def legacy_camel_to_snake(name):
+    """camel_to_snake compiling both patterns on every call"""
+
+    underscore_name = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
+    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', underscore_name).lower()
+
+
+def legacy_clean_object(data):
+    """clean_object converting every key with regular expressions"""
+
+    data_dict = {}
+    for key in data.keys():
+        new_key = key
+        if key.startswith('_'):
+            new_key = key.replace('_', '', 1)
+
+        data_dict[legacy_camel_to_snake(new_key)] = data[key]
+
+    return data_dict
+
+
+FIXTURE = {
+    '_links': {'self': {'href': 'http://api.football-data.org/v1/fixtures/159031'}},
+    'date': '2017-08-11T18:45:00Z',
+    'status': 'FINISHED',
+    'matchday': 1,
+    'homeTeamName': 'Arsenal FC',
+    'awayTeamName': 'Leicester City FC',
+    'result': {'goalsHomeTeam': 4, 'goalsAwayTeam': 3},
+    'odds': None,
+}
+
+
+def main(number=100000):
+    """Prints time taken to clean number of fixtures with both implementations"""
+
+    assert legacy_clean_object(FIXTURE) == clean_object(FIXTURE, Fixture.key_map)
+
+    legacy = timeit.timeit(lambda: legacy_clean_object(FIXTURE), number=number)
+    current = timeit.timeit(lambda: clean_object(FIXTURE, Fixture.key_map), number=number)
+    print("legacy clean_object:  {:.3f}s for {} fixtures".format(legacy, number))
+    print("clean_object:         {:.3f}s for {} fixtures".format(current, number))
+    print("speed up:             {:.1f}x".format(legacy / current))
+
+
+if __name__ == '__main__':
+    main()
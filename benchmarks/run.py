@@ -0,0 +1,168 @@
+"""
+    benchmarks.run
+    ~~~~~~~~~~~~~~
+
+    Measures throughput, per stage cost, peak memory and import time of the
+    library against a local stub server, and writes the results as JSON.
+    Run with ``python -m benchmarks.run --output results.json``.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from footballdata import Connector
+from footballdata.datasets import Fixture
+from footballdata.utils import clean_object, parse_datetime
+
+from .stub_server import StubServer
+
+
+# Number of competitions, teams per competition and players per team of each scale
+SCALES = {
+    'small': {'competitions': 1, 'teams': 6, 'players': 5},
+    'medium': {'competitions': 2, 'teams': 20, 'players': 25},
+    'large': {'competitions': 16, 'teams': 40, 'players': 30},
+}
+
+
+def best_of(function, repeat):
+    """Returns the shortest time of calling function repeat times, and its last result"""
+
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def crawl(base_url):
+    """Fetches every resource of the stub server and reads every object
+
+    :param base_url: str, base url of stub server
+    :return: number of records read
+    """
+
+    with Connector(scheduler=False) as connector:
+        connector.competition_endpoint = base_url + 'competitions/'
+        connector.fixtures_endpoint = base_url + 'fixtures/'
+
+        records = 0
+        for competition in connector.get_competitions():
+            records += 1
+            for fixture in competition.get_fixtures():
+                records += fixture.date is not None
+            records += len(list(competition.get_league_table()))
+            for team in competition.get_teams():
+                records += 1
+                records += sum(player.date_of_birth is not None for player in team.get_players())
+        records += sum(fixture.date is not None for fixture in connector.get_fixtures())
+    return records
+
+
+def measure_end_to_end(server, repeat):
+    """Measures throughput and peak memory of a full crawl"""
+
+    seconds, records = best_of(lambda: crawl(server.base_url), repeat)
+    requests = 2 + server.competitions * (3 + server.teams)
+
+    tracemalloc.start()
+    crawl(server.base_url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'seconds': seconds,
+        'records': records,
+        'requests': requests,
+        'records_per_second': records / seconds,
+        'requests_per_second': requests / seconds,
+        'peak_memory_bytes': peak,
+    }
+
+
+def measure_stages(server, repeat):
+    """Measures cost of each stage of loading all fixtures"""
+
+    url = server.base_url + 'fixtures/'
+    with Connector(scheduler=False) as connector:
+        http, body = best_of(lambda: connector.session.get(url).content, repeat)
+
+    json_decode, data = best_of(lambda: json.loads(body), repeat)
+    records = data['fixtures']
+    cleaning, cleaned = best_of(lambda: [clean_object(record, Fixture.key_map) for record in records], repeat)
+    construction, _ = best_of(lambda: [Fixture(**record) for record in cleaned], repeat)
+    date_parsing, _ = best_of(lambda: [parse_datetime(record['date']) for record in records], repeat)
+
+    stages = {
+        'http': http,
+        'json_decode': json_decode,
+        'clean_object': cleaning,
+        'model_construction': construction,
+        'date_parsing': date_parsing,
+    }
+    return {
+        'records': len(records),
+        'bytes': len(body),
+        'seconds': stages,
+        'microseconds_per_record': {stage: seconds * 1e6 / len(records) for stage, seconds in stages.items()},
+    }
+
+
+def measure_import_time(repeat):
+    """Measures time taken to import the package in a new interpreter"""
+
+    code = 'import time; start = time.perf_counter(); import footballdata; print(time.perf_counter() - start)'
+    times = [float(subprocess.check_output([sys.executable, '-c', code])) for _ in range(repeat)]
+    return {'seconds': statistics.median(times)}
+
+
+def main(argv=None):
+    """Runs benchmarks and writes results to a JSON file"""
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default='bench_results.json', help='path of JSON results file')
+    parser.add_argument('--scales', default='small,medium,large',
+                        help='comma separated scales, from {}'.format(', '.join(SCALES)))
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs, the best one is reported')
+    args = parser.parse_args(argv)
+
+    results = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'import': measure_import_time(args.repeat),
+        'scales': {},
+    }
+
+    for name in args.scales.split(','):
+        with StubServer(**SCALES[name]) as server:
+            results['scales'][name] = {
+                'parameters': SCALES[name],
+                'end_to_end': measure_end_to_end(server, args.repeat),
+                'stages': measure_stages(server, args.repeat),
+            }
+
+        end_to_end = results['scales'][name]['end_to_end']
+        stages = results['scales'][name]['stages']
+        print("{:<8} {:>7} records {:>9.0f} records/s {:>7.1f} MB peak".format(
+            name, end_to_end['records'], end_to_end['records_per_second'], end_to_end['peak_memory_bytes'] / 2 ** 20))
+        print("         " + "  ".join("{} {:.2f}us".format(stage, cost)
+                                      for stage, cost in stages['microseconds_per_record'].items()))
+    print("import   {:.1f}ms".format(results['import']['seconds'] * 1000))
+
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(results, output_file, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
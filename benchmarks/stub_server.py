@@ -0,0 +1,248 @@
+"""
+    benchmarks.stub_server
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Local HTTP server serving synthetic football-data.org payloads of a given
+    scale, used by the benchmarks instead of the live API.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+POSITIONS = ['Keeper', 'Centre-Back', 'Left-Back', 'Right-Back', 'Central Midfield', 'Centre-Forward']
+NATIONALITIES = ['England', 'Spain', 'France', 'Germany', 'Brazil', 'Argentina']
+
+
+class Payloads:
+    """Synthetic API payloads of a number of competitions, each a double round robin league
+
+    The number of fixtures of a competition is teams * (teams - 1), so 20
+    teams give 380 fixtures, like a real league.
+    """
+
+    def __init__(self, base_url, competitions=1, teams=20, players=25):
+        """Builds payloads
+
+        :param base_url: str, base url of server, ending with /v1/
+        :param competitions: int, number of competitions
+        :param teams: int, number of teams in each competition
+        :param players: int, number of players in each team
+        """
+
+        self.base_url = base_url
+        self.routes = {}
+        all_fixtures = []
+        competition_list = []
+
+        for competition_index in range(competitions):
+            competition_id = 400 + competition_index
+            team_ids = [competition_index * teams + number + 1 for number in range(teams)]
+            fixtures = self.__fixtures(competition_id, team_ids)
+            prefix = 'competitions/{}/'.format(competition_id)
+
+            competition_list.append(self.__competition(competition_id, teams, len(fixtures)))
+            self.routes[prefix + 'teams'] = {'count': teams, 'teams': [self.__team(team_id) for team_id in team_ids]}
+            self.routes[prefix + 'fixtures'] = {'count': len(fixtures), 'fixtures': fixtures}
+            self.routes[prefix + 'leagueTable'] = {
+                'leagueCaption': 'League {}'.format(competition_id),
+                'matchday': 2 * (teams - 1),
+                'standing': [self.__standing(position, team_id) for position, team_id in enumerate(team_ids, 1)],
+            }
+            for team_id in team_ids:
+                team_fixtures = [fixture for fixture in fixtures
+                                 if team_id in (fixture['_team_ids'][0], fixture['_team_ids'][1])]
+                self.routes['teams/{}'.format(team_id)] = self.__team(team_id)
+                self.routes['teams/{}/fixtures'.format(team_id)] = {'count': len(team_fixtures),
+                                                                    'fixtures': team_fixtures}
+                self.routes['teams/{}/players'.format(team_id)] = {
+                    'count': players, 'players': [self.__player(team_id, number) for number in range(players)]}
+            all_fixtures.extend(fixtures)
+
+        self.routes['competitions/'] = competition_list
+        self.routes['fixtures/'] = {'count': len(all_fixtures), 'fixtures': all_fixtures}
+
+        # Team ids were only used to build routes, payloads are encoded once
+        for fixture in all_fixtures:
+            del fixture['_team_ids']
+        self.bodies = {path: json.dumps(payload).encode('utf-8') for path, payload in self.routes.items()}
+
+    def count(self, path):
+        """Returns number of records served at path"""
+
+        payload = self.routes[path]
+        if isinstance(payload, list):
+            return len(payload)
+        return next((len(value) for value in payload.values() if isinstance(value, list)), 1)
+
+    def __link(self, path):
+        return {'href': self.base_url + path}
+
+    def __competition(self, competition_id, teams, fixtures):
+        return {
+            '_links': {
+                'self': self.__link('competitions/{}'.format(competition_id)),
+                'teams': self.__link('competitions/{}/teams'.format(competition_id)),
+                'fixtures': self.__link('competitions/{}/fixtures'.format(competition_id)),
+                'leagueTable': self.__link('competitions/{}/leagueTable'.format(competition_id)),
+            },
+            'id': competition_id,
+            'caption': 'League {} 2017/18'.format(competition_id),
+            'league': 'L{}'.format(competition_id),
+            'year': '2017',
+            'currentMatchday': 2 * (teams - 1),
+            'numberOfMatchdays': 2 * (teams - 1),
+            'numberOfTeams': teams,
+            'numberOfGames': fixtures,
+            'lastUpdated': '2018-05-22T12:00:48Z',
+        }
+
+    def __team(self, team_id):
+        return {
+            '_links': {
+                'self': self.__link('teams/{}'.format(team_id)),
+                'fixtures': self.__link('teams/{}/fixtures'.format(team_id)),
+                'players': self.__link('teams/{}/players'.format(team_id)),
+            },
+            'name': 'Team {} FC'.format(team_id),
+            'code': 'T{}'.format(team_id),
+            'shortName': 'Team {}'.format(team_id),
+            'squadMarketValue': None,
+            'crestUrl': 'http://example.com/{}.svg'.format(team_id),
+        }
+
+    def __fixtures(self, competition_id, team_ids):
+        fixtures = []
+        start = datetime(2017, 8, 11, 18, 45)
+        pairs = [(home, away) for home in team_ids for away in team_ids if home != away]
+        per_match_day = max(len(team_ids) // 2, 1)
+        for index, (home, away) in enumerate(pairs):
+            match_day = index // per_match_day + 1
+            date = start + timedelta(days=7 * (match_day - 1), hours=index % 3)
+            fixtures.append({
+                '_links': {
+                    'self': self.__link('fixtures/{}'.format(competition_id * 100000 + index)),
+                    'competition': self.__link('competitions/{}'.format(competition_id)),
+                    'homeTeam': self.__link('teams/{}'.format(home)),
+                    'awayTeam': self.__link('teams/{}'.format(away)),
+                },
+                'date': date.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'status': 'FINISHED',
+                'matchday': match_day,
+                'homeTeamName': 'Team {} FC'.format(home),
+                'awayTeamName': 'Team {} FC'.format(away),
+                'result': {'goalsHomeTeam': (home + index) % 4, 'goalsAwayTeam': (away + index) % 3},
+                'odds': None,
+                '_team_ids': (home, away),
+            })
+        return fixtures
+
+    def __standing(self, position, team_id):
+        return {
+            '_links': {'team': self.__link('teams/{}'.format(team_id))},
+            'position': position,
+            'teamName': 'Team {} FC'.format(team_id),
+            'crestURI': 'http://example.com/{}.svg'.format(team_id),
+            'playedGames': 38,
+            'points': 100 - position,
+            'goals': 60,
+            'goalsAgainst': 40,
+            'goalDifference': 20,
+            'wins': 30 - position,
+            'draws': 5,
+            'losses': 3 + position,
+            'home': {'goals': 30, 'goalsAgainst': 20, 'wins': 15, 'draws': 2, 'losses': 2},
+            'away': {'goals': 30, 'goalsAgainst': 20, 'wins': 15, 'draws': 3, 'losses': 1},
+        }
+
+    def __player(self, team_id, number):
+        return {
+            'name': 'Player {} of team {}'.format(number, team_id),
+            'position': POSITIONS[number % len(POSITIONS)],
+            'jerseyNumber': number + 1,
+            'dateOfBirth': '19{:02d}-0{}-1{}'.format(80 + number % 20, number % 9 + 1, number % 10),
+            'nationality': NATIONALITIES[(team_id + number) % len(NATIONALITIES)],
+            'contractUntil': '2022-06-30',
+            'marketValue': None,
+        }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves encoded payloads of server by path"""
+
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body are written separately, Nagle's algorithm would delay the body
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.split('/v1/', 1)[-1]
+        body = self.server.payloads.bodies.get(path)
+        if body is None:
+            self.send_response(404)
+            body = b'{}'
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-Requests-Available-Minute', '1000000')
+        self.send_header('X-RequestCounter-Reset', '60')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer:
+    """football-data.org stand-in running in a background thread
+
+    Use as a context manager, *base_url* is available once started.
+    """
+
+    def __init__(self, competitions=1, teams=20, players=25):
+        """Initialises server, payloads are built when started
+
+        :param competitions: int, number of competitions
+        :param teams: int, number of teams in each competition
+        :param players: int, number of players in each team
+        """
+
+        self.competitions = competitions
+        self.teams = teams
+        self.players = players
+        self.base_url = None
+        self.payloads = None
+        self.__server = None
+        self.__thread = None
+
+    def start(self):
+        """Builds payloads and starts serving on a free local port"""
+
+        self.__server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        self.__server.daemon_threads = True
+        self.base_url = 'http://127.0.0.1:{}/v1/'.format(self.__server.server_address[1])
+        self.payloads = self.__server.payloads = Payloads(self.base_url, self.competitions, self.teams,
+                                                          self.players)
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving"""
+
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,349 @@
+"""
+    footballdata.aio
+    ~~~~~~~~~~~~~~~~
+
+    This module implements an asyncio based connector. It requires aiohttp,
+    which can be installed with ``pip install football-data-connector[async]``.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import asyncio
+import time
+
+from .connector import Connector
+from .datasets import Competition, DataSet, Fixture
+from .decoding import accept_encoding, default_decoder
+from .instrumentation import Instrumentation, LOAD
+from .scheduler import priority, LOW
+from .utils import IdentityMap, lookup_cache, report_request, request_instrumentation, response_error
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class AsyncSession:
+    """aiohttp session with a pool of keep-alive connections to the API
+
+    The underlying aiohttp session is created on first request, so that it is
+    bound to the running event loop.
+    """
+
+    # Data is fetched by coroutines, get methods of objects return awaitables
+    asynchronous = True
+
+    def __init__(self, api_key='', pool_size=10, timeout=None, headers=None, cache=None, scheduler=None,
+                 transport=None, decoder=None, compression=True, parser=None):
+        """Initialises new session
+
+        :param api_key: str, API key sent with every request, optional
+        :param pool_size: int, maximum number of simultaneous connections
+        :param timeout: float or (connect, read) tuple, default timeout for requests, optional
+        :param headers: dict, default headers sent with every request, optional
+        :param cache: Cache of API responses such as FileCache, optional
+        :param scheduler: RequestScheduler which API calls have to pass through, optional
+        :param transport: not supported, API calls are always sent by aiohttp
+        :param decoder: callable decoding JSON response bodies, defaults to the fastest decoder installed
+        :param compression: bool, False to ask for uncompressed responses, aiohttp negotiates the
+                            compressions it supports otherwise
+        :param parser: not supported, responses are parsed in the event loop thread
+        """
+
+        if aiohttp is None:
+            raise ImportError('aiohttp is required to use AsyncConnector')
+        if transport is not None:
+            raise NotImplementedError('Transports are not supported by AsyncConnector')
+        if parser is not None:
+            raise NotImplementedError('Parsers are not supported by AsyncConnector')
+
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler
+        self.identity_map = IdentityMap()
+        self.instrumentation = Instrumentation()
+        self.decoder = decoder if decoder is not None else default_decoder()
+        self.snapshot = None
+        self.headers = {} if compression else {'Accept-Encoding': accept_encoding(False)}
+        if headers:
+            self.headers.update(headers)
+        if api_key:
+            self.headers['X-Auth-Token'] = api_key
+
+        self.__client = None
+
+    def __client_timeout(self):
+        """Converts timeout to aiohttp ClientTimeout"""
+
+        if self.timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+            return aiohttp.ClientTimeout(total=None, connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=self.timeout)
+
+    @property
+    def client(self):
+        """Returns aiohttp ClientSession, creating it if required"""
+
+        if self.__client is None or self.__client.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.__client = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                  timeout=self.__client_timeout())
+        return self.__client
+
+    async def close(self):
+        """Closes all pooled connections"""
+
+        if self.__client is not None:
+            await self.__client.close()
+            self.__client = None
+
+
+async def fetch_data_from_api(endpoint, session, options=None, revalidate=False):
+    """Fetches data from the endpoint without blocking the event loop
+
+    :param endpoint: api endpoint to connect
+    :param session: AsyncSession object to send the request with, holds API key
+    :param options: data to sent with api call
+    :param revalidate: bool, revalidates cached responses even if they are fresh
+    :return: Decoded JSON data
+    """
+
+    # Build data, aiohttp accepts only strings and integers as values
+    params = {key: str(value) for key, value in options.items()} if options else {}
+
+    # Measure the call only if someone listens
+    instrumentation = request_instrumentation(session)
+    start = time.perf_counter()
+
+    # Serve fresh responses from cache, revalidate stale ones
+    cached, fresh, headers = lookup_cache(session, endpoint, options or {}, revalidate)
+    if fresh:
+        report_request(instrumentation, endpoint, options or {}, time.perf_counter() - start, 'hit')
+        return cached.data
+
+    content = b''
+
+    async def send():
+        nonlocal content
+        async with session.client.get(endpoint, params=params, headers=headers) as response:
+            # Read body before connection is released
+            content = await response.read()
+        return response
+
+    # Keep API calls within request quota if session has a scheduler
+    if session.scheduler is not None:
+        response = await session.scheduler.request_async(send)
+    else:
+        response = await send()
+    latency = time.perf_counter() - start
+
+    # Return the json data if request is successful
+    cache = session.cache
+    data, decode, cache_state = None, None, 'miss' if cache is not None else None
+    if response.status == 304 and cached is not None:
+        data, cache_state = cache.revalidated(cached).data, 'revalidated'
+    elif response.status == 200:
+        decode_start = time.perf_counter()
+        data = session.decoder(content)
+        decode = time.perf_counter() - decode_start
+        if cache is not None:
+            cache.set(endpoint, options, data, response.headers)
+    elif response.status in [403, 404]:
+        data = []
+
+    report_request(instrumentation, endpoint, options or {}, latency, cache_state, response, len(content), decode)
+
+    if data is None:
+        raise response_error(response, content)
+    return data
+
+
+class AsyncDataSet(DataSet):
+    """DataSet loaded without blocking the event loop
+
+    An AsyncDataSet has to be awaited, or iterated with ``async for``, before
+    it is used like a normal DataSet.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__loading = None
+
+    def __repr__(self):
+        return "AsyncDataSet <{!r}>".format(self.klass.__name__)
+
+    async def load(self):
+        """Loads data from football-data.org if not already loaded
+
+        Concurrent calls share one API request.
+
+        :return: AsyncDataSet object
+        """
+
+        if self.loaded or not self.endpoint:
+            return self
+
+        start = time.perf_counter()
+        source = 'snapshot'
+        if not self._populate_from_snapshot():
+            source = 'api'
+            if self.__loading is None:
+                self.__loading = asyncio.ensure_future(fetch_data_from_api(
+                    endpoint=self.endpoint, options=self.options, session=self.session))
+            try:
+                data_list = await asyncio.shield(self.__loading)
+            finally:
+                self.__loading = None
+            if self.loaded:
+                # Populated by a concurrent call, which reported it
+                return self
+            self._populate(data_list)
+
+        instrumentation = getattr(self.session, 'instrumentation', None)
+        if instrumentation is not None and instrumentation.wants(LOAD):
+            instrumentation.emit(LOAD, endpoint=self.endpoint, options=self.options, klass=self.klass,
+                                 records=len(self), seconds=time.perf_counter() - start, source=source)
+
+        return self
+
+    def __await__(self):
+        return self.load().__await__()
+
+    async def __aiter__(self):
+        await self.load()
+        for data in super().__iter__():
+            yield data
+
+    async def stream(self):
+        """Yields objects of data set once it is loaded
+
+        aiohttp responses are not parsed incrementally, the data set is
+        awaited and its objects are yielded from memory.
+
+        :return: async generator of FootballDataObject objects
+        """
+
+        async for item in self:
+            yield item
+
+    async def refresh(self):
+        """Fetches data of data set again and replaces its objects once the API call succeeds
+
+        Objects are served from the previous response while the call is in
+        progress, and are kept if it fails. Responses cached by the session
+        are revalidated even if they are fresh.
+
+        :return: True if objects were replaced, False if the API returned no data
+        """
+
+        if not self.endpoint:
+            return False
+
+        start = time.perf_counter()
+        data_list = await fetch_data_from_api(endpoint=self.endpoint, options=self.options, session=self.session,
+                                              revalidate=True)
+        if not data_list and self.loaded:
+            # API answered 403 or 404, keep the last good objects
+            return False
+        self._populate(data_list)
+
+        instrumentation = getattr(self.session, 'instrumentation', None)
+        if instrumentation is not None and instrumentation.wants(LOAD):
+            instrumentation.emit(LOAD, endpoint=self.endpoint, options=self.options, klass=self.klass,
+                                 records=len(self), seconds=time.perf_counter() - start, source='refresh')
+        return True
+
+    def _ensure_loaded(self):
+        """Raises error if data set is used before loading"""
+
+        if not self.loaded and self.endpoint:
+            raise RuntimeError('AsyncDataSet must be awaited before use')
+
+
+class AsyncConnector(Connector):
+    """Class to initialise an asyncio based connection to football-data.org
+
+    get methods of AsyncConnector, and of Competition and Team objects created
+    from it, return AsyncDataSet objects which need to be awaited.
+    """
+
+    session_class = AsyncSession
+    data_set_class = AsyncDataSet
+
+    async def close(self):
+        """Closes all pooled connections and the snapshot loaded by load_snapshot"""
+
+        self._close_snapshot()
+        await self.session.close()
+
+    async def prefetch(self, competitions=None, depth=2):
+        """Loads teams, fixtures, league tables and players of competitions concurrently
+
+        Number of simultaneous requests is limited by the pool size of session.
+
+        :param competitions: Iterable of Competition objects, defaults to all competitions
+        :param depth: 1 to load teams, fixtures and league tables of competitions, 2 to load fixtures and
+                      players of their teams as well
+        :return: Iterable of loaded Competition objects
+        """
+
+        if competitions is None:
+            competitions = await self.get_competitions()
+
+        async def load_competition(competition):
+            teams, _, _ = await asyncio.gather(competition.get_teams(), competition.get_fixtures(),
+                                               competition.get_league_table())
+            if depth > 1:
+                await asyncio.gather(*(load_team(team) for team in teams))
+
+        async def load_team(team):
+            await asyncio.gather(team.get_fixtures(), team.get_players())
+
+        # Tasks copy the current context, so interactive calls are sent before prefetch calls
+        with priority(LOW):
+            await asyncio.gather(*(load_competition(competition) for competition in competitions))
+        return competitions
+
+    async def get_competitions_for_seasons(self, seasons, force_update=False):
+        """Fetches competitions of several seasons concurrently
+
+        :param seasons: Iterable of 4 digit integers representing seasons
+        :param force_update: Boolean, overrides cached results if True
+        :return: AsyncDataSet of Competition objects of all seasons, each with a season attribute
+        """
+
+        seasons = list(seasons)
+        data_sets = [self.get_competitions(season=season, force_update=force_update) for season in seasons]
+        await asyncio.gather(*data_sets)
+        return self._merge(Competition, [({'season': season}, data_set)
+                                         for season, data_set in zip(seasons, data_sets)])
+
+    async def get_fixtures_for_competitions(self, competitions=None, force_update=False):
+        """Fetches fixtures of several competitions concurrently
+
+        :param competitions: Iterable of Competition objects, defaults to competitions of current season
+        :param force_update: Boolean, overrides cached results if True
+        :return: AsyncDataSet of Fixture objects of all competitions, each with season and competition_id attributes
+        """
+
+        if competitions is None:
+            competitions = await self.get_competitions()
+        competitions = list(competitions)
+        data_sets = [competition.get_fixtures(force_update=force_update) for competition in competitions]
+        await asyncio.gather(*data_sets)
+        return self._merge(Fixture, [(self._competition_tags(competition), data_set)
+                                     for competition, data_set in zip(competitions, data_sets)])
+
+    def __enter__(self):
+        raise TypeError('Use "async with" with AsyncConnector')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
@@ -0,0 +1,227 @@
+"""
+    footballdata.cache
+    ~~~~~~~~~~~~~~~~~~
+
+    This module implements a persistent cache of API responses.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+class CacheEntry:
+    """Class to represent a cached API response"""
+
+    def __init__(self, endpoint, options, data, stored_at, ttl, etag=None, last_modified=None):
+        """Initialises new cache entry
+
+        :param endpoint: str, API endpoint of response
+        :param options: dict, arguments sent with API call
+        :param data: Decoded JSON data of response
+        :param stored_at: float, time at which response was fetched or revalidated
+        :param ttl: float, number of seconds for which response is fresh
+        :param etag: str, ETag header of response, optional
+        :param last_modified: str, Last-Modified header of response, optional
+        """
+
+        self.endpoint = endpoint
+        self.options = options
+        self.data = data
+        self.stored_at = stored_at
+        self.ttl = ttl
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def __repr__(self):
+        return "CacheEntry <{!r}>".format(self.endpoint)
+
+    @property
+    def fresh(self):
+        """Returns True if entry can be used without revalidation"""
+        return time.time() - self.stored_at < self.ttl
+
+    def validators(self):
+        """Returns headers for a conditional request revalidating this entry
+
+        :return: dict of headers
+        """
+
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+def endpoint_key(endpoint, options=None):
+    """Returns key identifying the response of an endpoint called with options
+
+    :param endpoint: str, API endpoint
+    :param options: dict, arguments sent with API call, optional
+    :return: str, endpoint followed by sorted options as a query string
+    """
+
+    if options:
+        return "{}?{}".format(endpoint, urlencode(sorted(options.items())))
+    return endpoint
+
+
+class TTLResolver:
+    """Resolves number of seconds for which API data is fresh by resource type"""
+
+    # Default number of seconds for which responses are fresh, by resource type
+    default_ttls = {
+        'competitions': 24 * 60 * 60,
+        'teams': 24 * 60 * 60,
+        'players': 24 * 60 * 60,
+        'leagueTable': 5 * 60,
+        'fixtures': 60,
+    }
+
+    def __init__(self, ttl=None, default_ttl=5 * 60):
+        """Initialises ttls of resource types
+
+        :param ttl: dict mapping resource type to seconds, or seconds for all types, optional
+        :param default_ttl: seconds for which data of unknown resource types is fresh
+        """
+
+        self.default_ttl = default_ttl
+        self.ttls = dict(self.default_ttls)
+        if isinstance(ttl, dict):
+            self.ttls.update(ttl)
+        elif ttl is not None:
+            self.ttls = {resource: ttl for resource in self.ttls}
+            self.default_ttl = ttl
+
+    @staticmethod
+    def resource_type(endpoint):
+        """Returns resource type of an endpoint
+
+        The resource type is the last path segment which is not an id, for
+        example teams for both competitions/445/teams and teams/66.
+
+        :param endpoint: str, API endpoint
+        :return: str, resource type
+        """
+
+        segments = [segment for segment in urlsplit(endpoint).path.split('/') if segment]
+        for segment in reversed(segments):
+            if not segment.isdigit():
+                return segment
+        return ''
+
+    def ttl_for(self, endpoint):
+        """Returns number of seconds for which responses of an endpoint are fresh"""
+        return self.ttls.get(self.resource_type(endpoint), self.default_ttl)
+
+
+class FileCache(TTLResolver):
+    """Cache of API responses stored as files in a directory
+
+    Responses are keyed by endpoint and options. Each entry is fresh for a
+    number of seconds depending on the type of resource. Stale entries are
+    revalidated with ETag and Last-Modified headers, so an unchanged response
+    costs a 304 without re-downloading the payload.
+    """
+
+    def __init__(self, directory, ttl=None, default_ttl=5 * 60):
+        """Initialises new file cache
+
+        :param directory: str, directory to store responses, created if not existing
+        :param ttl: dict mapping resource type to seconds, or seconds for all types, optional
+        :param default_ttl: seconds for which responses of unknown resource types are fresh
+        """
+
+        super().__init__(ttl, default_ttl)
+        self.directory = directory
+
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return "FileCache <{!r}>".format(self.directory)
+
+    def __path(self, endpoint, options):
+        """Returns path of file storing response of endpoint with options"""
+
+        name = hashlib.sha1(endpoint_key(endpoint, options).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + '.json')
+
+    def get(self, endpoint, options=None):
+        """Returns cached response of endpoint with options
+
+        :param endpoint: str, API endpoint
+        :param options: dict, arguments sent with API call
+        :return: CacheEntry object or None if not cached
+        """
+
+        try:
+            with open(self.__path(endpoint, options), encoding='utf-8') as cache_file:
+                stored = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        return CacheEntry(endpoint=endpoint, options=options, data=stored['data'], stored_at=stored['stored_at'],
+                          ttl=self.ttl_for(endpoint), etag=stored.get('etag'),
+                          last_modified=stored.get('last_modified'))
+
+    def set(self, endpoint, options, data, headers=None):
+        """Stores a response
+
+        :param endpoint: str, API endpoint
+        :param options: dict, arguments sent with API call
+        :param data: Decoded JSON data of response
+        :param headers: dict like object of response headers, optional
+        :return: CacheEntry object
+        """
+
+        headers = headers or {}
+        entry = CacheEntry(endpoint=endpoint, options=options, data=data, stored_at=time.time(),
+                           ttl=self.ttl_for(endpoint), etag=headers.get('ETag'),
+                           last_modified=headers.get('Last-Modified'))
+        self.__write(entry)
+        return entry
+
+    def revalidated(self, entry):
+        """Marks an entry as fresh after the API confirmed it is unchanged
+
+        :param entry: CacheEntry object
+        :return: CacheEntry object
+        """
+
+        entry.stored_at = time.time()
+        self.__write(entry)
+        return entry
+
+    def __write(self, entry):
+        """Writes entry to file atomically"""
+
+        stored = {
+            'endpoint': entry.endpoint,
+            'stored_at': entry.stored_at,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'data': entry.data,
+        }
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as temp_file:
+                json.dump(stored, temp_file)
+            os.replace(temp_path, self.__path(entry.endpoint, entry.options))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def clear(self):
+        """Removes all cached responses"""
+
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,312 @@
+"""
+    footballdata.columnar
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements a columnar representation of data sets for
+    vectorized analysis. It requires NumPy, which can be installed with
+    ``pip install football-data-connector[columnar]``.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+from datetime import timezone
+
+from .datasets import Fixture, Player, Standing, Team, Competition
+from .query import parse_lookup, is_empty
+from .utils import parse_datetime
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+# Types of columns
+DATE = 'date'
+INTEGER = 'integer'
+CATEGORY = 'category'
+
+# Types of columns built for each class
+COLUMN_TYPES = {
+    Fixture: {
+        'date': DATE,
+        'matchday': INTEGER,
+        'status': CATEGORY,
+        'home_team_name': CATEGORY,
+        'away_team_name': CATEGORY,
+        'goals_home_team': INTEGER,
+        'goals_away_team': INTEGER,
+    },
+    Standing: {
+        'team_name': CATEGORY,
+        'position': INTEGER,
+        'played_games': INTEGER,
+        'points': INTEGER,
+        'goals': INTEGER,
+        'goals_against': INTEGER,
+        'goal_difference': INTEGER,
+        'wins': INTEGER,
+        'draws': INTEGER,
+        'losses': INTEGER,
+    },
+    Player: {
+        'name': CATEGORY,
+        'nationality': CATEGORY,
+        'position': CATEGORY,
+        'jersey_number': INTEGER,
+        'date_of_birth': DATE,
+        'contract_until': DATE,
+    },
+    Team: {
+        'name': CATEGORY,
+        'code': CATEGORY,
+        'short_name': CATEGORY,
+    },
+    Competition: {
+        'id': INTEGER,
+        'caption': CATEGORY,
+        'league': CATEGORY,
+        'year': CATEGORY,
+        'number_of_teams': INTEGER,
+        'number_of_games': INTEGER,
+    },
+}
+
+# Values nested in other fields, mapped to field and key holding them
+NESTED_FIELDS = {
+    'goals_home_team': ('result', 'goalsHomeTeam'),
+    'goals_away_team': ('result', 'goalsAwayTeam'),
+}
+
+
+def to_datetime64(value):
+    """Converts a date string or datetime object to numpy datetime64 in UTC
+
+    :param value: str, datetime object or empty value
+    :return: numpy.datetime64, NaT for empty values
+    """
+
+    if is_empty(value):
+        return numpy.datetime64('NaT', 's')
+    if isinstance(value, str):
+        # numpy does not accept time zone designators
+        if value.endswith('Z'):
+            return numpy.datetime64(value[:-1], 's')
+        if 'T' not in value:
+            return numpy.datetime64(value, 's')
+        value = parse_datetime(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return numpy.datetime64(value, 's')
+
+
+class ColumnarDataSet:
+    """Class to represent a data set as columns of typed arrays
+
+    Dates are stored as datetime64 arrays, integers as masked int64 arrays
+    where missing values are masked, and strings as int32 codes into an array
+    of categories. Filters and aggregations run as array operations.
+    """
+
+    def __init__(self, columns, categories=None):
+        """Initialises columnar data set
+
+        :param columns: dict mapping field names to arrays of equal length
+        :param categories: dict mapping names of dictionary encoded fields to arrays of categories, optional
+        """
+
+        if numpy is None:
+            raise ImportError('numpy is required to use ColumnarDataSet')
+
+        self.columns = columns
+        self.categories = categories or {}
+
+    @classmethod
+    def from_data_set(cls, data_set, fields=None):
+        """Builds columns from the data of a data set
+
+        Objects of the data set are not built, values are read from the data
+        returned by the API.
+
+        :param data_set: DataSet object
+        :param fields: list of field names, defaults to all fields known for class of data set
+        :return: ColumnarDataSet object
+        """
+
+        if numpy is None:
+            raise ImportError('numpy is required to use ColumnarDataSet')
+
+        column_types = COLUMN_TYPES.get(data_set.klass)
+        if column_types is None:
+            raise TypeError("Columns are not defined for {}".format(data_set.klass))
+        fields = list(fields) if fields else list(column_types)
+
+        values = {field: [] for field in fields}
+        for row in data_set._rows():
+            for field in fields:
+                if field in NESTED_FIELDS:
+                    parent, key = NESTED_FIELDS[field]
+                    values[field].append((row.get(parent) or {}).get(key))
+                else:
+                    values[field].append(row.get(field))
+
+        columns, categories = {}, {}
+        for field in fields:
+            column_type = column_types[field]
+            if column_type == DATE:
+                columns[field] = numpy.array([to_datetime64(value) for value in values[field]],
+                                             dtype='datetime64[s]')
+            elif column_type == INTEGER:
+                missing = [is_empty(value) for value in values[field]]
+                data = [0 if empty else value for value, empty in zip(values[field], missing)]
+                columns[field] = numpy.ma.array(numpy.array(data, dtype=numpy.int64), mask=missing)
+            else:
+                labels = numpy.array(['' if is_empty(value) else str(value) for value in values[field]],
+                                     dtype=object)
+                categories[field], codes = numpy.unique(labels, return_inverse=True)
+                columns[field] = codes.astype(numpy.int32)
+
+        return cls(columns, categories)
+
+    def __repr__(self):
+        return "ColumnarDataSet <{!r}>".format(sorted(self.columns))
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, field):
+        """Returns values of a field, decoding dictionary encoded fields
+
+        :param field: str, field name
+        :return: numpy array
+        """
+
+        if field in self.categories:
+            return self.categories[field][self.columns[field]]
+        return self.columns[field]
+
+    def __take(self, selection):
+        """Returns data set with rows selected by a boolean mask or index array"""
+
+        return ColumnarDataSet({field: column[selection] for field, column in self.columns.items()},
+                               self.categories)
+
+    def __compare(self, field, operator, value):
+        """Returns boolean mask of rows matching a lookup"""
+
+        column = self.columns[field]
+        if field in self.categories:
+            categories = self.categories[field]
+            if operator == 'exact':
+                return numpy.isin(column, numpy.flatnonzero(categories == value))
+            elif operator == 'in':
+                return numpy.isin(column, numpy.flatnonzero(numpy.isin(categories, list(value))))
+            column = categories[column]
+        elif column.dtype.kind == 'M':
+            value = [to_datetime64(item) for item in value] if operator == 'in' else to_datetime64(value)
+
+        if operator == 'exact':
+            mask = column == value
+        elif operator == 'in':
+            mask = numpy.isin(column, value)
+        elif operator == 'gt':
+            mask = column > value
+        elif operator == 'gte':
+            mask = column >= value
+        elif operator == 'lt':
+            mask = column < value
+        else:
+            mask = column <= value
+        return numpy.ma.filled(mask, False)
+
+    def filter(self, mask=None, **lookups):
+        """Returns rows matching a boolean mask and all lookups
+
+        Lookups use the same syntax as DataSet.filter.
+
+        :param mask: boolean numpy array, optional
+        :return: ColumnarDataSet object
+        """
+
+        selection = numpy.ones(len(self), dtype=bool) if mask is None else numpy.asarray(mask, dtype=bool)
+        for lookup, value in lookups.items():
+            field, operator = parse_lookup(lookup)
+            selection &= self.__compare(field, operator, value)
+        return self.__take(selection)
+
+    def sum(self, field):
+        """Returns sum of an integer field, ignoring missing values, 0 if all values are missing"""
+        return int(numpy.ma.filled(self.columns[field], 0).sum())
+
+    def group_by(self, field):
+        """Groups rows by values of a field
+
+        :param field: str, field name
+        :return: GroupBy object
+        """
+        return GroupBy(self, field)
+
+    def to_dict(self):
+        """Returns a dict mapping field names to lists of values"""
+        return {field: self[field].tolist() for field in self.columns}
+
+
+class GroupBy:
+    """Class to represent rows of a columnar data set grouped by a field"""
+
+    def __init__(self, data_set, field):
+        """Groups rows of data set
+
+        :param data_set: ColumnarDataSet object
+        :param field: str, field name
+        """
+
+        self.data_set = data_set
+        self.field = field
+
+        column = data_set.columns[field]
+        if field in data_set.categories:
+            # Codes already index the categories
+            used_codes, self.groups = numpy.unique(column, return_inverse=True)
+            self.keys = data_set.categories[field][used_codes]
+        else:
+            self.keys, self.groups = numpy.unique(numpy.ma.getdata(column), return_inverse=True)
+
+    def __result(self, columns):
+        """Returns columnar data set with group keys and aggregated columns"""
+
+        columns = dict(columns)
+        columns[self.field] = self.keys
+        return ColumnarDataSet(columns)
+
+    def count(self):
+        """Returns number of rows in each group"""
+        return self.__result({'count': numpy.bincount(self.groups, minlength=len(self.keys))})
+
+    def sum(self, *fields):
+        """Returns sums of integer fields in each group, ignoring missing values"""
+
+        columns = {}
+        for field in fields:
+            values = numpy.ma.filled(self.data_set.columns[field], 0)
+            sums = numpy.bincount(self.groups, weights=values, minlength=len(self.keys))
+            columns[field] = sums.astype(numpy.int64)
+        return self.__result(columns)
+
+    def mean(self, *fields):
+        """Returns means of integer fields in each group, ignoring missing values
+
+        Means are masked float arrays, the mean of a group without values is
+        masked, such as goals of a team which has not played yet.
+        """
+
+        columns = {}
+        for field in fields:
+            column = self.data_set.columns[field]
+            present = ~numpy.ma.getmaskarray(column)
+            sums = numpy.bincount(self.groups, weights=numpy.ma.filled(column, 0), minlength=len(self.keys))
+            counts = numpy.bincount(self.groups, weights=present, minlength=len(self.keys))
+            with numpy.errstate(invalid='ignore', divide='ignore'):
+                columns[field] = numpy.ma.masked_array(sums / counts, mask=counts == 0)
+        return self.__result(columns)
@@ -8,7 +8,13 @@
     :license: BSD 3-Clause
 """
 
-from .datasets import DataSet, Competition, Fixture
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .datasets import DataSet, Competition, Fixture, Team
+from .scheduler import RequestScheduler, priority, LOW
+from .snapshot import Snapshot, write_snapshot
+from .utils import Session
 
 
 class Connector:
@@ -16,11 +22,28 @@ class Connector:
 
     __supported_api_versions = ['v1']
 
-    def __init__(self, api_key='', api_version='v1'):
+    # Classes used to create session and data sets, overridden by subclasses
+    session_class = Session
+    data_set_class = DataSet
+
+    def __init__(self, api_key='', api_version='v1', pool_size=10, timeout=None, headers=None, cache=None,
+                 scheduler=None, transport=None, decoder=None, compression=True, parser=None):
         """Initialises connection to football-data.org
 
         :param api_key: API key from football-data.org, optional
         :param api_version: API version, defaults to v1
+        :param pool_size: Number of keep-alive connections kept in pool, defaults to 10
+        :param timeout: Timeout for API calls in seconds or (connect, read) tuple, optional
+        :param headers: Dict of headers sent with every API call, optional
+        :param cache: Persistent cache of API responses such as FileCache, optional
+        :param scheduler: RequestScheduler keeping API calls within quota, optional. Use True for a RequestScheduler
+                          with default settings, which is not created if the transport is not rate limited
+        :param transport: Transport sending API calls such as ReplayTransport, defaults to HTTPTransport
+        :param decoder: Callable decoding JSON responses such as orjson.loads, defaults to orjson if installed,
+                        otherwise json.loads
+        :param compression: Negotiates gzip, deflate and, if installed, brotli compressed responses, defaults to True
+        :param parser: ProcessPoolParser decoding and cleaning large responses in worker processes, optional.
+                       Not used for responses stored in a cache
         :return: Connector object
         """
 
@@ -38,9 +61,19 @@ class Connector:
         self.competition_endpoint = "{base_url}competitions/".format(base_url=self.base_url)
         self.fixtures_endpoint = "{base_url}fixtures/".format(base_url=self.base_url)
 
+        if scheduler is True:
+            scheduler = RequestScheduler() if getattr(transport, 'rate_limited', True) else None
+
+        # Session with connection pool shared by all API calls from this connector
+        self.session = self.session_class(api_key=api_key, pool_size=pool_size, timeout=timeout, headers=headers,
+                                          cache=cache, scheduler=scheduler or None, transport=transport,
+                                          decoder=decoder, compression=compression, parser=parser)
+
         # Initialise competitions and fixtures
-        self.__competitions = []
-        self.__fixtures = []
+        # Competitions are cached by season, '' for current season
+        self.__competitions = {}
+        self.__fixtures = None
+        self.__lock = threading.Lock()
 
     @classmethod
     def supported_api_versions(cls):
@@ -63,6 +96,33 @@ class Connector:
         """
         return self.__api_version
 
+    @property
+    def instrumentation(self):
+        """Returns registry of callbacks reporting API calls and loading of data sets
+
+        :return: Instrumentation object
+        """
+        return self.session.instrumentation
+
+    def close(self):
+        """Closes all pooled connections and the snapshot loaded by load_snapshot"""
+
+        self._close_snapshot()
+        self.session.close()
+
+    def _close_snapshot(self):
+        """Closes snapshot of session, if any"""
+
+        snapshot, self.session.snapshot = self.session.snapshot, None
+        if snapshot is not None:
+            snapshot.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
     def get_competitions(self, season='', force_update=False):
         """Fetches all competitions
 
@@ -71,12 +131,97 @@ class Connector:
         :return: DataSet of Competition objects
         """
 
-        if force_update or not self.__competitions:
-            options = {'season': season} if season else None
-            self.__competitions = DataSet(klass=Competition, endpoint=self.competition_endpoint, api_key=self.__api_key,
-                                          options=options)
+        key = str(season) if season else ''
+        if force_update or key not in self.__competitions:
+            with self.__lock:
+                if force_update or key not in self.__competitions:
+                    options = {'season': season} if season else None
+                    self.__competitions[key] = self.data_set_class(klass=Competition,
+                                                                   endpoint=self.competition_endpoint,
+                                                                   api_key=self.__api_key, options=options,
+                                                                   session=self.session)
+
+        return self.__competitions[key]
+
+    def get_competitions_for_seasons(self, seasons, force_update=False, max_workers=None):
+        """Fetches competitions of several seasons concurrently
+
+        Competitions of each season are cached like those returned by
+        get_competitions.
+
+        :param seasons: Iterable of 4 digit integers representing seasons
+        :param force_update: Boolean, overrides cached results if True
+        :param max_workers: Number of threads used for API calls, defaults to pool size of session
+        :return: DataSet of Competition objects of all seasons, each with a season attribute
+        """
+
+        seasons = list(seasons)
+        data_sets = [self.get_competitions(season=season, force_update=force_update) for season in seasons]
+        self._load_all(data_sets, max_workers)
+        return self._merge(Competition, [({'season': season}, data_set)
+                                         for season, data_set in zip(seasons, data_sets)])
+
+    def get_fixtures_for_competitions(self, competitions=None, force_update=False, max_workers=None):
+        """Fetches fixtures of several competitions concurrently
+
+        Fixtures of each competition are cached in the competition, like
+        those returned by its get_fixtures method.
+
+        :param competitions: Iterable of Competition objects, defaults to competitions of current season
+        :param force_update: Boolean, overrides cached results if True
+        :param max_workers: Number of threads used for API calls, defaults to pool size of session
+        :return: DataSet of Fixture objects of all competitions, each with season and competition_id attributes
+        """
+
+        if competitions is None:
+            competitions = self.get_competitions()
+        competitions = list(competitions)
+        data_sets = [competition.get_fixtures(force_update=force_update) for competition in competitions]
+        self._load_all(data_sets, max_workers)
+        return self._merge(Fixture, [(self._competition_tags(competition), data_set)
+                                     for competition, data_set in zip(competitions, data_sets)])
+
+    def _load_all(self, data_sets, max_workers=None):
+        """Loads data sets concurrently, raising the first error
+
+        :param data_sets: list of DataSet objects
+        :param max_workers: Number of threads used for API calls, defaults to pool size of session
+        :return: None
+        """
+
+        pending = [data_set for data_set in data_sets if not data_set.loaded]
+        if len(pending) == 1:
+            len(pending[0])
+        elif pending:
+            with ThreadPoolExecutor(max_workers=max_workers or self.session.pool_size) as executor:
+                list(executor.map(len, pending))
+
+    @staticmethod
+    def _competition_tags(competition):
+        """Returns season and id of a competition, used to tag its fixtures"""
+
+        season = getattr(competition, 'season', None)
+        if season is None and str(competition.year).isdigit():
+            season = int(competition.year)
+        return {'season': season, 'competition_id': competition.id}
+
+    def _merge(self, klass, tagged_data_sets):
+        """Merges loaded data sets into one, tagging their objects
 
-        return self.__competitions
+        Tags are set as attributes of the objects, which are shared with the
+        merged data sets.
+
+        :param klass: type, class of objects in data sets
+        :param tagged_data_sets: list of (dict of tags, DataSet) tuples
+        :return: DataSet of objects of all data sets, in order
+        """
+
+        items = []
+        for tags, data_set in tagged_data_sets:
+            for item in data_set:
+                item._update(tags)
+                items.append(item)
+        return self.data_set_class(klass=klass, data_list=items, session=self.session)
 
     def get_fixtures(self, force_update=False):
         """Fetches all fixtures
@@ -85,7 +230,114 @@ class Connector:
         :return: DataSet of Fixture objects
         """
 
-        if force_update or not self.__fixtures:
-            self.__fixtures = DataSet(klass=Fixture, endpoint=self.fixtures_endpoint, api_key=self.__api_key)
+        if force_update or self.__fixtures is None:
+            with self.__lock:
+                if force_update or self.__fixtures is None:
+                    self.__fixtures = self.data_set_class(klass=Fixture, endpoint=self.fixtures_endpoint,
+                                                          api_key=self.__api_key, session=self.session)
 
         return self.__fixtures
+
+    def prefetch(self, competitions=None, depth=2, max_workers=None):
+        """Loads teams, fixtures, league tables and players of competitions concurrently
+
+        Results are cached in the objects, so subsequent calls to their get
+        methods do not hit the API.
+
+        :param competitions: Iterable of Competition objects, defaults to all competitions
+        :param depth: 1 to load teams, fixtures and league tables of competitions, 2 to load fixtures and
+                      players of their teams as well
+        :param max_workers: Number of threads used for API calls, defaults to pool size of session
+        :return: Iterable of loaded Competition objects
+        """
+
+        if competitions is None:
+            competitions = self.get_competitions()
+
+        def load(data_set):
+            # Accessing length loads the data set, interactive calls are sent before prefetch calls
+            with priority(LOW):
+                len(data_set)
+            return data_set
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.session.pool_size) as executor:
+            pending = set()
+            for competition in competitions:
+                pending.add(executor.submit(load, competition.get_teams()))
+                pending.add(executor.submit(load, competition.get_fixtures()))
+                pending.add(executor.submit(load, competition.get_league_table()))
+
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        data_set = future.result()
+                        if depth > 1 and data_set.klass is Team:
+                            # Teams are loaded, queue their data sets
+                            for team in data_set:
+                                pending.add(executor.submit(load, team.get_fixtures()))
+                                pending.add(executor.submit(load, team.get_players()))
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        return competitions
+
+    def save_snapshot(self, path):
+        """Writes loaded data sets of connector, and those cached by objects created from it, to a snapshot file
+
+        The API key is not stored in the snapshot. Data sets which are not
+        loaded yet are left out.
+
+        :param path: str, path of snapshot file, replaced if existing
+        :return: None
+        """
+
+        named = [('competitions:' + season if season else 'competitions', data_set)
+                 for season, data_set in self.__competitions.items()]
+        named.append(('fixtures', self.__fixtures))
+        roots = {name: data_set for name, data_set in named if data_set is not None and data_set.loaded}
+
+        data_sets, seen = [], set()
+        pending = list(roots.values())
+        while pending:
+            data_set = pending.pop()
+            if id(data_set) in seen or not data_set.loaded or not data_set.endpoint:
+                continue
+            seen.add(id(data_set))
+            data_sets.append(data_set)
+            if data_set.klass in (Competition, Team):
+                for item in data_set:
+                    pending.extend(item._cached_data_sets())
+
+        write_snapshot(path, data_sets, roots)
+
+    def load_snapshot(self, path):
+        """Restores data sets from a snapshot file written by save_snapshot
+
+        The file is memory mapped, records are decoded when objects are first
+        accessed. Data sets found in the snapshot are used instead of API calls
+        until they are refreshed with force_update.
+
+        :param path: str, path of snapshot file
+        :return: Snapshot object, closed with the connector or when another snapshot is loaded
+        """
+
+        snapshot = Snapshot(path)
+        self._close_snapshot()
+        self.session.snapshot = snapshot
+
+        for name in snapshot.roots:
+            if name == 'competitions' or name.startswith('competitions:'):
+                competitions = snapshot.root(name)
+                self.__competitions[name.partition(':')[2]] = self.data_set_class(
+                    klass=Competition, endpoint=competitions['endpoint'], api_key=self.__api_key,
+                    options=competitions['options'], session=self.session)
+        fixtures = snapshot.root('fixtures')
+        if fixtures is not None:
+            self.__fixtures = self.data_set_class(klass=Fixture, endpoint=fixtures['endpoint'],
+                                                  api_key=self.__api_key, options=fixtures['options'],
+                                                  session=self.session)
+
+        return snapshot
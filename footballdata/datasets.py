@@ -9,31 +9,224 @@
     :license: BSD 3-Clause
 """
 
-from dateutil.parser import parse as datetime_parse
+import threading
+import time
+from datetime import datetime, timezone
 
-from .utils import fetch_data_from_api, clean_object
+from .instrumentation import BUILD, LOAD
+from .parallel import PreparedRecords
+from .query import HashIndex, SortedIndex, parse_lookup, is_empty
+from .streaming import stream_data_from_api
+from .utils import fetch_data_from_api, clean_object, parse_datetime
+
+
+# Sets slots of football data objects without the fallback of FootballDataObject.__setattr__
+_set_attribute = object.__setattr__
+
+# Guards data sets cached by get methods of football data objects, which have no lock of their own
+_cache_lock = threading.Lock()
+
+
+class DateTimeField:
+    """Descriptor for attributes holding a date returned by the API
+
+    The date string is stored as given and converted to a datetime object on
+    first access, so dates which are never used are never parsed. The value is
+    stored in a slot named after the attribute with a leading underscore.
+    """
+
+    def __init__(self):
+        self.name = None
+        self.storage = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.storage = '_' + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        try:
+            value = getattr(instance, self.storage)
+        except AttributeError:
+            raise AttributeError(self.name)
+
+        if value and isinstance(value, str):
+            value = parse_datetime(value)
+            setattr(instance, self.storage, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.storage, value)
+
+
+class DataSetContext:
+    """State shared by the objects built by a data set
+
+    Objects refer to this context rather than to their data set, so keeping
+    an object does not keep the records of its data set in memory.
+    """
+
+    __slots__ = ('endpoint', 'api_key', 'session', 'data_set_class')
+
+    def __init__(self, endpoint='', api_key='', session=None, data_set_class=None):
+        """Initialises new context
+
+        :param endpoint: str, API endpoint of data set
+        :param api_key: str, API key
+        :param session: Session object used for API calls, optional
+        :param data_set_class: type, class of data sets created by get methods of objects, defaults to DataSet
+        """
+
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.session = session
+        self.data_set_class = data_set_class
+
+    def __repr__(self):
+        return "DataSetContext <{!r}>".format(self.endpoint)
 
 
 class FootballDataObject:
-    """Parent class for all football data components"""
+    """Parent class for all football data components
 
-    def __init__(self, **kwargs):
-        """Initialises new object with attributes from keyword arguments"""
+    Objects store the fields known for their class in slots, fields unknown
+    at class creation are kept in a dict and are still accessible as
+    attributes. State shared by all objects of a data set, such as the API
+    key and session, is read from the context of the data set which created
+    the object. The context is not pickled or copied.
+    """
+
+    __slots__ = ('_context', '_extra', '_last_updated')
+
+    last_updated = DateTimeField()
 
-        for key in kwargs:
-            if key == 'last_updated' and kwargs[key]:
-                kwargs[key] = datetime_parse(kwargs[key])
-            setattr(self, key, kwargs[key])
+    # Translation table from API keys to attribute names, one per subclass
+    key_map = {}
 
-        # Base API endpoint and API key of current object
-        # Set by subclasses or object creator
-        self.base_endpoint = ''
-        self.api_key = ''
+    # Names of attributes stored in slots, one per subclass
+    fields = frozenset(['last_updated'])
+
+    # Names of attributes holding dates, one per subclass
+    date_fields = frozenset(['last_updated'])
+
+    # True if objects are shared through the identity map of the session
+    identity_mapped = False
+
+    # Key of the list of records in API responses, None if responses are lists
+    list_key = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.key_map = {}
+
+        # Collect slots and date fields of class and its parents
+        fields = set()
+        date_fields = set()
+        for klass in cls.__mro__:
+            fields.update(name for name in getattr(klass, '__slots__', ()) if not name.startswith('_'))
+            date_fields.update(name for name, value in vars(klass).items() if isinstance(value, DateTimeField))
+        cls.fields = frozenset(fields | date_fields)
+        cls.date_fields = frozenset(date_fields)
+
+    def __init__(self, context=None, **kwargs):
+        """Initialises new object with attributes from keyword arguments
+
+        :param context: DataSetContext of data set which created the object, optional
+        """
+
+        self._context = context
+        self._extra = None
+        self._update(kwargs)
+
+    def _update(self, data):
+        """Sets attributes from a dict keyed by attribute name
+
+        :param data: dict, cleaned data of the object
+        :return: None
+        """
+
+        fields = self.fields
+        for key in data:
+            if key in fields:
+                _set_attribute(self, key, data[key])
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = data[key]
+
+    def __getattr__(self, name):
+        # Called only for attributes not found in slots, look in unknown fields
+        if name != '_extra':
+            extra = self._extra
+            if extra and name in extra:
+                return extra[name]
+        raise AttributeError("{!r} object has no attribute {!r}".format(type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        try:
+            object.__setattr__(self, name, value)
+        except AttributeError:
+            # Attributes without slots are kept with unknown fields, read only class attributes are not replaced
+            if name.startswith('_') or hasattr(type(self), name):
+                raise
+            if self._extra is None:
+                self._extra = {}
+            self._extra[name] = value
+
+    def __getstate__(self):
+        # Context holds the session, which can not be pickled
+        state = {field: getattr(self, field) for field in self.fields if hasattr(self, field)}
+        if self._extra:
+            state.update(self._extra)
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def base_endpoint(self):
+        """Returns API endpoint of current object"""
+
+        links = getattr(self, 'links', None)
+        if links and 'self' in links:
+            return links['self']['href']
+        if self._context is None:
+            return ''
+
+        # Build base endpoint if id is available
+        if hasattr(self, 'id'):
+            return "{}{}".format(self._context.endpoint, self.id)
+        return self._context.endpoint
+
+    @property
+    def api_key(self):
+        """Returns API key of data set which created the object"""
+        return self._context.api_key if self._context is not None else ''
+
+    @property
+    def session(self):
+        """Returns session of data set which created the object"""
+        return self._context.session if self._context is not None else None
+
+    @property
+    def data_set_class(self):
+        """Returns class of data sets created by get methods of current object"""
+
+        if self._context is None or self._context.data_set_class is None:
+            return DataSet
+        return self._context.data_set_class
 
 
 class Competition(FootballDataObject):
     """Class to represent a competition"""
 
+    __slots__ = ('id', 'caption', 'current_match_day', 'league', 'number_of_games', 'number_of_teams', 'year',
+                 'links', '__teams', '__fixtures', '__league_table')
+
+    identity_mapped = True
+
     def __init__(self, **kwargs):
         """Initialises new competition object"""
 
@@ -50,21 +243,30 @@ class Competition(FootballDataObject):
 
         super().__init__(**kwargs)
 
-        # Set competition attributes
-        self.fixtures_endpoint = self.links['fixtures']['href']
-        self.league_table_endpoint = self.links['leagueTable']['href']
-        self.teams_endpoint = self.links['teams']['href']
-        self.base_endpoint = self.links['self']['href']
-
-        # :TODO: These empty lists should be replaced with empty data set objects
-        self.__teams = []
-        self.__fixtures = []
-        self.__league_table = []
+        # Cached data sets, created on first call to get methods
+        self.__teams = None
+        self.__fixtures = None
+        self.__league_table = None
 
     def __repr__(self):
         name = self.caption or 'Unknown'
         return "Competition <{!r}>".format(name)
 
+    @property
+    def fixtures_endpoint(self):
+        """Returns API endpoint of fixtures in competition"""
+        return self.links['fixtures']['href']
+
+    @property
+    def league_table_endpoint(self):
+        """Returns API endpoint of league table of competition"""
+        return self.links['leagueTable']['href']
+
+    @property
+    def teams_endpoint(self):
+        """Returns API endpoint of teams in competition"""
+        return self.links['teams']['href']
+
     def get_teams(self, force_update=False):
         """Fetches all teams in a competition
 
@@ -72,8 +274,11 @@ class Competition(FootballDataObject):
         :return: DataSet of Team objects
         """
 
-        if force_update or not self.__teams:
-            self.__teams = DataSet(klass=Team, endpoint=self.teams_endpoint, api_key=self.api_key)
+        if force_update or self.__teams is None:
+            with _cache_lock:
+                if force_update or self.__teams is None:
+                    self.__teams = self.data_set_class(klass=Team, endpoint=self.teams_endpoint,
+                                                       api_key=self.api_key, session=self.session)
 
         return self.__teams
 
@@ -84,8 +289,11 @@ class Competition(FootballDataObject):
         :return: DataSet of Fixture objects
         """
 
-        if force_update or not self.__fixtures:
-            self.__fixtures = DataSet(klass=Fixture, endpoint=self.fixtures_endpoint, api_key=self.api_key)
+        if force_update or self.__fixtures is None:
+            with _cache_lock:
+                if force_update or self.__fixtures is None:
+                    self.__fixtures = self.data_set_class(klass=Fixture, endpoint=self.fixtures_endpoint,
+                                                          api_key=self.api_key, session=self.session)
 
         return self.__fixtures
 
@@ -96,15 +304,57 @@ class Competition(FootballDataObject):
         :return: DataSet of Standing objects
         """
 
-        if force_update or not self.__league_table:
-            self.__league_table = DataSet(klass=Standing, endpoint=self.league_table_endpoint, api_key=self.api_key)
+        if force_update or self.__league_table is None:
+            with _cache_lock:
+                if force_update or self.__league_table is None:
+                    self.__league_table = self.data_set_class(klass=Standing, endpoint=self.league_table_endpoint,
+                                                              api_key=self.api_key, session=self.session)
 
         return self.__league_table
 
+    def _cached_data_sets(self):
+        """Returns data sets cached by get methods"""
+        return [data_set for data_set in (self.__teams, self.__fixtures, self.__league_table) if data_set is not None]
+
+    def compute_league_table(self, match_day=None, force_update=False):
+        """Computes standing of all teams in competition from its fixtures
+
+        No request is sent for the league table, the fixtures of the
+        competition are fetched if they are not already loaded.
+
+        :param match_day: int, computes table as of this match day, optional
+        :param force_update: Boolean, fetches fixtures again if True
+        :return: DataSet of Standing objects, coroutine returning it if session is asynchronous
+        """
+
+        fixtures = self.get_fixtures(force_update=force_update)
+        if getattr(self.session, 'asynchronous', False):
+            return self.__compute_league_table_async(fixtures, match_day)
+        return self.__league_table_from(fixtures, match_day)
+
+    async def __compute_league_table_async(self, fixtures, match_day):
+        """Awaits fixtures of an AsyncDataSet before computing the league table"""
+        return self.__league_table_from(await fixtures, match_day)
+
+    @staticmethod
+    def __league_table_from(fixtures, match_day):
+        """Returns standings computed from loaded fixtures"""
+
+        from .standings import LeagueTable
+
+        return LeagueTable.from_fixtures(fixtures, match_day=match_day).standings()
+
 
 class Fixture(FootballDataObject):
     """Class to represent a fixture"""
 
+    __slots__ = ('_date', 'away_team_name', 'home_team_name', 'match_day', 'matchday', 'odds', 'result', 'status',
+                 'links')
+
+    list_key = 'fixtures'
+
+    date = DateTimeField()
+
     def __init__(self, **kwargs):
         """Initialises new Fixture object"""
 
@@ -119,9 +369,78 @@ class Fixture(FootballDataObject):
 
         super().__init__(**kwargs)
 
-        # Convert date to datetime object
-        if hasattr(self, 'date'):
-            self.date = datetime_parse(self.date)
+    def __team_url(self, name):
+        """Returns URL of a team link, None if not available"""
+
+        links = getattr(self, 'links', None)
+        if not links or name not in links:
+            return None
+        return links[name]['href']
+
+    def __build_team(self, url, data):
+        """Returns team built from data fetched from url, shared through identity map of session"""
+
+        if not data:
+            return None
+
+        data = clean_object(data, Team.key_map)
+        identity_map = getattr(self.session, 'identity_map', None)
+        if identity_map is None:
+            return Team(context=self._context, **data)
+        team, _ = identity_map.get_or_add(url, lambda: Team(context=self._context, **data))
+        return team
+
+    def __get_team(self, name):
+        """Returns team of a link, fetching it if not in identity map of session
+
+        Returns a coroutine for objects of an AsyncConnector.
+        """
+
+        url = self.__team_url(name)
+        if getattr(self.session, 'asynchronous', False):
+            return self.__get_team_async(url)
+        if url is None:
+            return None
+
+        identity_map = getattr(self.session, 'identity_map', None)
+        if identity_map is not None and url in identity_map:
+            return identity_map.get(url)
+
+        data = fetch_data_from_api(endpoint=url, api_key=self.api_key, session=self.session)
+        return self.__build_team(url, data)
+
+    async def __get_team_async(self, url):
+        """Returns team of a URL, fetching it without blocking the event loop if not in identity map"""
+
+        from .aio import fetch_data_from_api as fetch_data_from_api_async
+
+        if url is None:
+            return None
+
+        identity_map = getattr(self.session, 'identity_map', None)
+        if identity_map is not None and url in identity_map:
+            return identity_map.get(url)
+
+        data = await fetch_data_from_api_async(endpoint=url, session=self.session)
+        return self.__build_team(url, data)
+
+    def get_home_team(self):
+        """Returns home team, shared with data sets of the same connector
+
+        For objects of an AsyncConnector, returns a coroutine which has to be awaited.
+
+        :return: Team object or None if not available
+        """
+        return self.__get_team('homeTeam')
+
+    def get_away_team(self):
+        """Returns away team, shared with data sets of the same connector
+
+        For objects of an AsyncConnector, returns a coroutine which has to be awaited.
+
+        :return: Team object or None if not available
+        """
+        return self.__get_team('awayTeam')
 
     def __repr__(self):
         home_team = self.home_team_name or 'Unknown'
@@ -133,6 +452,11 @@ class Fixture(FootballDataObject):
 class Team(FootballDataObject):
     """Class to represent a team"""
 
+    __slots__ = ('code', 'crest_url', 'name', 'short_name', 'squad_market_value', 'links', '__fixtures', '__players')
+
+    identity_mapped = True
+    list_key = 'teams'
+
     def __init__(self, **kwargs):
         # These values are set by FootballDataObject constructor using values in kwargs
         self.code = ''
@@ -144,19 +468,28 @@ class Team(FootballDataObject):
 
         super().__init__(**kwargs)
 
-        # Set extra attributes
-        self.fixtures_endpoint = self.links['fixtures']['href']
-        self.players_endpoint = self.links['players']['href']
-        self.base_endpoint = self.links['self']['href']
-
-        # :TODO: These empty lists should be replaced with empty data set objects
-        self.__fixtures = []
-        self.__players = []
+        # Cached data sets, created on first call to get methods
+        self.__fixtures = None
+        self.__players = None
 
     def __repr__(self):
         name = self.name or 'Unknown'
         return "Team <{!r}>".format(name)
 
+    @property
+    def fixtures_endpoint(self):
+        """Returns API endpoint of fixtures of team"""
+        return self.links['fixtures']['href']
+
+    @property
+    def players_endpoint(self):
+        """Returns API endpoint of players in team"""
+        return self.links['players']['href']
+
+    def _cached_data_sets(self):
+        """Returns data sets cached by get methods"""
+        return [data_set for data_set in (self.__fixtures, self.__players) if data_set is not None]
+
     def get_fixtures(self, force_update=False):
         """Fetches all fixtures for a team
 
@@ -164,8 +497,11 @@ class Team(FootballDataObject):
         :return: DataSet of Fixture objects
         """
 
-        if force_update or not self.__fixtures:
-            self.__fixtures = DataSet(klass=Fixture, endpoint=self.fixtures_endpoint, api_key=self.api_key)
+        if force_update or self.__fixtures is None:
+            with _cache_lock:
+                if force_update or self.__fixtures is None:
+                    self.__fixtures = self.data_set_class(klass=Fixture, endpoint=self.fixtures_endpoint,
+                                                          api_key=self.api_key, session=self.session)
 
         return self.__fixtures
 
@@ -176,8 +512,11 @@ class Team(FootballDataObject):
         :return: DataSet of Player objects
         """
 
-        if force_update or not self.__players:
-            self.__players = DataSet(klass=Player, endpoint=self.players_endpoint, api_key=self.api_key)
+        if force_update or self.__players is None:
+            with _cache_lock:
+                if force_update or self.__players is None:
+                    self.__players = self.data_set_class(klass=Player, endpoint=self.players_endpoint,
+                                                         api_key=self.api_key, session=self.session)
 
         return self.__players
 
@@ -185,6 +524,12 @@ class Team(FootballDataObject):
 class Standing(FootballDataObject):
     """Class to represent a team's standing in a competition"""
 
+    __slots__ = ('team_name', 'crest_uri', 'played_games', 'wins', 'draws', 'losses', 'home', 'away', 'points',
+                 'position', 'goals', 'goals_against', 'goal_difference', 'links')
+
+    # Competition is a league if standing is available, otherwise no league table is available
+    list_key = 'standing'
+
     def __init__(self, **kwargs):
         # These values are set by FootballDataObject constructor using values in kwargs
         self.team_name = ''
@@ -211,6 +556,14 @@ class Standing(FootballDataObject):
 class Player(FootballDataObject):
     """Class to represent a player"""
 
+    __slots__ = ('name', 'nationality', 'position', '_contract_until', '_date_of_birth', 'jersey_number',
+                 'market_value')
+
+    list_key = 'players'
+
+    contract_until = DateTimeField()
+    date_of_birth = DateTimeField()
+
     def __init__(self, **kwargs):
         """Initialises Player object"""
 
@@ -225,21 +578,59 @@ class Player(FootballDataObject):
 
         super().__init__(**kwargs)
 
-        # Convert contract_until and date_of_birth to datetime objects
-        if hasattr(self, 'contract_until') and self.contract_until:
-            self.contract_until = datetime_parse(self.contract_until)
-        if hasattr(self, 'date_of_birth') and self.date_of_birth:
-            self.date_of_birth = datetime_parse(self.date_of_birth)
-
     def __repr__(self):
         name = self.name or 'Unknown'
         return "Player <{!r}>".format(name)
 
 
+class RecordStore:
+    """Backing store of a data set and the views created from it
+
+    Keeps the records returned by the API and builds an object from a record
+    only when it is first requested. Built objects are memoized by index, as
+    are the indexes used to query them.
+    """
+
+    __slots__ = ('records', 'items', 'build', 'indexes', 'lock', 'prepared')
+
+    def __init__(self, records=None, build=None, items=None, prepared=False):
+        """Initialises new store
+
+        :param records: list of records returned by the API, optional
+        :param build: callable building an object from a record, required with records
+        :param items: list of objects already built, used if records are not given
+        :param prepared: bool, True if records are PreparedRecords of a ProcessPoolParser
+        """
+
+        self.records = records
+        self.build = build
+        self.items = list(items) if items is not None else [None] * len(records)
+        self.indexes = {}
+        self.lock = threading.Lock()
+        self.prepared = prepared
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        item = self.items[index]
+        if item is None:
+            with self.lock:
+                # Another thread may have built the object while waiting
+                item = self.items[index]
+                if item is None:
+                    item = self.items[index] = self.build(self.records[index])
+        return item
+
+
 class DataSet:
-    """Class to represent a sequence of football data objects"""
+    """Class to represent a sequence of football data objects
+
+    Objects are built from the data returned by the API when they are first
+    accessed. Slices of a data set are views sharing its objects.
+    """
 
-    def __init__(self, klass, endpoint='', api_key='', options=None, data_list=None):
+    def __init__(self, klass, endpoint='', api_key='', options=None, data_list=None, session=None):
         """Initialises FootballDataObject sequence
 
         :param klass: type, Class of objects in data set. Should be either FootballDataObject or its subclass
@@ -247,97 +638,445 @@ class DataSet:
         :param api_key: str, API key
         :param options: dict, Additional arguments to sent with API call
         :param data_list: iterable containing klass objects
+        :param session: Session object used for API calls, optional
         """
 
         self.__klass = klass
         self.__endpoint = endpoint
         self.__api_key = api_key
+        self.__session = session
         self.__options = options if options else {}
 
+        # State shared with the objects built by this data set
+        self.__context = DataSetContext(endpoint, api_key, session, type(self))
+
+        # Indices in store of items in this data set, None if data set contains all items in store
+        self.__indices = None
+
         # Set data_list as data_set if available
         if data_list:
             # Type check all elements in iterable
             if not all(isinstance(item, klass) for item in data_list):
                 raise TypeError("All items should be an instance of {}".format(klass))
-            self.__data_set = list(data_list)
+            self.__store = RecordStore(items=data_list)
         else:
-            self.__data_set = []
+            self.__store = RecordStore(items=[])
+
+        # Data set is loaded when created from a list of objects
+        self.__loaded = bool(data_list)
+        self.__lock = threading.Lock()
 
     def __repr__(self):
         return "DataSet <{!r}>".format(self.__klass.__name__)
 
-    def __create_data_set_item(self, cleaned_data):
+    @property
+    def klass(self):
+        """Returns class of objects in data set"""
+        return self.__klass
+
+    @property
+    def endpoint(self):
+        """Returns API endpoint of data set"""
+        return self.__endpoint
+
+    @property
+    def options(self):
+        """Returns additional arguments sent with API call"""
+        return self.__options
+
+    @property
+    def api_key(self):
+        """Returns API key used for API calls"""
+        return self.__api_key
+
+    @property
+    def session(self):
+        """Returns session used for API calls"""
+        return self.__session
+
+    @property
+    def loaded(self):
+        """Returns True if data is already fetched from API"""
+        return self.__loaded
+
+    def __create_data_set_item(self, data):
         """Creates a single football data object
 
-        :param cleaned_data: Dict with proper key value pairs
+        :param data: Dict data from api
         :return: FootballDataObject object
         """
 
-        data_set_item = self.__klass(**cleaned_data)
+        instrumentation = getattr(self.__session, 'instrumentation', None)
+        if instrumentation is None or not instrumentation.wants(BUILD):
+            return self.__build_item(clean_object(data, self.__klass.key_map))
 
-        # Build base endpoint if id is available
-        if hasattr(data_set_item, 'id'):
-            data_set_item.base_endpoint = "{}{}".format(self.__endpoint, data_set_item.id)
+        start = time.perf_counter()
+        data = clean_object(data, self.__klass.key_map)
+        return self.__report_build(instrumentation, data, start)
+
+    def __create_prepared_item(self, record):
+        """Creates a single football data object from a record prepared by a ProcessPoolParser"""
+
+        instrumentation = getattr(self.__session, 'instrumentation', None)
+        if instrumentation is None or not instrumentation.wants(BUILD):
+            return self.__build_item(PreparedRecords.to_dict(record))
+
+        start = time.perf_counter()
+        return self.__report_build(instrumentation, PreparedRecords.to_dict(record), start)
+
+    def __report_build(self, instrumentation, data, start):
+        """Builds an object from cleaned data and reports the time taken since start"""
+
+        cleaned = time.perf_counter()
+        item = self.__build_item(data)
+        instrumentation.emit(BUILD, endpoint=self.__endpoint, klass=self.__klass, clean=cleaned - start,
+                             build=time.perf_counter() - cleaned)
+        return item
+
+    def __build_item(self, data):
+        """Builds a single football data object from cleaned data"""
+
+        # Resolve competitions and teams to the object already representing them
+        identity_map = getattr(self.__session, 'identity_map', None)
+        links = data.get('links')
+        if identity_map is not None and self.__klass.identity_mapped and links and 'self' in links:
+            item, added = identity_map.get_or_add(links['self']['href'],
+                                                  lambda: self.__klass(context=self.__context, **data))
+            if not added:
+                item._update(data)
+            return item
+
+        return self.__klass(context=self.__context, **data)
+
+    def _populate(self, data_list):
+        """Stores data returned by the API, objects are built on first access
+
+        :param data_list: Decoded JSON data returned by the API
+        :return: None
+        """
+
+        if isinstance(data_list, PreparedRecords):
+            self._set_records(data_list, prepared=True)
+        elif data_list:
+            # Handles inconsistent API structures, lists of most resources are wrapped in a dict
+            if self.__klass.list_key is not None:
+                data_list = data_list.get(self.__klass.list_key, [])
+
+            self._set_records(list(data_list))
         else:
-            data_set_item.base_endpoint = self.__endpoint
+            # Data list fetching failed due to some reason
+            self.__store = RecordStore(items=[])
+            self.__indices = None
+            self.__loaded = True
 
-        data_set_item.api_key = self.__api_key
-        return data_set_item
+    def _set_records(self, records, prepared=False):
+        """Stores records of items, objects are built on first access
+
+        :param records: sequence of records as returned by the API
+        :param prepared: bool, True if records are PreparedRecords of a ProcessPoolParser
+        :return: None
+        """
+
+        build = self.__create_prepared_item if prepared else self.__create_data_set_item
+        self.__store = RecordStore(records=records, build=build, prepared=prepared)
+        self.__indices = None
+        self.__loaded = True
+
+    def _populate_from_snapshot(self):
+        """Stores records of data set from the snapshot of its session, if available
+
+        :return: True if records were found in snapshot
+        """
+
+        snapshot = getattr(self.__session, 'snapshot', None)
+        records = snapshot.take(self.__endpoint, self.__options) if snapshot is not None else None
+        if records is None:
+            return False
+        self._set_records(records)
+        return True
+
+    def __decoder(self):
+        """Returns decoder preparing records in the process pool of the session, None to use default decoder
+
+        Responses stored in a cache are decoded as returned by the API.
+        """
+
+        parser = getattr(self.__session, 'parser', None)
+        if parser is None or getattr(self.__session, 'cache', None) is not None:
+            return None
+        return parser.decoder(self.__klass, self.__session.decoder)
+
+    def _ensure_loaded(self):
+        """Loads data set before its items are accessed, overridden by data sets which are loaded differently"""
+        self.__load_data_set()
 
     def __load_data_set(self):
         """Loads data from football-data.org in not already loaded"""
 
-        if not self.__data_set and self.__endpoint:
-            data_list = fetch_data_from_api(endpoint=self.__endpoint, api_key=self.__api_key, options=self.__options)
-
-            if data_list:
-                # Handles inconsistent API structures
-                if self.__klass == Team:
-                    # Actual team list is in dict with key teams
-                    data_list = data_list['teams']
-                elif self.__klass == Fixture:
-                    # Actual fixture list is in dict with key fixtures
-                    data_list = data_list['fixtures']
-                elif self.__klass == Standing:
-                    # Handle differences in league and cup standing
-                    if 'standing' in data_list:
-                        # Competition is a league
-                        data_list = data_list['standing']
-                    else:
-                        # No league table available
-                        return
-                elif self.__klass == Player:
-                    data_list = data_list['players']
-
-                cleaned_data_list = map(clean_object, data_list)
-                self.__data_set = list(map(self.__create_data_set_item, cleaned_data_list))
+        if not self.__loaded and self.__endpoint:
+            with self.__lock:
+                # Data set may have been loaded by another thread while waiting
+                if self.__loaded:
+                    return
+
+                start = time.perf_counter()
+                source = 'snapshot'
+                if not self._populate_from_snapshot():
+                    source = 'api'
+                    data_list = fetch_data_from_api(endpoint=self.__endpoint, api_key=self.__api_key,
+                                                    options=self.__options, session=self.__session,
+                                                    decoder=self.__decoder())
+                    self._populate(data_list)
+
+                instrumentation = getattr(self.__session, 'instrumentation', None)
+                if instrumentation is not None and instrumentation.wants(LOAD):
+                    instrumentation.emit(LOAD, endpoint=self.__endpoint, options=self.__options, klass=self.__klass,
+                                         records=len(self.__store), seconds=time.perf_counter() - start,
+                                         source=source)
+
+    def refresh(self):
+        """Fetches data of data set again and replaces its objects once the API call succeeds
+
+        Objects are served from the previous response while the call is in
+        progress, and are kept if it fails. Responses cached by the session
+        are revalidated even if they are fresh.
+
+        :return: True if objects were replaced, False if the API returned no data
+        """
+
+        if not self.__endpoint:
+            return False
+
+        start = time.perf_counter()
+        data_list = fetch_data_from_api(endpoint=self.__endpoint, api_key=self.__api_key, options=self.__options,
+                                        session=self.__session, decoder=self.__decoder(), revalidate=True)
+        if not data_list and self.__loaded:
+            # API answered 403 or 404, keep the last good objects
+            return False
+
+        with self.__lock:
+            self._populate(data_list)
+
+        instrumentation = getattr(self.__session, 'instrumentation', None)
+        if instrumentation is not None and instrumentation.wants(LOAD):
+            instrumentation.emit(LOAD, endpoint=self.__endpoint, options=self.__options, klass=self.__klass,
+                                 records=len(self.__store), seconds=time.perf_counter() - start, source='refresh')
+        return True
+
+    def stream(self):
+        """Yields objects of data set while the API response is downloaded
+
+        Records are parsed and built one by one and are not stored, so memory
+        use does not grow with the size of the response. Objects of a loaded
+        data set are yielded from memory.
+
+        :return: generator of FootballDataObject objects
+        """
+
+        if not self.__loaded and self.__endpoint and not self._populate_from_snapshot():
+            records = stream_data_from_api(self.__endpoint, key=self.__klass.list_key, api_key=self.__api_key,
+                                           options=self.__options, session=self.__session)
+            for record in records:
+                yield self.__create_data_set_item(record)
+            return
+
+        yield from self
+
+    def __positions(self):
+        """Returns indices in store of items in this data set"""
+        return self.__indices if self.__indices is not None else range(len(self.__store))
+
+    def _view(self, indices):
+        """Returns a data set containing items at given store indices
+
+        The returned data set shares the store of this data set.
+
+        :param indices: range or list of indices in store
+        :return: DataSet object
+        """
+
+        view = type(self)(klass=self.__klass, api_key=self.__api_key, session=self.__session)
+        view.__store = self.__store
+        view.__indices = indices
+        view.__loaded = True
+        return view
+
+    def __index(self, index_class, field):
+        """Returns index of a field over all items in store, building it on first use
+
+        :param index_class: HashIndex or SortedIndex
+        :param field: str, name of attribute
+        :return: index object
+        """
+
+        store = self.__store
+        key = (index_class, field)
+        if key not in store.indexes:
+            index = index_class(getattr(store[position], field, None) for position in range(len(store)))
+            # Keep the index built first if another thread built it concurrently
+            store.indexes.setdefault(key, index)
+        return store.indexes[key]
+
+    def __lookup_date(self, field, value):
+        """Converts a date used in a lookup to the type of values of field
+
+        Strings are parsed, naive datetime objects are taken as UTC if values
+        of the field have a time zone.
+
+        :param field: str, name of a DateTimeField
+        :param value: str or datetime object
+        :return: datetime object
+        """
+
+        if isinstance(value, str):
+            value = parse_datetime(value)
+        if isinstance(value, datetime) and value.tzinfo is None:
+            store = self.__store
+            sample = next((item for item in (getattr(store[index], field, None) for index in range(len(store)))
+                           if not is_empty(item)), None)
+            if isinstance(sample, datetime) and sample.tzinfo is not None:
+                value = value.replace(tzinfo=timezone.utc)
+        return value
+
+    def __match(self, lookup, value):
+        """Returns set of store indices matching a lookup
+
+        :param lookup: str, field name optionally followed by __ and an operator
+        :param value: value to compare with
+        :return: set of indices
+        """
+
+        field, operator = parse_lookup(lookup)
+
+        # Allow dates given as strings in lookups on date fields
+        if isinstance(getattr(self.__klass, field, None), DateTimeField):
+            if operator == 'in':
+                value = [self.__lookup_date(field, item) for item in value]
             else:
-                # Data list fetching failed due to some reason
-                self.__data_set = []
+                value = self.__lookup_date(field, value)
+
+        if operator == 'exact':
+            return set(self.__index(HashIndex, field).lookup(value))
+        elif operator == 'in':
+            index = self.__index(HashIndex, field)
+            return set(position for item in value for position in index.lookup(item))
+        return set(self.__index(SortedIndex, field).lookup(operator, value))
+
+    def filter(self, **lookups):
+        """Returns items matching all lookups
+
+        Lookups are field names, optionally followed by __ and one of the
+        operators in, gt, gte, lt or lte, for example status='FINISHED' or
+        date__gte='2017-08-01'. Indexes used to answer lookups are built on
+        first use and shared by all views of a data set.
+
+        :return: DataSet of matching items, in order of this data set
+        """
+
+        self._ensure_loaded()
+
+        matches = None
+        for lookup, value in lookups.items():
+            indices = self.__match(lookup, value)
+            matches = indices if matches is None else matches & indices
+
+        if matches is None:
+            return self._view(self.__positions())
+        if self.__indices is None:
+            # Store indices are in order of this data set
+            return self._view(sorted(matches))
+        return self._view([index for index in self.__indices if index in matches])
+
+    def get(self, **lookups):
+        """Returns the single item matching all lookups
+
+        :raises LookupError: if no item or more than one item matches
+        :return: FootballDataObject object
+        """
+
+        matches = self.filter(**lookups)
+        if len(matches) == 1:
+            return matches[0]
+        elif not matches:
+            raise LookupError("No {} matches {!r}".format(self.__klass.__name__, lookups))
+        raise LookupError("{} {} objects match {!r}".format(len(matches), self.__klass.__name__, lookups))
+
+    def order_by(self, *fields):
+        """Returns items sorted by fields
+
+        Prefix a field name with - to sort in descending order. Items with
+        empty values are placed last.
+
+        :return: DataSet of sorted items
+        """
+
+        self._ensure_loaded()
+
+        store = self.__store
+        positions = list(self.__positions())
+
+        # Sort by each field from last to first, relying on stable sort
+        for field in reversed(fields):
+            name = field.lstrip('-')
+            values = {index: getattr(store[index], name, None) for index in positions}
+            empty = [index for index in positions if is_empty(values[index])]
+            positions = [index for index in positions if not is_empty(values[index])]
+            positions.sort(key=values.__getitem__, reverse=field.startswith('-'))
+            positions.extend(empty)
+
+        return self._view(positions)
+
+    def _rows(self):
+        """Yields data of items as dicts keyed by attribute name, without building objects
+
+        :return: generator of dicts
+        """
+
+        self._ensure_loaded()
+        store = self.__store
+        key_map = self.__klass.key_map
+        for index in self.__positions():
+            if store.prepared:
+                yield PreparedRecords.to_dict(store.records[index])
+            elif store.records is not None:
+                yield clean_object(store.records[index], key_map)
+            else:
+                item = store.items[index]
+                yield {field: getattr(item, field, None) for field in item.fields}
+
+    def to_columns(self, fields=None):
+        """Returns data of items as columns of typed arrays, requires NumPy
+
+        :param fields: list of field names, defaults to all fields with a column type
+        :return: ColumnarDataSet object
+        """
+
+        from .columnar import ColumnarDataSet
+        return ColumnarDataSet.from_data_set(self, fields)
 
     def __iter__(self):
-        self.__load_data_set()
-        for data in self.__data_set:
-            yield data
+        self._ensure_loaded()
+        store = self.__store
+        for index in self.__positions():
+            yield store[index]
 
     def __getitem__(self, key):
-        self.__load_data_set()
+        self._ensure_loaded()
 
         if isinstance(key, int):
             # If key is an integer, return item at index
             try:
-                return self.__data_set[key]
+                return self.__store[self.__positions()[key]]
             except IndexError:
                 raise IndexError('Index out of range')
         elif isinstance(key, slice):
-            return DataSet(klass=self.__klass, data_list=self.__data_set[key])
+            return self._view(self.__positions()[key])
 
         raise TypeError('Key must be an integer or slice object')
 
     def __len__(self):
-        self.__load_data_set()
-        return len(self.__data_set)
+        self._ensure_loaded()
+        return len(self.__positions())
 
     def __bool__(self):
-        self.__load_data_set()
-        return bool(self.__data_set)
+        return len(self) > 0
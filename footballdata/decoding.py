@@ -0,0 +1,60 @@
+"""
+    footballdata.decoding
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements the choice of JSON decoder and the negotiation of
+    compressed responses. orjson is used if installed, it can be installed
+    with ``pip install football-data-connector[speedups]`` along with brotli.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import json
+
+from urllib3.util.request import make_headers
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def default_decoder():
+    """Returns the fastest JSON decoder installed, orjson if available, otherwise json.loads
+
+    :return: callable decoding bytes or str to Python objects
+    """
+    return orjson.loads if orjson is not None else json.loads
+
+
+def accept_encoding(compression=True):
+    """Returns value of Accept-Encoding header negotiating compressed responses
+
+    gzip and deflate are always accepted, br and zstd only if the libraries
+    decoding them are installed.
+
+    :param compression: bool, False to ask for uncompressed responses
+    :return: str
+    """
+
+    if not compression:
+        return 'identity'
+    return ', '.join(encoding.strip() for encoding in make_headers(accept_encoding=True)['accept-encoding'].split(','))
+
+
+def wire_bytes(response, size=None):
+    """Returns number of bytes of a response body as sent over the network, before decompression
+
+    :param response: requests Response object with its body read, or aiohttp ClientResponse
+    :param size: int, bytes of the body after decompression, used if the network size is not known
+    :return: int
+    """
+
+    tell = getattr(getattr(response, 'raw', None), 'tell', None)
+    if tell is not None:
+        return tell()
+    content_length = response.headers.get('Content-Length')
+    if content_length is not None and content_length.isdigit():
+        return int(content_length)
+    return size if size is not None else len(response.content)
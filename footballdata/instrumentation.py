@@ -0,0 +1,264 @@
+"""
+    footballdata.instrumentation
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements the hooks reporting API calls and loading of data
+    sets, and a collector aggregating them into metrics.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import logging
+import threading
+from bisect import bisect_left
+
+from .cache import TTLResolver
+
+
+logger = logging.getLogger(__name__)
+
+# Events reported by the library
+REQUEST = 'request'
+LOAD = 'load'
+BUILD = 'build'
+EVENTS = (REQUEST, LOAD, BUILD)
+
+
+class Instrumentation:
+    """Registry of callbacks called with instrumentation events
+
+    Every event is a dict. *request* events have endpoint, options, status,
+    latency, network, decode, bytes, wire_bytes, cache and retries keys. *load* events
+    have endpoint, options, klass, records, seconds and source keys. *build*
+    events have endpoint, klass, clean and build keys and are reported for
+    every object built. Times are in seconds. Nothing is measured for events
+    without callbacks.
+    """
+
+    def __init__(self):
+        self.__callbacks = {event: [] for event in EVENTS}
+
+    def __repr__(self):
+        return "Instrumentation <{!r} callbacks>".format(sum(map(len, self.__callbacks.values())))
+
+    def register(self, event, callback):
+        """Adds a callback for an event
+
+        :param event: str, one of REQUEST, LOAD or BUILD
+        :param callback: callable called with the event dict
+        :return: callback, so the method can be used as a decorator factory
+        """
+
+        if event not in self.__callbacks:
+            raise ValueError("Unknown event {!r}, expected one of {}".format(event, ', '.join(EVENTS)))
+        self.__callbacks[event] = self.__callbacks[event] + [callback]
+        return callback
+
+    def unregister(self, event, callback):
+        """Removes a callback of an event"""
+        self.__callbacks[event] = [item for item in self.__callbacks[event] if item != callback]
+
+    def wants(self, event):
+        """Returns True if an event has callbacks"""
+        return bool(self.__callbacks[event])
+
+    def emit(self, event, **data):
+        """Calls callbacks of an event
+
+        Errors raised by callbacks are logged, so they do not break API calls.
+
+        :param event: str, name of event
+        :param data: values of event
+        """
+
+        data['event'] = event
+        for callback in self.__callbacks[event]:
+            try:
+                callback(data)
+            except Exception:
+                logger.exception("Instrumentation callback %r failed", callback)
+
+
+class Histogram:
+    """Histogram of values counted in buckets with fixed upper bounds"""
+
+    # Upper bounds in seconds, suitable for latencies from microseconds to a minute
+    default_buckets = (1e-5, 5e-5, 1e-4, 5e-4, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, buckets=None):
+        """Initialises empty histogram
+
+        :param buckets: sorted upper bounds of buckets, a bucket for larger values is added
+        """
+
+        self.buckets = tuple(buckets or self.default_buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def __repr__(self):
+        return "Histogram <{!r} values>".format(self.count)
+
+    def observe(self, value):
+        """Adds a value"""
+
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self):
+        """Returns mean of values, 0 if empty"""
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, fraction):
+        """Returns upper bound of the bucket holding a quantile, such as 0.99 for the 99th percentile
+
+        :param fraction: float between 0 and 1
+        :return: float, max of values for the last bucket, 0 if empty
+        """
+
+        if not self.count:
+            return 0.0
+        rank, seen = fraction * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        """Returns histogram as a dict"""
+
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.mean,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], self.counts)),
+        }
+
+
+class MetricsCollector:
+    """Aggregates instrumentation events into counters and histograms
+
+    API calls are grouped by resource type of their endpoint, such as teams
+    or fixtures, and objects by class.
+
+    .. code-block:: python
+
+        collector = MetricsCollector()
+        collector.attach(connection)
+        ...
+        metrics = collector.to_dict()
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.requests = {}
+        self.objects = {}
+
+    def __repr__(self):
+        return "MetricsCollector <{!r} resources>".format(len(self.requests))
+
+    def attach(self, connector):
+        """Registers callbacks on the instrumentation of a connector
+
+        :param connector: Connector object
+        :return: MetricsCollector object
+        """
+
+        instrumentation = connector.instrumentation
+        instrumentation.register(REQUEST, self.on_request)
+        instrumentation.register(LOAD, self.on_load)
+        instrumentation.register(BUILD, self.on_build)
+        return self
+
+    def detach(self, connector):
+        """Removes callbacks from the instrumentation of a connector"""
+
+        instrumentation = connector.instrumentation
+        instrumentation.unregister(REQUEST, self.on_request)
+        instrumentation.unregister(LOAD, self.on_load)
+        instrumentation.unregister(BUILD, self.on_build)
+
+    @staticmethod
+    def __new_request_metrics():
+        return {
+            'requests': 0, 'errors': 0, 'cache_hits': 0, 'cache_misses': 0, 'revalidated': 0, 'retries': 0,
+            'bytes': 0, 'wire_bytes': 0, 'loads': 0, 'records': 0,
+            'latency': Histogram(), 'network': Histogram(), 'decode': Histogram(),
+        }
+
+    def __request_metrics(self, endpoint):
+        resource = TTLResolver.resource_type(endpoint)
+        if resource not in self.requests:
+            self.requests[resource] = self.__new_request_metrics()
+        return self.requests[resource]
+
+    def on_request(self, event):
+        """Counts an API call"""
+
+        with self.__lock:
+            metrics = self.__request_metrics(event['endpoint'])
+            if event['cache'] == 'hit':
+                metrics['cache_hits'] += 1
+                return
+
+            metrics['requests'] += 1
+            metrics['cache_misses'] += event['cache'] == 'miss'
+            metrics['revalidated'] += event['cache'] == 'revalidated'
+            metrics['errors'] += event['status'] >= 400
+            metrics['retries'] += event['retries']
+            metrics['bytes'] += event['bytes']
+            if event['wire_bytes'] is not None:
+                metrics['wire_bytes'] += event['wire_bytes']
+            metrics['latency'].observe(event['latency'])
+            if event['network'] is not None:
+                metrics['network'].observe(event['network'])
+            if event['decode'] is not None:
+                metrics['decode'].observe(event['decode'])
+
+    def on_load(self, event):
+        """Counts a loaded data set"""
+
+        with self.__lock:
+            metrics = self.__request_metrics(event['endpoint'])
+            metrics['loads'] += 1
+            metrics['records'] += event['records']
+
+    def on_build(self, event):
+        """Counts a built object"""
+
+        with self.__lock:
+            name = event['klass'].__name__
+            if name not in self.objects:
+                self.objects[name] = {'built': 0, 'clean': Histogram(), 'build': Histogram()}
+            metrics = self.objects[name]
+            metrics['built'] += 1
+            metrics['clean'].observe(event['clean'])
+            metrics['build'].observe(event['build'])
+
+    def to_dict(self):
+        """Returns all metrics as a dict of plain values, suitable for export"""
+
+        def export(metrics):
+            return {key: value.to_dict() if isinstance(value, Histogram) else value for key, value in metrics.items()}
+
+        with self.__lock:
+            return {
+                'requests': {resource: export(metrics) for resource, metrics in self.requests.items()},
+                'objects': {name: export(metrics) for name, metrics in self.objects.items()},
+            }
+
+    def reset(self):
+        """Removes all metrics"""
+
+        with self.__lock:
+            self.requests = {}
+            self.objects = {}
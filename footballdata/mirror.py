@@ -0,0 +1,422 @@
+"""
+    footballdata.mirror
+    ~~~~~~~~~~~~~~~~~~~
+
+    This module implements a local mirror of API records in a SQLite
+    database.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from .cache import CacheEntry, TTLResolver, endpoint_key
+from .datasets import DataSet, Competition, Fixture, Player, Standing, Team
+from .query import parse_lookup
+from .utils import clean_object
+
+
+# Table, key of record list in API responses and indexed columns of each class.
+# Columns map to the path of their value in the cleaned data of a record.
+TABLES = {
+    Competition: ('competitions', None, {
+        'id': ('id',),
+        'caption': ('caption',),
+        'league': ('league',),
+        'year': ('year',),
+    }),
+    Team: ('teams', 'teams', {
+        'name': ('name',),
+        'code': ('code',),
+        'short_name': ('short_name',),
+    }),
+    Fixture: ('fixtures', 'fixtures', {
+        'date': ('date',),
+        'status': ('status',),
+        'matchday': ('matchday',),
+        'home_team_name': ('home_team_name',),
+        'away_team_name': ('away_team_name',),
+        'home_team_url': ('links', 'homeTeam', 'href'),
+        'away_team_url': ('links', 'awayTeam', 'href'),
+        'competition_url': ('links', 'competition', 'href'),
+    }),
+    Standing: ('standings', 'standing', {
+        'team_name': ('team_name',),
+        'position': ('position',),
+        'points': ('points',),
+    }),
+    Player: ('players', 'players', {
+        'name': ('name',),
+        'nationality': ('nationality',),
+        'position': ('position',),
+    }),
+}
+
+# Indexes created on each table
+INDEXES = {
+    'competitions': (('year',), ('league',)),
+    'teams': (('name',),),
+    'fixtures': (('date',), ('status',), ('home_team_name',), ('away_team_name',), ('home_team_url',),
+                 ('away_team_url',), ('competition_url',)),
+    'standings': (('team_name',),),
+    'players': (('name',),),
+}
+
+# Classes of records returned by each resource type
+RESOURCE_CLASSES = {
+    'competitions': Competition,
+    'teams': Team,
+    'fixtures': Fixture,
+    'leagueTable': Standing,
+    'players': Player,
+}
+
+# SQL operators of lookup operators
+SQL_OPERATORS = {'exact': '=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+
+def value_at(data, path):
+    """Returns value at a path of keys in nested dicts, None if missing"""
+
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def to_sql_value(value):
+    """Converts a lookup value to the representation stored in the database
+
+    Datetime objects are stored as ISO 8601 strings in UTC as returned by the
+    API, naive datetime objects are taken as UTC.
+    """
+
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def api_key_of(name):
+    """Converts an attribute name to the key used by the API, such as homeTeamName for home_team_name"""
+
+    if name == 'links':
+        return '_links'
+    first, *rest = name.split('_')
+    return first + ''.join(part.capitalize() for part in rest)
+
+
+def api_record(data, key_map):
+    """Converts cleaned data of a record back to the keys returned by the API
+
+    :param data: dict keyed by attribute name
+    :param key_map: dict mapping API keys to attribute names, as filled by clean_object
+    :return: dict keyed as returned by the API
+    """
+
+    api_keys = {name: key for key, name in key_map.items()}
+    return {api_keys.get(name) or api_key_of(name): value for name, value in data.items()}
+
+
+def json_default(value):
+    """Encodes values of built objects which are not JSON serializable"""
+
+    if isinstance(value, datetime):
+        return to_sql_value(value)
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+class Mirror(TTLResolver):
+    """Local copy of API records in a SQLite database
+
+    Records are stored in one table per class, keyed by resource URL, with
+    indexed columns for querying. Records are kept as returned by the API,
+    records stored from a data set are converted back to the keys of the API.
+    A mirror implements the interface of FileCache, so a Connector created
+    with ``cache=mirror`` stores every response in it, serves fresh responses
+    from it and revalidates stale ones.
+    """
+
+    def __init__(self, path=':memory:', ttl=None, default_ttl=5 * 60):
+        """Opens or creates mirror database
+
+        :param path: str, path of SQLite database file, defaults to an in memory database
+        :param ttl: dict mapping resource type to seconds, or seconds for all types, optional
+        :param default_ttl: seconds for which responses of unknown resource types are fresh
+        """
+
+        super().__init__(ttl, default_ttl)
+        self.path = path
+
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__create_schema()
+
+    def __repr__(self):
+        return "Mirror <{!r}>".format(self.path)
+
+    def close(self):
+        """Closes database connection"""
+        self.__connection.close()
+
+    def __create_schema(self):
+        """Creates tables and indexes if not existing"""
+
+        statements = [
+            "CREATE TABLE IF NOT EXISTS endpoints (key TEXT PRIMARY KEY, endpoint TEXT, kind TEXT, envelope TEXT, "
+            "stored_at REAL, etag TEXT, last_modified TEXT)",
+            "CREATE TABLE IF NOT EXISTS members (key TEXT, position INTEGER, url TEXT, PRIMARY KEY (key, position))",
+        ]
+        for table, _, columns in TABLES.values():
+            statements.append("CREATE TABLE IF NOT EXISTS {} (url TEXT PRIMARY KEY, data TEXT, {})".format(
+                table, ', '.join(columns)))
+            for index_columns in INDEXES[table]:
+                statements.append("CREATE INDEX IF NOT EXISTS {0}_{1} ON {0} ({2})".format(
+                    table, '_'.join(index_columns), ', '.join(index_columns)))
+
+        with self.__lock, self.__connection:
+            for statement in statements:
+                self.__connection.execute(statement)
+
+    def __split(self, endpoint, data):
+        """Splits response data into kind, envelope, class and records
+
+        :return: tuple of kind ('list', 'single' or 'opaque'), envelope, class and list of records
+        """
+
+        klass = RESOURCE_CLASSES.get(self.resource_type(endpoint))
+        if klass is not None:
+            list_key = TABLES[klass][1]
+            if list_key is None and isinstance(data, list):
+                return 'list', None, klass, data
+            if isinstance(data, dict) and isinstance(data.get(list_key), list):
+                envelope = {key: value for key, value in data.items() if key != list_key}
+                return 'list', envelope, klass, data[list_key]
+            if isinstance(data, dict) and 'self' in data.get('_links', {}):
+                return 'single', None, klass, [data]
+        return 'opaque', data, None, []
+
+    def __write(self, connection, key, klass, records):
+        """Upserts records and replaces members of key
+
+        :param connection: sqlite3 connection in a transaction
+        :param key: str, key of endpoint the records belong to
+        :param klass: class of records
+        :param records: list of records as returned by the API
+        """
+
+        table, _, columns = TABLES[klass]
+        rows, members = [], []
+        for position, record in enumerate(records):
+            cleaned = clean_object(record, klass.key_map)
+            url = value_at(cleaned, ('links', 'self', 'href')) or "{}#{}".format(key, position)
+            values = [to_sql_value(value_at(cleaned, path)) for path in columns.values()]
+            rows.append([url, json.dumps(record, default=json_default)] + values)
+            members.append((key, position, url))
+
+        # Records without a resource URL are identified by position, drop those of the previous response
+        connection.execute("DELETE FROM {} WHERE url LIKE ? ESCAPE '\\'".format(table),
+                           (key.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '#%',))
+        connection.execute("DELETE FROM members WHERE key = ?", (key,))
+
+        updates = ', '.join("{0} = excluded.{0}".format(column) for column in ['data'] + list(columns))
+        connection.executemany("INSERT INTO {} (url, data, {}) VALUES ({}) ON CONFLICT (url) DO UPDATE SET {}".format(
+            table, ', '.join(columns), ', '.join('?' * (len(columns) + 2)), updates), rows)
+        connection.executemany("INSERT INTO members (key, position, url) VALUES (?, ?, ?)", members)
+
+    def set(self, endpoint, options, data, headers=None):
+        """Stores a response
+
+        :param endpoint: str, API endpoint
+        :param options: dict, arguments sent with API call
+        :param data: Decoded JSON data of response
+        :param headers: dict like object of response headers, optional
+        :return: CacheEntry object
+        """
+
+        headers = headers or {}
+        key = endpoint_key(endpoint, options)
+        kind, envelope, klass, records = self.__split(endpoint, data)
+        stored_at = time.time()
+
+        with self.__lock, self.__connection as connection:
+            if klass is not None:
+                self.__write(connection, key, klass, records)
+            connection.execute("INSERT OR REPLACE INTO endpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (key, endpoint, kind, json.dumps(envelope), stored_at, headers.get('ETag'),
+                                headers.get('Last-Modified')))
+
+        return CacheEntry(endpoint=endpoint, options=options, data=data, stored_at=stored_at,
+                          ttl=self.ttl_for(endpoint), etag=headers.get('ETag'),
+                          last_modified=headers.get('Last-Modified'))
+
+    def store(self, data_set, endpoint=None, options=None):
+        """Stores the objects of a data set under an endpoint
+
+        :param data_set: DataSet object, loaded if required
+        :param endpoint: str, defaults to endpoint of data set, required for slices and filtered data sets
+        :param options: dict, arguments sent with API call to endpoint, optional
+        :return: None
+        """
+
+        if endpoint is None:
+            endpoint, options = data_set.endpoint, data_set.options
+
+        klass = data_set.klass
+        _, list_key, _ = TABLES[klass]
+        records = [api_record(row, klass.key_map) for row in data_set._rows()]
+        key = endpoint_key(endpoint, options)
+
+        with self.__lock, self.__connection as connection:
+            self.__write(connection, key, klass, records)
+            connection.execute("INSERT OR REPLACE INTO endpoints VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (key, endpoint, 'list', json.dumps(None if list_key is None else {}),
+                                time.time(), None, None))
+
+    def get(self, endpoint, options=None):
+        """Returns stored response of endpoint with options
+
+        :param endpoint: str, API endpoint
+        :param options: dict, arguments sent with API call
+        :return: CacheEntry object or None if not stored
+        """
+
+        key = endpoint_key(endpoint, options)
+        with self.__lock:
+            row = self.__connection.execute("SELECT kind, envelope, stored_at, etag, last_modified FROM endpoints "
+                                            "WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            kind, envelope, stored_at, etag, last_modified = row
+            envelope = json.loads(envelope)
+
+            if kind == 'opaque':
+                data = envelope
+            else:
+                klass = RESOURCE_CLASSES[self.resource_type(endpoint)]
+                table, list_key, _ = TABLES[klass]
+                records = [json.loads(data) for data, in self.__connection.execute(
+                    "SELECT r.data FROM members m JOIN {} r ON r.url = m.url WHERE m.key = ? "
+                    "ORDER BY m.position".format(table), (key,))]
+                if kind == 'single':
+                    data = records[0] if records else None
+                elif list_key is None:
+                    data = records
+                else:
+                    data = dict(envelope or {}, **{list_key: records})
+
+        if data is None:
+            return None
+        return CacheEntry(endpoint=endpoint, options=options, data=data, stored_at=stored_at,
+                          ttl=self.ttl_for(endpoint), etag=etag, last_modified=last_modified)
+
+    def revalidated(self, entry):
+        """Marks an entry as fresh after the API confirmed it is unchanged
+
+        :param entry: CacheEntry object
+        :return: CacheEntry object
+        """
+
+        entry.stored_at = time.time()
+        with self.__lock, self.__connection as connection:
+            connection.execute("UPDATE endpoints SET stored_at = ? WHERE key = ?",
+                               (entry.stored_at, endpoint_key(entry.endpoint, entry.options)))
+        return entry
+
+    def stored_at(self, endpoint, options=None):
+        """Returns time at which an endpoint was last fetched or revalidated, None if never stored"""
+
+        with self.__lock:
+            row = self.__connection.execute("SELECT stored_at FROM endpoints WHERE key = ?",
+                                            (endpoint_key(endpoint, options),)).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, endpoint, options=None):
+        """Returns True if stored response of an endpoint can be used without fetching it"""
+
+        stored_at = self.stored_at(endpoint, options)
+        return stored_at is not None and time.time() - stored_at < self.ttl_for(endpoint)
+
+    def __where(self, klass, lookups):
+        """Translates lookups on indexed columns to SQL
+
+        :return: tuple of list of SQL conditions, list of parameters and dict of lookups left for Python
+        """
+
+        columns = TABLES[klass][2]
+        conditions, parameters, remaining = [], [], {}
+        for lookup, value in lookups.items():
+            field, operator = parse_lookup(lookup)
+
+            if klass is Fixture and field in ('team', 'season') and operator in ('exact', 'in'):
+                values = list(value) if operator == 'in' else [value]
+                marks = ', '.join('?' * len(values))
+                if field == 'team':
+                    conditions.append("(r.home_team_name IN ({0}) OR r.away_team_name IN ({0}))".format(marks))
+                    parameters.extend(values * 2)
+                else:
+                    conditions.append("r.competition_url IN (SELECT url FROM competitions WHERE year IN ({}))"
+                                      .format(marks))
+                    parameters.extend(str(item) for item in values)
+            elif field not in columns:
+                remaining[lookup] = value
+            elif operator == 'in':
+                values = [to_sql_value(item) for item in value]
+                conditions.append("r.{} IN ({})".format(field, ', '.join('?' * len(values))))
+                parameters.extend(values)
+            elif value is None and operator == 'exact':
+                conditions.append("r.{} IS NULL".format(field))
+            else:
+                conditions.append("r.{} {} ?".format(field, SQL_OPERATORS[operator]))
+                parameters.append(to_sql_value(value))
+        return conditions, parameters, remaining
+
+    def query(self, klass, endpoint=None, options=None, session=None, order_by=None, **lookups):
+        """Returns a data set of stored records matching lookups
+
+        Lookups use the syntax of DataSet.filter. Lookups on indexed columns
+        are run as SQL, others are applied to the objects read. Fixtures can
+        also be looked up by team, matching the name of either team, and by
+        season, matching the year of their competition.
+
+        :param klass: class of records
+        :param endpoint: str, returns only records of this endpoint if given
+        :param options: dict, arguments sent with API call to endpoint
+        :param session: Session object of data sets created by the returned objects, optional
+        :param order_by: str, indexed column to order by, prefixed with - for descending order
+        :return: DataSet object
+        """
+
+        table, list_key, columns = TABLES[klass]
+        conditions, parameters, remaining = self.__where(klass, lookups)
+
+        sql = "SELECT r.data FROM {} r".format(table)
+        if endpoint is not None:
+            sql += " JOIN members m ON m.url = r.url AND m.key = ?"
+            parameters.insert(0, endpoint_key(endpoint, options))
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        if order_by is not None:
+            column = order_by.lstrip('-')
+            if column not in columns:
+                raise ValueError("Cannot order by {!r}, it is not an indexed column".format(order_by))
+            sql += " ORDER BY r.{} {}".format(column, 'DESC' if order_by.startswith('-') else 'ASC')
+        elif endpoint is not None:
+            sql += " ORDER BY m.position"
+
+        with self.__lock:
+            records = [json.loads(data) for data, in self.__connection.execute(sql, parameters)]
+
+        data_set = DataSet(klass=klass, endpoint=endpoint or '', options=options, session=session)
+        data_set._populate(records if list_key is None else {list_key: records})
+        return data_set.filter(**remaining) if remaining else data_set
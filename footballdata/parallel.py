@@ -0,0 +1,167 @@
+"""
+    footballdata.parallel
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements parsing of large API responses in a pool of
+    processes, so decoding and cleaning records does not hold the GIL of the
+    process making the API calls.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import pickle
+import threading
+
+from .decoding import default_decoder
+from .utils import clean_object, parse_datetime
+
+
+class PreparedRecords(list):
+    """Records cleaned by a parser, each a (keys, values) tuple
+
+    Records with equal keys share one keys tuple, so they are pickled once.
+    """
+
+    @staticmethod
+    def to_dict(record):
+        """Returns data of a prepared record as a dict keyed by attribute name"""
+
+        keys, values = record
+        return dict(zip(keys, values))
+
+
+def prepare_records(klass, content, decoder=None):
+    """Decodes a response body and cleans the records of klass in it, run by worker processes
+
+    :param klass: FootballDataObject subclass
+    :param content: bytes, JSON response body
+    :param decoder: callable decoding the body, defaults to the fastest decoder installed
+    :return: PreparedRecords object
+    """
+
+    data = (decoder or default_decoder())(content)
+    if klass.list_key is not None:
+        data = data.get(klass.list_key, []) if data else []
+
+    date_fields = klass.date_fields
+    key_map = klass.key_map
+    shared_keys = {}
+    records = PreparedRecords()
+    for record in data:
+        cleaned = clean_object(record, key_map)
+        for field in date_fields:
+            value = cleaned.get(field)
+            if value and isinstance(value, str):
+                cleaned[field] = parse_datetime(value)
+
+        keys = tuple(cleaned)
+        records.append((shared_keys.setdefault(keys, keys), tuple(cleaned.values())))
+    return records
+
+
+class ProcessPoolParser:
+    """Decodes and cleans large API responses in a pool of processes
+
+    Each response is decoded by one worker, so responses loaded
+    concurrently, for example by Connector.prefetch, are parsed on several
+    cores. Responses smaller than *threshold* bytes are decoded in the
+    calling thread, as sending the records back from a worker costs more
+    than parsing them. Objects are still built in the calling process, on
+    first access, from records with keys cleaned and dates parsed.
+
+    .. code-block:: python
+
+        with ProcessPoolParser(max_workers=4) as parser:
+            connection = Connector(api_key='api key', parser=parser)
+    """
+
+    def __init__(self, max_workers=None, threshold=2 ** 20):
+        """Initialises new parser, processes are started on first use
+
+        :param max_workers: int, number of processes, defaults to the number of CPUs
+        :param threshold: int, size in bytes of the smallest response parsed in the pool
+        """
+
+        self.max_workers = max_workers
+        self.threshold = threshold
+        self.__executor = None
+        self.__lock = threading.Lock()
+        self.__decoders = {}
+
+    def __repr__(self):
+        return "ProcessPoolParser <{!r} workers>".format(self.max_workers)
+
+    @property
+    def executor(self):
+        """Returns ProcessPoolExecutor running the workers, creating it if required"""
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.__executor
+
+    def parse(self, klass, content, decoder=None):
+        """Decodes a response body and cleans its records of klass in a worker process
+
+        :param klass: FootballDataObject subclass
+        :param content: bytes, JSON response body
+        :param decoder: picklable callable decoding the body, defaults to the fastest decoder installed
+        :return: PreparedRecords object, records in order of the response
+        """
+        return self.executor.submit(prepare_records, klass, content, decoder).result()
+
+    def decoder(self, klass, fallback=None):
+        """Returns a decoder for fetch_data_from_api preparing records of klass in the pool
+
+        The same decoder is returned for a class, so concurrent calls for the
+        same data are still coalesced. Responses are decoded by fallback in
+        the workers as well, so it is sent to them and has to be picklable,
+        like json.loads or a function defined at module level.
+
+        :param klass: FootballDataObject subclass
+        :param fallback: callable decoding response bodies, defaults to the fastest decoder installed
+        :return: callable taking a response body
+        """
+
+        if fallback is not None:
+            try:
+                pickle.dumps(fallback)
+            except (pickle.PicklingError, TypeError, AttributeError) as error:
+                raise TypeError("Decoder {!r} cannot be sent to worker processes: {}".format(fallback, error))
+
+        key = (klass, fallback)
+        with self.__lock:
+            if key not in self.__decoders:
+                self.__decoders[key] = _PoolDecoder(self, klass, fallback or default_decoder())
+            return self.__decoders[key]
+
+    def close(self):
+        """Stops worker processes"""
+
+        with self.__lock:
+            executor, self.__executor = self.__executor, None
+        if executor is not None:
+            executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class _PoolDecoder:
+    """Decoder sending large bodies to the pool of a parser"""
+
+    def __init__(self, parser, klass, fallback):
+        self.parser = parser
+        self.klass = klass
+        self.fallback = fallback
+
+    def __call__(self, content):
+        if len(content) < self.parser.threshold:
+            return self.fallback(content)
+        return self.parser.parse(self.klass, content, self.fallback)
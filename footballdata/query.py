@@ -0,0 +1,111 @@
+"""
+    footballdata.query
+    ~~~~~~~~~~~~~~~~~~
+
+    This module implements the indexes used to query data sets.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Hashable
+
+
+# Lookup operators supported by DataSet.filter, exact is used if no operator is given
+OPERATORS = ('exact', 'in', 'gt', 'gte', 'lt', 'lte')
+
+
+def parse_lookup(lookup):
+    """Splits a lookup such as date__gte into field name and operator
+
+    :param lookup: str, field name optionally followed by __ and an operator
+    :return: tuple of field name and operator
+    """
+
+    field, separator, operator = lookup.rpartition('__')
+    if separator and operator in OPERATORS:
+        return field, operator
+    return lookup, 'exact'
+
+
+def is_empty(value):
+    """Returns True for values the API uses for missing data"""
+    return value is None or value == ''
+
+
+class HashIndex:
+    """Index mapping values of a field to the positions having that value"""
+
+    def __init__(self, values):
+        """Builds index
+
+        :param values: iterable of field values, in order of position
+        """
+
+        self.positions = {}
+        self.unhashable = []
+        for position, value in enumerate(values):
+            if isinstance(value, Hashable):
+                self.positions.setdefault(value, []).append(position)
+            else:
+                self.unhashable.append((position, value))
+
+    def lookup(self, value):
+        """Returns positions having value
+
+        :param value: value to look up
+        :return: list of positions
+        """
+
+        positions = list(self.positions.get(value, [])) if isinstance(value, Hashable) else []
+        positions.extend(position for position, other in self.unhashable if other == value)
+        return positions
+
+
+class SortedIndex:
+    """Index of positions sorted by values of a field
+
+    Positions with empty values are left out of the index, as they never
+    match a range lookup.
+    """
+
+    def __init__(self, values):
+        """Builds index
+
+        :param values: iterable of field values, in order of position
+        :raises TypeError: if values cannot be compared with each other
+        """
+
+        entries = sorted((value, position) for position, value in enumerate(values) if not is_empty(value))
+        self.values = [value for value, _ in entries]
+        self.positions = [position for _, position in entries]
+
+    def range(self, lower=None, upper=None, include_lower=True, include_upper=True):
+        """Returns positions with values within bounds
+
+        :param lower: lower bound, None for no bound
+        :param upper: upper bound, None for no bound
+        :param include_lower: bool, True if values equal to lower bound match
+        :param include_upper: bool, True if values equal to upper bound match
+        :return: list of positions in order of value
+        """
+
+        start, end = 0, len(self.values)
+        if lower is not None:
+            start = (bisect_left if include_lower else bisect_right)(self.values, lower)
+        if upper is not None:
+            end = (bisect_right if include_upper else bisect_left)(self.values, upper)
+        return self.positions[start:end]
+
+    def lookup(self, operator, value):
+        """Returns positions matching a range operator
+
+        :param operator: str, one of gt, gte, lt or lte
+        :param value: value to compare with
+        :return: list of positions
+        """
+
+        if operator in ('gt', 'gte'):
+            return self.range(lower=value, include_lower=operator == 'gte')
+        return self.range(upper=value, include_upper=operator == 'lte')
@@ -0,0 +1,287 @@
+"""
+    footballdata.refresh
+    ~~~~~~~~~~~~~~~~~~~~
+
+    This module implements refreshing of data sets in the background, so
+    readers are served the last good objects while the API is called.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import TTLResolver
+from .scheduler import priority, LOW
+
+
+logger = logging.getLogger(__name__)
+
+
+class FreshnessPolicy:
+    """Class to represent how long data of a data set is fresh and when it is refreshed"""
+
+    __slots__ = ('ttl', 'refresh_ahead', 'retry_delay')
+
+    def __init__(self, ttl, refresh_ahead=0.2, retry_delay=10):
+        """Initialises new policy
+
+        :param ttl: float, number of seconds for which data is fresh
+        :param refresh_ahead: float, fraction of ttl before expiry at which the refresh starts
+        :param retry_delay: float, seconds before the first retry of a failed refresh, doubled on each failure
+        """
+
+        if ttl <= 0:
+            raise ValueError('ttl must be positive')
+        if not 0 <= refresh_ahead < 1:
+            raise ValueError('refresh_ahead must be at least 0 and less than 1')
+
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.retry_delay = retry_delay
+
+    def __repr__(self):
+        return "FreshnessPolicy <{!r}s>".format(self.ttl)
+
+    @property
+    def interval(self):
+        """Returns seconds between a successful refresh and the next one"""
+        return self.ttl * (1 - self.refresh_ahead)
+
+    def retry_after(self, failures):
+        """Returns seconds to wait before retrying a failed refresh
+
+        :param failures: int, number of consecutive failures, starting at 1
+        :return: float, at most the refresh interval
+        """
+        return min(self.retry_delay * 2 ** (failures - 1), self.interval)
+
+
+class RefreshEntry:
+    """Class to represent the refresh state of a registered data set"""
+
+    __slots__ = ('data_set', 'policy', 'refreshed_at', 'due', 'failures', 'error', 'running')
+
+    def __init__(self, data_set, policy):
+        """Initialises new entry, due at once unless the data set is loaded
+
+        :param data_set: DataSet object
+        :param policy: FreshnessPolicy object
+        """
+
+        now = time.monotonic()
+        self.data_set = data_set
+        self.policy = policy
+        self.refreshed_at = now if data_set.loaded else None
+        self.due = now + policy.interval if data_set.loaded else now
+        self.failures = 0
+        self.error = None
+        self.running = False
+
+    def __repr__(self):
+        return "RefreshEntry <{!r}>".format(self.data_set.endpoint)
+
+    @property
+    def age(self):
+        """Returns seconds since data was last loaded, None if never loaded"""
+        return time.monotonic() - self.refreshed_at if self.refreshed_at is not None else None
+
+    @property
+    def stale(self):
+        """Returns True if data is older than the ttl of its policy or was never loaded"""
+
+        age = self.age
+        return age is None or age > self.policy.ttl
+
+
+class BackgroundRefresher(TTLResolver):
+    """Refreshes registered data sets on worker threads before their data expires
+
+    Data sets are refreshed in place with DataSet.refresh, so the data set
+    returned by a get method of a connector stays current without
+    force_update, and reading it never waits for the API. Refreshes which
+    fail are retried with exponential backoff while the last good objects
+    are served. API calls are sent with LOW priority, so interactive calls
+    are sent first.
+
+    .. code-block:: python
+
+        with BackgroundRefresher() as refresher:
+            fixtures = refresher.register(connection.get_fixtures(), ttl=60)
+    """
+
+    def __init__(self, max_workers=2, ttl=None, default_ttl=5 * 60):
+        """Initialises new refresher, the worker threads are started on first registration
+
+        :param max_workers: int, number of data sets refreshed concurrently
+        :param ttl: dict mapping resource type to seconds, or seconds for all types, defaults to those of FileCache
+        :param default_ttl: seconds for which data of unknown resource types is fresh
+        """
+
+        super().__init__(ttl, default_ttl)
+        self.max_workers = max_workers
+
+        # Entries by id of data set, and heap of (due, sequence, entry) items, outdated items are skipped
+        self.__entries = {}
+        self.__queue = []
+        self.__sequence = itertools.count()
+        self.__condition = threading.Condition()
+        self.__thread = None
+        self.__executor = None
+        self.__stopping = False
+
+    def __repr__(self):
+        return "BackgroundRefresher <{!r} data sets>".format(len(self.__entries))
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def register(self, data_set, ttl=None, policy=None):
+        """Keeps a data set fresh, loading it in the background if it is not loaded
+
+        :param data_set: DataSet object with an endpoint
+        :param ttl: float, seconds for which data is fresh, defaults to the ttl of its resource type
+        :param policy: FreshnessPolicy object, used instead of ttl if given
+        :return: data set, so the method can wrap get methods
+        """
+
+        if getattr(data_set.session, 'asynchronous', False):
+            raise TypeError('AsyncDataSet objects are refreshed by awaiting their refresh method')
+        if not data_set.endpoint:
+            raise ValueError('Only data sets fetched from the API can be refreshed')
+        if policy is None:
+            policy = FreshnessPolicy(ttl if ttl is not None else self.ttl_for(data_set.endpoint))
+
+        entry = RefreshEntry(data_set, policy)
+        with self.__condition:
+            self.__entries[id(data_set)] = entry
+            self.__schedule(entry, entry.due)
+            self.__start()
+        return data_set
+
+    def unregister(self, data_set):
+        """Stops refreshing a data set, a refresh in progress is completed"""
+
+        with self.__condition:
+            self.__entries.pop(id(data_set), None)
+
+    def status(self, data_set):
+        """Returns refresh state of a data set
+
+        :param data_set: DataSet object
+        :return: RefreshEntry object, None if data set is not registered
+        """
+        return self.__entries.get(id(data_set))
+
+    def refresh_soon(self, data_set):
+        """Refreshes a registered data set without waiting until it is due
+
+        :param data_set: DataSet object
+        :return: None
+        """
+
+        with self.__condition:
+            entry = self.__entries.get(id(data_set))
+            if entry is None:
+                raise KeyError('Data set is not registered')
+            if not entry.running:
+                self.__schedule(entry, time.monotonic())
+
+    def __schedule(self, entry, due):
+        """Queues refresh of an entry at a monotonic time, must be called with condition acquired"""
+
+        entry.due = due
+        heapq.heappush(self.__queue, (due, next(self.__sequence), entry))
+        self.__condition.notify_all()
+
+    def __start(self):
+        """Starts worker threads if not running, must be called with condition acquired"""
+
+        if self.__thread is None:
+            self.__stopping = False
+            self.__executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                 thread_name_prefix='footballdata-refresh')
+            self.__thread = threading.Thread(target=self.__run, name='footballdata-refresher', daemon=True)
+            self.__thread.start()
+
+    def __run(self):
+        """Submits due refreshes to the executor until stopped"""
+
+        with self.__condition:
+            while not self.__stopping:
+                now = time.monotonic()
+                while self.__queue and self.__queue[0][0] <= now:
+                    due, _, entry = heapq.heappop(self.__queue)
+                    if entry.running or entry.due != due or self.__entries.get(id(entry.data_set)) is not entry:
+                        # Rescheduled, running or unregistered since queued
+                        continue
+                    entry.running = True
+                    self.__executor.submit(self.__refresh, entry)
+                self.__condition.wait(self.__queue[0][0] - now if self.__queue else None)
+
+    def __refresh(self, entry):
+        """Refreshes data set of an entry and schedules its next refresh"""
+
+        data_set = entry.data_set
+        error = None
+        try:
+            with priority(LOW):
+                if data_set.loaded:
+                    refreshed = data_set.refresh()
+                else:
+                    len(data_set)
+                    refreshed = True
+        except Exception as exception:
+            logger.warning("Refreshing %r failed, serving last good data", data_set.endpoint, exc_info=True)
+            refreshed, error = False, exception
+
+        now = time.monotonic()
+        with self.__condition:
+            entry.running = False
+            if refreshed:
+                entry.refreshed_at = now
+                entry.failures = 0
+                entry.error = None
+                delay = entry.policy.interval
+            else:
+                entry.failures += 1
+                entry.error = error
+                delay = entry.policy.retry_after(entry.failures)
+            if not self.__stopping and self.__entries.get(id(data_set)) is entry:
+                self.__schedule(entry, now + delay)
+
+    def stop(self, wait=True):
+        """Stops worker threads, registered data sets are kept and refreshed again by start
+
+        :param wait: bool, waits for refreshes in progress if True
+        :return: None
+        """
+
+        with self.__condition:
+            thread, executor = self.__thread, self.__executor
+            self.__thread = self.__executor = None
+            self.__stopping = True
+            self.__condition.notify_all()
+
+        if thread is not None:
+            thread.join()
+            executor.shutdown(wait=wait)
+
+    def start(self):
+        """Starts worker threads again after stop, refreshing data sets which became due meanwhile"""
+
+        with self.__condition:
+            self.__start()
+            for entry in self.__entries.values():
+                self.__schedule(entry, entry.due)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,291 @@
+"""
+    footballdata.scheduler
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements scheduling of API calls within the request quota
+    of football-data.org.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+# Priorities of API calls, calls with lower values are sent first
+HIGH = 0
+NORMAL = 1
+LOW = 2
+
+_priority = ContextVar('priority', default=NORMAL)
+
+
+@contextmanager
+def priority(level):
+    """Sets priority of API calls made in the current thread or task
+
+    :param level: int, one of HIGH, NORMAL or LOW
+    """
+
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority():
+    """Returns priority of API calls made in the current thread or task"""
+    return _priority.get()
+
+
+class RequestScheduler:
+    """Token bucket keeping API calls within the request quota
+
+    The bucket starts with *rate* tokens which are refilled over *period*
+    seconds. Once the API reports the number of remaining requests and the
+    time until its counter resets, the bucket follows these values instead.
+    Calls which find the bucket empty are queued by priority. Calls answered
+    with 429 or a server error are retried with jittered exponential backoff.
+    """
+
+    # Response headers with the remaining number of requests and seconds until counter reset
+    remaining_headers = ('X-Requests-Available-Minute', 'X-Requests-Available')
+    reset_headers = ('X-RequestCounter-Reset', 'Retry-After')
+
+    retry_statuses = (429, 500, 502, 503, 504)
+
+    def __init__(self, rate=10, period=60, max_retries=3, backoff=1.0, max_backoff=60):
+        """Initialises new scheduler
+
+        :param rate: int, number of requests allowed per period until the API reports its quota
+        :param period: float, length of quota period in seconds
+        :param max_retries: int, number of times a failed call is retried
+        :param backoff: float, base delay in seconds between retries
+        :param max_backoff: float, maximum delay in seconds between retries
+        """
+
+        self.rate = rate
+        self.period = period
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.__capacity = rate
+        self.__tokens = float(rate)
+        self.__updated = time.monotonic()
+        self.__reset_at = None
+        self.__in_flight = 0
+
+        # Heap of (priority, sequence) tickets of waiting calls
+        self.__waiting = []
+        self.__sequence = itertools.count()
+        self.__condition = threading.Condition()
+
+    def __repr__(self):
+        return "RequestScheduler <{!r}/{!r}s>".format(self.__capacity, self.period)
+
+    @property
+    def tokens(self):
+        """Returns number of requests which can be sent right now"""
+
+        with self.__condition:
+            self.__refill(time.monotonic())
+            return int(self.__tokens)
+
+    def __refill(self, now):
+        """Adds tokens for time passed since last refill"""
+
+        if self.__reset_at is not None:
+            # Quota reported by API, wait for the counter to reset
+            if now >= self.__reset_at:
+                self.__tokens = float(self.__capacity)
+                self.__reset_at = None
+                self.__updated = now
+            return
+
+        self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated) * self.__capacity / self.period)
+        self.__updated = now
+
+    def __try_acquire(self, ticket):
+        """Takes a token for ticket if it is first in queue
+
+        Must be called with condition acquired.
+
+        :return: 0 if acquired, seconds until next token if first in queue, None otherwise
+        """
+
+        if self.__waiting[0] != ticket:
+            return None
+
+        now = time.monotonic()
+        self.__refill(now)
+        if self.__tokens >= 1:
+            heapq.heappop(self.__waiting)
+            self.__tokens -= 1
+            self.__in_flight += 1
+            self.__condition.notify_all()
+            return 0
+
+        if self.__reset_at is not None:
+            return max(self.__reset_at - now, 0.001)
+        return (1 - self.__tokens) * self.period / self.__capacity
+
+    def acquire(self, level=None):
+        """Blocks until a request can be sent
+
+        :param level: int, priority of request, defaults to priority of current thread
+        """
+
+        ticket = (current_priority() if level is None else level, next(self.__sequence))
+        with self.__condition:
+            heapq.heappush(self.__waiting, ticket)
+            while True:
+                delay = self.__try_acquire(ticket)
+                if delay == 0:
+                    return
+                self.__condition.wait(delay)
+
+    async def acquire_async(self, level=None):
+        """Waits without blocking the event loop until a request can be sent
+
+        :param level: int, priority of request, defaults to priority of current task
+        """
+
+        import asyncio
+
+        ticket = (current_priority() if level is None else level, next(self.__sequence))
+        with self.__condition:
+            heapq.heappush(self.__waiting, ticket)
+
+        try:
+            while True:
+                with self.__condition:
+                    delay = self.__try_acquire(ticket)
+                if delay == 0:
+                    return
+                await asyncio.sleep(0.01 if delay is None else delay)
+        except asyncio.CancelledError:
+            with self.__condition:
+                self.__waiting.remove(ticket)
+                heapq.heapify(self.__waiting)
+                self.__condition.notify_all()
+            raise
+
+    def release(self, status=None, headers=None):
+        """Updates the bucket after a request is completed
+
+        :param status: int, status code of response, None if request failed
+        :param headers: dict like object of response headers, optional
+        """
+
+        headers = headers or {}
+        remaining = next((headers[name] for name in self.remaining_headers if name in headers), None)
+        reset = next((headers[name] for name in self.reset_headers if name in headers), None)
+
+        with self.__condition:
+            now = time.monotonic()
+            self.__in_flight = max(self.__in_flight - 1, 0)
+
+            if remaining is not None:
+                remaining = int(remaining)
+                self.__capacity = max(self.__capacity, remaining + self.__in_flight + 1)
+                self.__tokens = float(max(remaining - self.__in_flight, 0))
+            if status == 429:
+                self.__tokens = 0.0
+            if reset is not None and (remaining is not None or status == 429):
+                self.__reset_at = now + float(reset)
+
+            self.__condition.notify_all()
+
+    def backoff_delay(self, attempt):
+        """Returns a random delay before retrying a failed call
+
+        :param attempt: int, number of attempts made so far, starting at 0
+        :return: float, seconds
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    @staticmethod
+    def __status(response):
+        """Returns status code of a requests or aiohttp response"""
+        return getattr(response, 'status_code', None) or response.status
+
+    def __should_retry(self, response, attempt):
+        """Returns seconds to wait before retrying response, None if it should not be retried"""
+
+        status = self.__status(response)
+        if status not in self.retry_statuses or attempt >= self.max_retries:
+            return None
+        if status == 429 and any(name in response.headers for name in self.reset_headers):
+            # Bucket waits until the counter is reset
+            return 0
+        return self.backoff_delay(attempt)
+
+    @staticmethod
+    def __discard(response):
+        """Closes a response which is retried, so that its connection is returned to the pool"""
+
+        close = getattr(response, 'close', None)
+        if close is not None:
+            close()
+
+    def request(self, send, level=None):
+        """Sends a request when the quota allows, retrying failed calls
+
+        :param send: callable returning a response object with status_code and headers
+        :param level: int, priority of request, defaults to priority of current thread
+        :return: response object
+        """
+
+        attempt = 0
+        while True:
+            self.acquire(level)
+            try:
+                response = send()
+            except BaseException:
+                self.release()
+                raise
+            self.release(self.__status(response), response.headers)
+
+            delay = self.__should_retry(response, attempt)
+            if delay is None:
+                response.retries = attempt
+                return response
+            self.__discard(response)
+            time.sleep(delay)
+            attempt += 1
+
+    async def request_async(self, send, level=None):
+        """Sends a request from a coroutine when the quota allows, retrying failed calls
+
+        :param send: coroutine function returning a response object with status_code and headers
+        :param level: int, priority of request, defaults to priority of current task
+        :return: response object
+        """
+
+        import asyncio
+
+        attempt = 0
+        while True:
+            await self.acquire_async(level)
+            try:
+                response = await send()
+            except BaseException:
+                self.release()
+                raise
+            self.release(self.__status(response), response.headers)
+
+            delay = self.__should_retry(response, attempt)
+            if delay is None:
+                response.retries = attempt
+                return response
+            self.__discard(response)
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,251 @@
+"""
+    footballdata.snapshot
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements binary snapshots of loaded data sets, used to
+    warm start a Connector without API calls.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import weakref
+from collections.abc import Sequence
+from datetime import datetime
+
+from .cache import endpoint_key
+
+
+# File starts with magic bytes, format version, offset and length of index
+MAGIC = b'FDSNAP\x00\x00'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQ')
+
+# Offsets of records within a block
+OFFSET = struct.Struct('<Q')
+
+
+def encode_default(value):
+    """Encodes values of built objects which are not JSON serializable"""
+
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError("{!r} is not JSON serializable".format(value))
+
+
+def write_snapshot(path, data_sets, roots=None):
+    """Writes data sets to a snapshot file
+
+    Each data set is written as a block of compact JSON records preceded by
+    their offsets, so single records can be decoded without reading the
+    block. The file is replaced atomically.
+
+    :param path: str, path of snapshot file
+    :param data_sets: iterable of loaded DataSet objects with an endpoint
+    :param roots: dict mapping names to data sets restored by name, such as the connector competitions, optional
+    :return: None
+    """
+
+    roots = roots or {}
+    entries = {}
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(file_descriptor, 'wb') as snapshot_file:
+            snapshot_file.write(b'\x00' * HEADER.size)
+
+            for data_set in data_sets:
+                key = endpoint_key(data_set.endpoint, data_set.options)
+                if key in entries:
+                    continue
+
+                records = [json.dumps(row, separators=(',', ':'), default=encode_default).encode('utf-8')
+                           for row in data_set._rows()]
+                offsets, position = [], 0
+                for record in records:
+                    offsets.append(position)
+                    position += len(record)
+                offsets.append(position)
+
+                entries[key] = {
+                    'klass': data_set.klass.__name__,
+                    'endpoint': data_set.endpoint,
+                    'options': data_set.options,
+                    'offset': snapshot_file.tell(),
+                    'count': len(records),
+                }
+                snapshot_file.write(b''.join(OFFSET.pack(offset) for offset in offsets))
+                snapshot_file.write(b''.join(records))
+
+            index = json.dumps({
+                'created_at': time.time(),
+                'data_sets': entries,
+                'roots': {name: endpoint_key(data_set.endpoint, data_set.options)
+                          for name, data_set in roots.items()},
+            }).encode('utf-8')
+            index_offset = snapshot_file.tell()
+            snapshot_file.write(index)
+            snapshot_file.seek(0)
+            snapshot_file.write(HEADER.pack(MAGIC, VERSION, 0, index_offset, len(index)))
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class SnapshotRecords(Sequence):
+    """Records of a data set in a snapshot, decoded on first access"""
+
+    __slots__ = ('__buffer', '__offset', '__count', '__decoded', '__weakref__')
+
+    def __init__(self, buffer, offset, count):
+        """Initialises records
+
+        :param buffer: mmap of snapshot file
+        :param offset: int, position of block in file
+        :param count: int, number of records in block
+        """
+
+        self.__buffer = buffer
+        self.__offset = offset
+        self.__count = count
+
+        # Records decoded when the snapshot is closed, None while they are read from the file
+        self.__decoded = None
+
+    def __len__(self):
+        return self.__count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self.__count))]
+        if index < 0:
+            index += self.__count
+        if not 0 <= index < self.__count:
+            raise IndexError('Index out of range')
+        if self.__decoded is not None:
+            return self.__decoded[index]
+
+        start, = OFFSET.unpack_from(self.__buffer, self.__offset + index * OFFSET.size)
+        end, = OFFSET.unpack_from(self.__buffer, self.__offset + (index + 1) * OFFSET.size)
+        data_start = self.__offset + (self.__count + 1) * OFFSET.size
+        return json.loads(self.__buffer[data_start + start:data_start + end])
+
+    def detach(self):
+        """Decodes all records, so they are still available once the snapshot file is closed"""
+
+        if self.__decoded is None:
+            self.__decoded = [self[index] for index in range(self.__count)]
+            self.__buffer = None
+
+
+class Snapshot:
+    """Memory mapped snapshot file
+
+    Only the index is read when a snapshot is opened. Records of a data set
+    are decoded when its objects are first accessed. The file stays mapped
+    until the snapshot is closed.
+    """
+
+    def __init__(self, path):
+        """Opens snapshot file
+
+        :param path: str, path of snapshot file
+        :raises ValueError: if file is not a snapshot or has an unsupported version
+        """
+
+        self.path = path
+        with open(path, 'rb') as snapshot_file:
+            self.__buffer = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            index = self.__read_index()
+        except ValueError:
+            self.__buffer.close()
+            raise
+        self.created_at = index['created_at']
+        self.entries = index['data_sets']
+        self.roots = index['roots']
+
+        # Keys of data sets not yet handed to a data set, and records handed to data sets still in use
+        self.__pending = set(self.entries)
+        self.__taken = weakref.WeakSet()
+        self.__lock = threading.Lock()
+
+    def __read_index(self):
+        """Returns index of data sets in snapshot file
+
+        :raises ValueError: if file is not a snapshot or has an unsupported version
+        """
+
+        if len(self.__buffer) < HEADER.size:
+            raise ValueError("{} is not a snapshot file".format(self.path))
+        magic, version, _, index_offset, index_length = HEADER.unpack_from(self.__buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("{} is not a snapshot file".format(self.path))
+        if version != VERSION:
+            raise ValueError("Snapshot version {} is not supported, expected {}".format(version, VERSION))
+        return json.loads(self.__buffer[index_offset:index_offset + index_length])
+
+    def __repr__(self):
+        return "Snapshot <{!r}>".format(self.path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def root(self, name):
+        """Returns entry of a data set saved by name, None if not saved"""
+
+        key = self.roots.get(name)
+        return self.entries[key] if key is not None else None
+
+    def take(self, endpoint, options=None):
+        """Returns records of an endpoint, once
+
+        A data set refreshed with force_update asks again and is fetched from
+        the API.
+
+        :param endpoint: str, API endpoint
+        :param options: dict, arguments sent with API call
+        :return: SnapshotRecords object or None if not in snapshot or already taken
+        """
+
+        key = endpoint_key(endpoint, options)
+        with self.__lock:
+            if key not in self.__pending or self.__buffer is None:
+                return None
+            self.__pending.discard(key)
+
+            entry = self.entries[key]
+            records = SnapshotRecords(self.__buffer, entry['offset'], entry['count'])
+            self.__taken.add(records)
+        return records
+
+    def close(self):
+        """Unmaps snapshot file
+
+        Records already handed to data sets are decoded first, so those data
+        sets keep their objects. Data sets not yet taken are fetched from the
+        API.
+        """
+
+        with self.__lock:
+            if self.__buffer is None:
+                return
+            for records in list(self.__taken):
+                records.detach()
+            self.__buffer.close()
+            self.__buffer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
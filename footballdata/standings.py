@@ -0,0 +1,175 @@
+"""
+    footballdata.standings
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements computation of league tables from fixtures.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+from .datasets import DataSet, Standing
+
+
+class LeagueTable:
+    """Class to compute standings of teams from results of fixtures
+
+    Fixtures can be added and updated one at a time. Updating a fixture
+    replaces its previous result, so a table can follow live results without
+    being computed again from all fixtures.
+    """
+
+    # Statuses of fixtures whose results are counted
+    counted_statuses = ('FINISHED',)
+
+    def __init__(self, match_day=None, points_for_win=3, points_for_draw=1):
+        """Initialises empty league table
+
+        :param match_day: int, count only fixtures up to and including this match day, optional
+        :param points_for_win: int, points awarded for a win
+        :param points_for_draw: int, points awarded for a draw
+        """
+
+        self.match_day = match_day
+        self.points_for_win = points_for_win
+        self.points_for_draw = points_for_draw
+
+        # Counted results by fixture key and totals by team name
+        self.__results = {}
+        self.__rows = {}
+
+    @classmethod
+    def from_fixtures(cls, fixtures, **kwargs):
+        """Computes league table from fixtures
+
+        :param fixtures: iterable of Fixture objects
+        :param kwargs: arguments of LeagueTable constructor
+        :return: LeagueTable object
+        """
+
+        table = cls(**kwargs)
+        for fixture in fixtures:
+            table.update(fixture)
+        return table
+
+    def __repr__(self):
+        return "LeagueTable <{!r} teams>".format(len(self.__rows))
+
+    @staticmethod
+    def __key(fixture):
+        """Returns key identifying a fixture"""
+
+        links = getattr(fixture, 'links', None)
+        if links and 'self' in links:
+            return links['self']['href']
+        return fixture.home_team_name, fixture.away_team_name, getattr(fixture, 'matchday', None)
+
+    def __result(self, fixture):
+        """Returns counted result of fixture as (home team, away team, home goals, away goals) or None"""
+
+        if fixture.status not in self.counted_statuses:
+            return None
+        if self.match_day is not None and (getattr(fixture, 'matchday', None) or 0) > self.match_day:
+            return None
+
+        result = fixture.result or {}
+        home_goals, away_goals = result.get('goalsHomeTeam'), result.get('goalsAwayTeam')
+        if home_goals is None or away_goals is None:
+            return None
+        return fixture.home_team_name, fixture.away_team_name, home_goals, away_goals
+
+    def __row(self, team_name):
+        """Returns totals of a team, adding the team if required"""
+
+        if team_name not in self.__rows:
+            self.__rows[team_name] = {
+                'played_games': 0, 'wins': 0, 'draws': 0, 'losses': 0, 'goals': 0, 'goals_against': 0,
+                'home': {'goals': 0, 'goalsAgainst': 0, 'wins': 0, 'draws': 0, 'losses': 0},
+                'away': {'goals': 0, 'goalsAgainst': 0, 'wins': 0, 'draws': 0, 'losses': 0},
+            }
+        return self.__rows[team_name]
+
+    def __apply(self, result, sign):
+        """Adds a result to totals of both teams, or removes it if sign is -1"""
+
+        home_team, away_team, home_goals, away_goals = result
+        for team_name, venue, scored, conceded in ((home_team, 'home', home_goals, away_goals),
+                                                   (away_team, 'away', away_goals, home_goals)):
+            if scored > conceded:
+                outcome = 'wins'
+            elif scored < conceded:
+                outcome = 'losses'
+            else:
+                outcome = 'draws'
+
+            row = self.__row(team_name)
+            row['played_games'] += sign
+            row['goals'] += sign * scored
+            row['goals_against'] += sign * conceded
+            row[outcome] += sign
+            row[venue]['goals'] += sign * scored
+            row[venue]['goalsAgainst'] += sign * conceded
+            row[venue][outcome] += sign
+
+    def update(self, fixture):
+        """Adds a fixture or replaces its previous result
+
+        Fixtures which are not finished, or are after the match day of the
+        table, are not counted but their teams are listed in the table.
+
+        :param fixture: Fixture object
+        :return: None
+        """
+
+        key = self.__key(fixture)
+        previous = self.__results.pop(key, None)
+        if previous is not None:
+            self.__apply(previous, -1)
+
+        self.__row(fixture.home_team_name)
+        self.__row(fixture.away_team_name)
+
+        result = self.__result(fixture)
+        if result is not None:
+            self.__results[key] = result
+            self.__apply(result, 1)
+
+    def remove(self, fixture):
+        """Removes result of a fixture from table
+
+        :param fixture: Fixture object
+        :return: None
+        """
+
+        previous = self.__results.pop(self.__key(fixture), None)
+        if previous is not None:
+            self.__apply(previous, -1)
+
+    def standings(self):
+        """Returns standings of all teams
+
+        Teams are ordered by points, goal difference, goals scored and name.
+
+        :return: DataSet of Standing objects
+        """
+
+        standings = []
+        for team_name, row in self.__rows.items():
+            standing = Standing(team_name=team_name,
+                                played_games=row['played_games'],
+                                wins=row['wins'],
+                                draws=row['draws'],
+                                losses=row['losses'],
+                                goals=row['goals'],
+                                goals_against=row['goals_against'],
+                                goal_difference=row['goals'] - row['goals_against'],
+                                points=row['wins'] * self.points_for_win + row['draws'] * self.points_for_draw,
+                                home=dict(row['home']),
+                                away=dict(row['away']))
+            standings.append(standing)
+
+        standings.sort(key=lambda item: (-item.points, -item.goal_difference, -item.goals, item.team_name))
+        for position, standing in enumerate(standings, 1):
+            standing.position = position
+
+        return DataSet(klass=Standing, data_list=standings)
@@ -0,0 +1,232 @@
+"""
+    footballdata.streaming
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements incremental parsing of API responses, so records
+    of large lists are available one by one while the body is downloaded.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import codecs
+import json
+import time
+
+import requests
+
+from .utils import lookup_cache, report_request, request_instrumentation, response_error
+
+
+# Bytes read from the response at a time
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_whitespace = ' \t\n\r'
+_number_characters = '0123456789.eE+-'
+_end = object()
+
+
+class _Buffer:
+    """Text decoded from a stream of byte chunks, consumed from the front"""
+
+    def __init__(self, chunks):
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.position = 0
+        self.exhausted = False
+
+    def read(self):
+        """Appends next chunk to text, dropping consumed text
+
+        :return: False if stream is exhausted
+        """
+
+        if self.exhausted:
+            return False
+        chunk = next(self.__chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            self.text = self.text[self.position:] + self.__decoder.decode(b'', final=True)
+        else:
+            self.text = self.text[self.position:] + self.__decoder.decode(chunk)
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Returns next character which is not white space, empty string at end of stream"""
+
+        while True:
+            while self.position < len(self.text) and self.text[self.position] in _whitespace:
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if not self.read():
+                return ''
+
+    def expect(self, characters):
+        """Consumes next character, raising ValueError if it is not one of characters"""
+
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError("Expected one of {!r} at position {}, found {!r}".format(
+                characters, self.position, character))
+        self.position += 1
+        return character
+
+    def value(self):
+        """Consumes and returns next JSON value, reading chunks until it is complete"""
+
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.position)
+            except ValueError:
+                if not self.read():
+                    raise
+                continue
+            # A number at the end of text, or followed by a character of a number, may continue in the next chunk
+            number = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if not number or self.exhausted or (end < len(self.text) and self.text[end] not in _number_characters):
+                self.position = end
+                return value
+            self.read()
+
+
+def iter_json_items(chunks, key=None):
+    """Yields items of a JSON list one by one from chunks of a JSON document
+
+    Only the item being parsed is kept in memory, besides values preceding
+    the list.
+
+    :param chunks: iterable of bytes forming a UTF-8 JSON document
+    :param key: str, key of the list in the top level object, None if the document is a list
+    :return: generator of decoded items, empty if the object has no list under key
+    """
+
+    buffer = _Buffer(chunks)
+    if key is not None:
+        buffer.expect('{')
+        if buffer.peek() == '}':
+            return
+        while True:
+            name = buffer.value()
+            buffer.expect(':')
+            if name == key and buffer.peek() == '[':
+                break
+            buffer.value()
+            if buffer.expect(',}') == '}':
+                return
+
+    buffer.expect('[')
+    if buffer.peek() == ']':
+        return
+    while True:
+        yield buffer.value()
+        if buffer.expect(',]') == ']':
+            return
+
+
+def _chunks(response, chunk_size):
+    """Returns body of response as chunks, read from the connection if not read already"""
+
+    if response.raw is None:
+        # Responses built by transports such as ReplayTransport have their body in memory
+        return [response.content]
+    return response.iter_content(chunk_size)
+
+
+def _items(data, key):
+    """Returns list under key of decoded response, the response itself if key is None"""
+
+    if key is None:
+        return data or []
+    return data.get(key, []) if data else []
+
+
+def stream_data_from_api(endpoint, key=None, api_key='', options=None, session=None, chunk_size=CHUNK_SIZE):
+    """Fetches a list from the endpoint and yields its records as they are downloaded
+
+    Streamed responses are not stored in the cache of the session, fresh
+    cached responses are used if available and stale ones are revalidated.
+
+    :param endpoint: api endpoint to connect
+    :param key: str, key of the list in the response, None if the response is a list
+    :param api_key: optional api key
+    :param options: data to sent with api call
+    :param session: Session object to send the request with, optional
+    :param chunk_size: int, bytes read at a time
+    :return: generator of decoded records
+    """
+
+    params = options if options else {}
+
+    # Measure the call only if someone listens
+    instrumentation = request_instrumentation(session)
+    start = time.perf_counter()
+
+    headers = {}
+    if api_key:
+        headers['X-Auth-Token'] = api_key
+
+    # Serve fresh responses from cache, revalidate stale ones
+    cached, fresh, validators = lookup_cache(session, endpoint, params)
+    if fresh:
+        report_request(instrumentation, endpoint, params, time.perf_counter() - start, 'hit')
+        yield from _items(cached.data, key)
+        return
+    headers.update(validators)
+
+    def send():
+        if session is not None:
+            return session.get(endpoint, headers=headers, params=params, stream=True)
+        return requests.get(endpoint, headers=headers, params=params, stream=True)
+
+    scheduler = getattr(session, 'scheduler', None)
+    response = scheduler.request(send) if scheduler is not None else send()
+    latency = time.perf_counter() - start
+
+    cache = getattr(session, 'cache', None)
+    cache_state = 'miss' if cache is not None else None
+    received, decode = 0, None
+    with response:
+        if response.status_code != 200:
+            # Bodies of other responses are small, or empty, and read at once
+            if response.status_code == 304 and cached is not None:
+                cache_state = 'revalidated'
+            report_request(instrumentation, endpoint, params, latency, cache_state, response,
+                           len(response.content), decode)
+            if cache_state == 'revalidated':
+                yield from _items(cache.revalidated(cached).data, key)
+            elif response.status_code not in [403, 404]:
+                raise response_error(response, response.content)
+            return
+
+        # Time spent reading chunks is excluded from decode time
+        reading = 0.0
+
+        def counted(chunks):
+            nonlocal received, reading
+            chunks = iter(chunks)
+            while True:
+                read_start = time.perf_counter()
+                chunk = next(chunks, None)
+                reading += time.perf_counter() - read_start
+                if chunk is None:
+                    return
+                received += len(chunk)
+                yield chunk
+
+        parsing = 0.0
+        items = iter_json_items(counted(_chunks(response, chunk_size)), key)
+        while True:
+            parse_start = time.perf_counter()
+            item = next(items, _end)
+            parsing += time.perf_counter() - parse_start
+            if item is _end:
+                break
+            yield item
+        decode = parsing - reading
+
+    report_request(instrumentation, endpoint, params, latency, cache_state, response, received, decode)
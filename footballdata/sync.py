@@ -0,0 +1,188 @@
+"""
+    footballdata.sync
+    ~~~~~~~~~~~~~~~~~
+
+    This module implements incremental synchronisation of fixtures.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import time
+
+from .datasets import Fixture
+from .utils import parse_datetime
+
+
+# Kinds of fixture events
+ADDED = 'added'
+CHANGED = 'changed'
+REMOVED = 'removed'
+
+
+class FixtureEvent:
+    """Class to represent a change of a fixture between two polls"""
+
+    __slots__ = ('kind', 'key', 'fixture', 'changes')
+
+    def __init__(self, kind, key, fixture, changes=None):
+        """Initialises new event
+
+        :param kind: str, one of ADDED, CHANGED or REMOVED
+        :param key: str, identity of fixture
+        :param fixture: Fixture object, last known state of fixture for REMOVED events
+        :param changes: dict mapping changed field names to (old value, new value) tuples
+        """
+
+        self.kind = kind
+        self.key = key
+        self.fixture = fixture
+        self.changes = changes or {}
+
+    def __repr__(self):
+        return "FixtureEvent <{} {!r}>".format(self.kind, self.key)
+
+
+class FixtureSync:
+    """Class to keep a snapshot of fixtures up to date by polling the API
+
+    The first poll fetches all fixtures. Later polls only fetch the time
+    frames given, in which fixtures can still change, and build objects only
+    for fixtures which are new or whose tracked fields changed. Fixtures are
+    reported as removed only by full polls, as fixtures leave the polled time
+    frames as time passes.
+    """
+
+    # Fields compared between polls
+    tracked_fields = ('status', 'result', 'odds', 'date')
+
+    def __init__(self, connector, competition=None, leagues=None, time_frames=('p1', 'n1'), callback=None):
+        """Initialises new fixture sync
+
+        :param connector: Connector object used for API calls
+        :param competition: Competition object, syncs fixtures of all competitions if not given
+        :param leagues: list of league codes such as ['PL', 'BL1'], used if competition is not given
+        :param time_frames: time frames polled after first poll, such as 'p1' for the past day and 'n1' for the next
+        :param callback: callable called with each FixtureEvent, optional
+        """
+
+        self.connector = connector
+        self.competition = competition
+        self.time_frames = tuple(time_frames)
+        self.callback = callback
+
+        if competition is not None:
+            self.endpoint = competition.fixtures_endpoint
+            self.options = {}
+        else:
+            self.endpoint = connector.fixtures_endpoint
+            self.options = {'league': ','.join(leagues)} if leagues else {}
+
+        # Tracked values and data of fixtures by key
+        self.__snapshot = {}
+        self.__synced = False
+
+    def __repr__(self):
+        return "FixtureSync <{!r}>".format(self.endpoint)
+
+    def __len__(self):
+        return len(self.__snapshot)
+
+    @staticmethod
+    def key(row):
+        """Returns identity of a fixture from its data
+
+        :param row: dict of fixture data keyed by attribute name
+        :return: str, self link of fixture or a key built from teams and match day
+        """
+
+        links = row.get('links')
+        if links and 'self' in links:
+            return links['self']['href']
+        return "{}-{}-{}".format(row.get('home_team_name'), row.get('away_team_name'), row.get('matchday'))
+
+    def __fetch(self, options):
+        """Returns data set of fixtures fetched with options"""
+
+        return self.connector.data_set_class(klass=Fixture, endpoint=self.endpoint, api_key=self.connector.api_key,
+                                             options=options, session=self.connector.session)
+
+    @staticmethod
+    def __value(row, field):
+        """Returns value of a tracked field, dates parsed so that prepared and API records compare equal"""
+
+        value = row.get(field)
+        if value and field in Fixture.date_fields and isinstance(value, str):
+            return parse_datetime(value)
+        return value
+
+    def __apply(self, data_set, seen):
+        """Compares fixtures of a data set with the snapshot
+
+        :param data_set: DataSet of fixtures
+        :param seen: set of keys found in this poll, updated in place
+        :return: list of FixtureEvent objects
+        """
+
+        events = []
+        for index, row in enumerate(data_set._rows()):
+            key = self.key(row)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            values = tuple(self.__value(row, field) for field in self.tracked_fields)
+            previous = self.__snapshot.get(key)
+            if previous is None:
+                events.append(FixtureEvent(ADDED, key, data_set[index]))
+            elif previous[0] != values:
+                changes = {field: (old, new) for field, old, new in zip(self.tracked_fields, previous[0], values)
+                           if old != new}
+                events.append(FixtureEvent(CHANGED, key, data_set[index], changes))
+            else:
+                continue
+            self.__snapshot[key] = (values, row)
+
+        return events
+
+    def poll(self, full=False):
+        """Fetches fixtures and applies changes to the snapshot
+
+        :param full: Boolean, fetches all fixtures and detects removed fixtures if True
+        :return: list of FixtureEvent objects
+        """
+
+        full = full or not self.__synced or not self.time_frames
+        seen = set()
+        events = []
+
+        if full:
+            events.extend(self.__apply(self.__fetch(dict(self.options)), seen))
+            for key in set(self.__snapshot) - seen:
+                _, row = self.__snapshot.pop(key)
+                events.append(FixtureEvent(REMOVED, key, Fixture(**row)))
+            self.__synced = True
+        else:
+            for time_frame in self.time_frames:
+                options = dict(self.options, timeFrame=time_frame)
+                events.extend(self.__apply(self.__fetch(options), seen))
+
+        if self.callback is not None:
+            for event in events:
+                self.callback(event)
+        return events
+
+    def watch(self, interval=60, full_every=None):
+        """Polls the API forever and yields events as they are found
+
+        :param interval: float, seconds between polls
+        :param full_every: int, makes every nth poll a full poll, optional
+        :return: generator of FixtureEvent objects
+        """
+
+        count = 0
+        while True:
+            full = bool(full_every) and count % full_every == 0
+            yield from self.poll(full=full)
+            count += 1
+            time.sleep(interval)
@@ -0,0 +1,193 @@
+"""
+    footballdata.transport
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    This module implements the transports used to send API calls. Transports
+    are requests adapters mounted on the session of a Connector.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import base64
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+from requests import Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+def normalize_url(url):
+    """Returns url with query arguments sorted, so equal calls have equal urls"""
+
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+
+
+def recording_path(directory, method, url):
+    """Returns path of file holding the recorded response of a request"""
+
+    key = "{} {}".format(method, normalize_url(url))
+    return os.path.join(directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+
+class HTTPTransport(HTTPAdapter):
+    """Transport sending API calls over HTTP with a pool of keep-alive connections
+
+    This is the transport used by default.
+    """
+
+    # True if calls count against the request quota of the API
+    rate_limited = True
+
+    def __init__(self, pool_size=10, **kwargs):
+        """Initialises new transport
+
+        :param pool_size: int, maximum number of connections kept alive per host
+        """
+
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, **kwargs)
+
+
+class RecordingTransport(BaseAdapter):
+    """Transport sending API calls through another transport and writing the responses to a directory
+
+    Responses are stored by method and url, without request headers, so the
+    API key is not written to disk. Responses with status 304 are not stored,
+    as they have no body to replay.
+    """
+
+    rate_limited = True
+
+    def __init__(self, directory, transport=None):
+        """Initialises new recording transport
+
+        :param directory: str, directory to write responses to, created if not existing
+        :param transport: transport sending the calls, defaults to a new HTTPTransport
+        """
+
+        super().__init__()
+        self.directory = directory
+        self.transport = transport if transport is not None else HTTPTransport()
+        os.makedirs(directory, exist_ok=True)
+
+    def __repr__(self):
+        return "RecordingTransport <{!r}>".format(self.directory)
+
+    def send(self, request, **kwargs):
+        response = self.transport.send(request, **kwargs)
+        if response.status_code != 304:
+            self.__write(request, response)
+        return response
+
+    def __write(self, request, response):
+        """Writes response to file atomically"""
+
+        content = response.content
+        recorded = {
+            'method': request.method,
+            'url': normalize_url(request.url),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': dict(response.headers),
+        }
+        try:
+            recorded['body'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            recorded['body_base64'] = base64.b64encode(content).decode('ascii')
+
+        # Body is decoded already, the replayed response is not compressed
+        recorded['headers'].pop('Content-Encoding', None)
+        recorded['headers'].pop('Content-Length', None)
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as temp_file:
+                json.dump(recorded, temp_file)
+            os.replace(temp_path, recording_path(self.directory, request.method, request.url))
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport(BaseAdapter):
+    """Transport serving responses written by RecordingTransport, without network access
+
+    Conditional requests are answered with 304 if the recorded ETag matches.
+    A simulated latency can be added to every response.
+    """
+
+    # Replayed calls do not count against the request quota, so calls are not scheduled by default
+    rate_limited = False
+
+    def __init__(self, directory, latency=0):
+        """Initialises new replay transport
+
+        :param directory: str, directory holding recorded responses
+        :param latency: float, seconds to wait before each response, or (minimum, maximum) tuple for random latency
+        """
+
+        super().__init__()
+        self.directory = directory
+        self.latency = latency
+
+        # Number of responses served
+        self.served = 0
+
+    def __repr__(self):
+        return "ReplayTransport <{!r}>".format(self.directory)
+
+    def __delay(self):
+        """Returns seconds to wait before a response"""
+
+        if isinstance(self.latency, tuple):
+            return random.uniform(*self.latency)
+        return self.latency
+
+    def send(self, request, **kwargs):
+        try:
+            with open(recording_path(self.directory, request.method, request.url), encoding='utf-8') as recording:
+                recorded = json.load(recording)
+        except FileNotFoundError:
+            raise ConnectionError("No recorded response for {} {}".format(request.method, request.url),
+                                  request=request)
+
+        delay = self.__delay()
+        if delay:
+            time.sleep(delay)
+
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.reason = recorded.get('reason')
+        response.headers = CaseInsensitiveDict(recorded['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+
+        etag = response.headers.get('ETag')
+        if etag and request.headers.get('If-None-Match') == etag:
+            response.status_code = 304
+            response._content = b''
+        else:
+            response.status_code = recorded['status']
+            if 'body_base64' in recorded:
+                response._content = base64.b64decode(recorded['body_base64'])
+            else:
+                response._content = recorded['body'].encode('utf-8')
+
+        self.served += 1
+        return response
+
+    def close(self):
+        pass
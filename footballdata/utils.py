@@ -8,37 +8,343 @@
     :license: BSD 3-Clause
 """
 
+import json
 import re
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+
 import requests
+from dateutil.parser import parse as dateutil_parse
 from requests.exceptions import HTTPError
 
+from .decoding import accept_encoding, default_decoder, wire_bytes
+from .instrumentation import Instrumentation, REQUEST
+from .transport import HTTPTransport
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls with the same key
+
+    The first caller of a key runs the function, callers arriving while it
+    runs wait for it and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls = {}
+
+        # Number of calls which waited for another caller
+        self.shared = 0
+
+    def __repr__(self):
+        return "SingleFlight <{!r} in flight>".format(len(self.__calls))
+
+    def do(self, key, function):
+        """Calls function unless a call with the same key is in flight
+
+        :param key: hashable key identifying the call
+        :param function: callable without arguments
+        :return: value returned by function
+        """
+
+        with self.__lock:
+            call = self.__calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.__calls[key] = Future()
+            else:
+                self.shared += 1
+
+        if not leader:
+            return call.result()
+
+        try:
+            result = function()
+        except BaseException as error:
+            self.__finish(key)
+            call.set_exception(error)
+            raise
+        self.__finish(key)
+        call.set_result(result)
+        return result
+
+    def __finish(self, key):
+        """Removes a call, so later callers start a new one"""
+
+        with self.__lock:
+            del self.__calls[key]
+
+
+class IdentityMap:
+    """Map of resource URLs to the one object representing each resource
+
+    Objects are kept for the lifetime of the map, so their cached data sets
+    are shared by every data set resolving to them.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__objects = {}
+
+    def __repr__(self):
+        return "IdentityMap <{!r} objects>".format(len(self.__objects))
+
+    def __len__(self):
+        return len(self.__objects)
+
+    def __contains__(self, url):
+        return url in self.__objects
 
-def fetch_data_from_api(endpoint, api_key='', options=None):
+    def get(self, url):
+        """Returns object of a resource URL or None if not mapped"""
+        return self.__objects.get(url)
+
+    def get_or_add(self, url, build):
+        """Returns object of a resource URL, adding the object built by build if not mapped
+
+        :param url: str, resource URL
+        :param build: callable without arguments returning a new object
+        :return: tuple of object and True if it was added
+        """
+
+        with self.__lock:
+            existing = self.__objects.get(url)
+            if existing is not None:
+                return existing, False
+            obj = self.__objects[url] = build()
+            return obj, True
+
+    def clear(self):
+        """Removes all objects"""
+
+        with self.__lock:
+            self.__objects.clear()
+
+
+class Session(requests.Session):
+    """HTTP session with a pool of keep-alive connections to the API
+
+    All requests made by a Connector and the DataSet objects created from it
+    share one Session, so connections are reused across the whole crawl.
+    """
+
+    def __init__(self, api_key='', pool_size=10, timeout=None, headers=None, cache=None, scheduler=None,
+                 transport=None, decoder=None, compression=True, parser=None):
+        """Initialises new session
+
+        :param api_key: str, API key sent with every request, optional
+        :param pool_size: int, maximum number of connections kept alive per host
+        :param timeout: float or (connect, read) tuple, default timeout for requests, optional
+        :param headers: dict, default headers sent with every request, optional
+        :param cache: Cache of API responses such as FileCache, optional
+        :param scheduler: RequestScheduler which API calls have to pass through, optional
+        :param transport: requests adapter sending the API calls, defaults to HTTPTransport with a pool of given size
+        :param decoder: callable decoding JSON response bodies, defaults to the fastest decoder installed
+        :param compression: bool, False to ask for uncompressed responses
+        :param parser: ProcessPoolParser parsing large responses of data sets, optional
+        """
+
+        super().__init__()
+
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.cache = cache
+        self.scheduler = scheduler
+        self.inflight = SingleFlight()
+        self.identity_map = IdentityMap()
+        self.instrumentation = Instrumentation()
+        self.decoder = decoder if decoder is not None else default_decoder()
+        self.parser = parser
+
+        # Snapshot of data sets used instead of API calls, set by Connector.load_snapshot
+        self.snapshot = None
+
+        # Replace default adapters with the transport
+        self.transport = transport if transport is not None else HTTPTransport(pool_size=pool_size)
+        self.mount('http://', self.transport)
+        self.mount('https://', self.transport)
+
+        self.headers['Accept-Encoding'] = accept_encoding(compression)
+        if headers:
+            self.headers.update(headers)
+        if api_key:
+            self.headers['X-Auth-Token'] = api_key
+
+    def request(self, method, url, **kwargs):
+        """Sends a request using the default timeout if none is given"""
+
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def fetch_data_from_api(endpoint, api_key='', options=None, session=None, decoder=None, revalidate=False):
     """Fetches data from the endpoint and returns it
 
     :param endpoint: api endpoint to connect
     :param api_key: optional api key
     :param options: data to sent with api call
+    :param session: Session object to send the request with, optional
+    :param decoder: callable decoding the response body, defaults to decoder of session
+    :param revalidate: bool, revalidates responses cached by the session even if they are fresh
     :return:
     """
 
+    # Build data
+    params = options if options else {}
+
+    # Concurrent calls for the same data wait for a single request
+    inflight = getattr(session, 'inflight', None)
+    if inflight is not None:
+        key = (endpoint, api_key, tuple(sorted(params.items())), decoder, revalidate)
+        return inflight.do(key, lambda: _fetch(endpoint, api_key, params, session, decoder, revalidate))
+    return _fetch(endpoint, api_key, params, session, decoder, revalidate)
+
+
+def lookup_cache(session, endpoint, params, revalidate=False):
+    """Looks up the response of an API call in the cache of a session
+
+    :param session: Session or AsyncSession object, optional
+    :param endpoint: api endpoint
+    :param params: dict, arguments sent with api call
+    :param revalidate: bool, treats fresh responses as stale
+    :return: tuple of CacheEntry or None, True if the entry can be used without an API call, and dict of
+             headers revalidating a stale entry
+    """
+
+    cache = getattr(session, 'cache', None)
+    cached = cache.get(endpoint, params) if cache is not None else None
+    if cached is None:
+        return None, False, {}
+    if cached.fresh and not revalidate:
+        return cached, True, {}
+    return cached, False, cached.validators()
+
+
+def request_instrumentation(session):
+    """Returns instrumentation of a session if request events have callbacks, None otherwise"""
+
+    instrumentation = getattr(session, 'instrumentation', None)
+    if instrumentation is not None and instrumentation.wants(REQUEST):
+        return instrumentation
+    return None
+
+
+def report_request(instrumentation, endpoint, params, latency, cache_state, response=None, size=0, decode=None):
+    """Emits a request event of an API call
+
+    :param instrumentation: Instrumentation object, nothing is reported if None
+    :param endpoint: api endpoint
+    :param params: dict, arguments sent with api call
+    :param latency: float, seconds until the response was received or found in cache
+    :param cache_state: str, hit, miss or revalidated, None if session has no cache
+    :param response: requests or aiohttp response, None for responses served from cache
+    :param size: int, bytes of response body after decompression
+    :param decode: float, seconds spent decoding the body, None if not decoded
+    :return: None
+    """
+
+    if instrumentation is None:
+        return
+    if response is None:
+        instrumentation.emit(REQUEST, endpoint=endpoint, options=params, status=None, latency=latency, network=None,
+                             decode=None, bytes=0, wire_bytes=0, cache=cache_state, retries=0)
+        return
+
+    elapsed = getattr(response, 'elapsed', None)
+    instrumentation.emit(REQUEST, endpoint=endpoint, options=params, status=response_status(response),
+                         latency=latency, network=elapsed.total_seconds() if elapsed is not None else None,
+                         decode=decode, bytes=size, wire_bytes=wire_bytes(response, size), cache=cache_state,
+                         retries=getattr(response, 'retries', 0))
+
+
+def response_status(response):
+    """Returns status code of a requests or aiohttp response"""
+    return getattr(response, 'status_code', None) or response.status
+
+
+def response_error(response, content):
+    """Returns HTTPError for a response with a status which is not handled"""
+    return HTTPError("Status: {} Content: {}".format(response_status(response), content))
+
+
+def _fetch(endpoint, api_key, params, session, decoder=None, revalidate=False):
+    """Sends a single API call for fetch_data_from_api"""
+
+    # Measure the call only if someone listens
+    instrumentation = request_instrumentation(session)
+    start = time.perf_counter()
+
     # Build headers
     headers = {}
     if api_key:
         headers['X-Auth-Token'] = api_key
 
-    # Build data
-    params = options if options else {}
+    # Serve fresh responses from cache, revalidate stale ones
+    cached, fresh, validators = lookup_cache(session, endpoint, params, revalidate)
+    if fresh:
+        report_request(instrumentation, endpoint, params, time.perf_counter() - start, 'hit')
+        return cached.data
+    headers.update(validators)
 
-    response = requests.get(endpoint, headers=headers, params=params)
+    def send():
+        if session is not None:
+            return session.get(endpoint, headers=headers, params=params)
+        return requests.get(endpoint, headers=headers, params=params)
+
+    # Keep API calls within request quota if session has a scheduler
+    scheduler = getattr(session, 'scheduler', None)
+    response = scheduler.request(send) if scheduler is not None else send()
+    latency = time.perf_counter() - start
 
     # Return the json data if request is successful
-    if response.status_code == 200:
-        return response.json()
+    cache = getattr(session, 'cache', None)
+    data, decode, cache_state = None, None, 'miss' if cache is not None else None
+    if response.status_code == 304 and cached is not None:
+        data, cache_state = cache.revalidated(cached).data, 'revalidated'
+    elif response.status_code == 200:
+        content = response.content
+        decode_start = time.perf_counter()
+        data = (decoder or getattr(session, 'decoder', json.loads))(content)
+        decode = time.perf_counter() - decode_start
+        if cache is not None:
+            cache.set(endpoint, params, data, response.headers)
     elif response.status_code in [403, 404]:
-        return []
-    error = "Status: {} Content: {}".format(response.status_code, response.content)
-    raise HTTPError(error)
+        data = []
+
+    report_request(instrumentation, endpoint, params, latency, cache_state, response, len(response.content), decode)
+
+    if data is None:
+        raise response_error(response, response.content)
+    return data
+
+
+def parse_datetime(value):
+    """Parses a date or datetime string returned by the API
+
+    API returns dates in fixed ISO 8601 formats, which are parsed using
+    datetime.fromisoformat. Other formats are parsed by dateutil.
+
+    :param value: String in ISO 8601 format such as 2017-08-11T18:45:00Z
+    :return: datetime object
+    """
+
+    try:
+        if value.endswith('Z'):
+            # fromisoformat does not accept Z as UTC offset
+            return datetime.fromisoformat(value[:-1] + '+00:00')
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return dateutil_parse(value)
+
+
+# Patterns used to convert camel case to snake case
+FIRST_CAP_PATTERN = re.compile('(.)([A-Z][a-z]+)')
+ALL_CAP_PATTERN = re.compile('([a-z0-9])([A-Z])')
+
+# Translation table of keys used by clean_object if no table is given
+KEY_MAP = {}
 
 
 def camel_to_snake(name):
@@ -48,24 +354,42 @@ def camel_to_snake(name):
     :return: String in snake case
     """
 
-    underscore_name = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', underscore_name).lower()
+    underscore_name = FIRST_CAP_PATTERN.sub(r'\1_\2', name)
+    return ALL_CAP_PATTERN.sub(r'\1_\2', underscore_name).lower()
+
 
+def clean_key(key):
+    """Takes a key in data from api and converts it to attribute name
 
-def clean_object(data):
+    :param key: String key from api such as _links or homeTeamName
+    :return: String in snake case with leading underscore removed
+    """
+
+    if key.startswith('_'):
+        # Remove _ to prevent misinterpretation as private date
+        key = key.replace('_', '', 1)
+    return camel_to_snake(key)
+
+
+def clean_object(data, key_map=None):
     """Takes data from api and build data dictionary with proper keys
 
+    Converted keys are memoized in a translation table, so each distinct key
+    is converted only once.
+
     :param data: Dict data from api
+    :param key_map: Dict mapping api keys to attribute names, filled on demand, optional
     :return: Dict with proper keys and meta data removed
     """
 
-    data_dict = {}
-    for key in data.keys():
-        new_key = key
-        if key.startswith('_'):
-            # Remove _ to prevent misinterpretation as private date
-            new_key = key.replace('_', '', 1)
-
-        data_dict[camel_to_snake(new_key)] = data[key]
+    if key_map is None:
+        key_map = KEY_MAP
 
-    return data_dict
+    try:
+        return {key_map[key]: value for key, value in data.items()}
+    except KeyError:
+        # Add keys not seen before to translation table
+        for key in data:
+            if key not in key_map:
+                key_map[key] = clean_key(key)
+        return {key_map[key]: value for key, value in data.items()}
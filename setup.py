@@ -20,10 +20,16 @@ setup(
     long_description_content_type='text/markdown',
     packages=['footballdata'],
     include_package_data=True,
+    python_requires='>=3.7',
     install_requires=[
         'python-dateutil>=2.7.5',
         'requests>=2.20.0',
     ],
+    extras_require={
+        'async': ['aiohttp>=3.0'],
+        'columnar': ['numpy>=1.17'],
+        'speedups': ['orjson>=3.0', 'brotli>=1.0'],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
@@ -31,9 +37,8 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3 :: Only',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
         'Topic :: Software Development :: Libraries',
     ]
 )
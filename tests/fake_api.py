@@ -0,0 +1,188 @@
+"""
+    tests.fake_api
+    ~~~~~~~~~~~~~~
+
+    In-process stand-in for football-data.org used by offline tests.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import hashlib
+import json
+from urllib.parse import urlsplit
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+BASE_URL = 'http://api.football-data.org/v1/'
+
+TEAM_NAMES = ['Arsenal FC', 'Chelsea FC', 'Everton FC', 'Liverpool FC']
+
+# Number of requests allowed per minute by the fake API
+QUOTA = 1000
+
+
+def quota_headers(request_count):
+    """Returns headers reporting remaining request quota"""
+    return {'X-Requests-Available-Minute': str(max(QUOTA - request_count, 0)), 'X-RequestCounter-Reset': '60'}
+
+
+def link(path):
+    """Returns a link object as used in _links"""
+    return {'href': BASE_URL + path}
+
+
+def competition_payload(competition_id=445, year='2017'):
+    """Returns a single competition as returned by the API"""
+    return {
+        '_links': {
+            'self': link('competitions/{}'.format(competition_id)),
+            'teams': link('competitions/{}/teams'.format(competition_id)),
+            'fixtures': link('competitions/{}/fixtures'.format(competition_id)),
+            'leagueTable': link('competitions/{}/leagueTable'.format(competition_id)),
+        },
+        'id': competition_id,
+        'caption': 'Premier League {}'.format(year),
+        'league': 'PL',
+        'year': year,
+        'currentMatchday': 3,
+        'numberOfMatchdays': 6,
+        'numberOfTeams': len(TEAM_NAMES),
+        'numberOfGames': 12,
+        'lastUpdated': '2018-05-22T12:00:48Z',
+    }
+
+
+def team_payload(team_id):
+    """Returns a single team as returned by the API"""
+    return {
+        '_links': {
+            'self': link('teams/{}'.format(team_id)),
+            'fixtures': link('teams/{}/fixtures'.format(team_id)),
+            'players': link('teams/{}/players'.format(team_id)),
+        },
+        'name': TEAM_NAMES[team_id - 1],
+        'code': TEAM_NAMES[team_id - 1][:3].upper(),
+        'shortName': TEAM_NAMES[team_id - 1].split()[0],
+        'squadMarketValue': None,
+        'crestUrl': 'http://example.com/{}.svg'.format(team_id),
+    }
+
+
+def fixture_payload(fixture_id, home_id, away_id, match_day, result=None, status='FINISHED',
+                    date='2017-08-11T18:45:00Z', competition_id=445):
+    """Returns a single fixture as returned by the API"""
+    home_goals, away_goals = result if result else (None, None)
+    return {
+        '_links': {
+            'self': link('fixtures/{}'.format(fixture_id)),
+            'competition': link('competitions/{}'.format(competition_id)),
+            'homeTeam': link('teams/{}'.format(home_id)),
+            'awayTeam': link('teams/{}'.format(away_id)),
+        },
+        'date': date,
+        'status': status,
+        'matchday': match_day,
+        'homeTeamName': TEAM_NAMES[home_id - 1],
+        'awayTeamName': TEAM_NAMES[away_id - 1],
+        'result': {'goalsHomeTeam': home_goals, 'goalsAwayTeam': away_goals},
+        'odds': None,
+    }
+
+
+def player_payload(number):
+    """Returns a single player as returned by the API"""
+    return {
+        'name': 'Player {}'.format(number),
+        'position': 'Centre-Back',
+        'jerseyNumber': number,
+        'dateOfBirth': '1990-11-07',
+        'nationality': 'England',
+        'contractUntil': '2021-06-30',
+        'marketValue': None,
+    }
+
+
+def fixture_list(competition_id=445):
+    """Returns a double round robin of fixtures between all teams"""
+    fixtures = []
+    team_ids = list(range(1, len(TEAM_NAMES) + 1))
+    pairs = [(home, away) for home in team_ids for away in team_ids if home != away]
+    for index, (home, away) in enumerate(pairs):
+        match_day = index // 2 + 1
+        result = ((home + index) % 3, (away + index) % 2)
+        date = '2017-08-{:02d}T18:45:00Z'.format(match_day)
+        fixtures.append(fixture_payload(index + 1, home, away, match_day, result=result, date=date,
+                                        competition_id=competition_id))
+    return fixtures
+
+
+def build_routes(competition_id=445, year='2017'):
+    """Returns a dict mapping endpoint paths to response payloads"""
+    team_ids = range(1, len(TEAM_NAMES) + 1)
+    prefix = 'competitions/{}/'.format(competition_id)
+    fixtures = fixture_list(competition_id)
+    routes = {
+        'competitions/': [competition_payload(competition_id, year)],
+        prefix + 'teams': {'count': len(team_ids), 'teams': [team_payload(team_id) for team_id in team_ids]},
+        prefix + 'fixtures': {'count': len(fixtures), 'fixtures': fixtures},
+        prefix + 'leagueTable': {'leagueCaption': 'Premier League', 'matchday': 3, 'standing': []},
+        'fixtures/': {'count': len(fixtures), 'fixtures': fixtures},
+    }
+    for team_id in team_ids:
+        team_fixtures = [fixture for fixture in fixtures
+                         if fixture['_links']['homeTeam']['href'].endswith('/{}'.format(team_id)) or
+                         fixture['_links']['awayTeam']['href'].endswith('/{}'.format(team_id))]
+        routes['teams/{}'.format(team_id)] = team_payload(team_id)
+        routes['teams/{}/fixtures'.format(team_id)] = {'count': len(team_fixtures), 'fixtures': team_fixtures}
+        routes['teams/{}/players'.format(team_id)] = {'count': 2, 'players': [player_payload(1), player_payload(2)]}
+    return routes
+
+
+class FakeAPIAdapter(BaseAdapter):
+    """Transport adapter answering requests from a dict of routes"""
+
+    def __init__(self, routes=None):
+        super().__init__()
+        self.routes = routes if routes is not None else build_routes()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request)
+        url = urlsplit(request.url)
+        path = url.path.split('/v1/', 1)[-1]
+
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        response.headers.update(quota_headers(len(self.requests)))
+
+        if path in self.routes:
+            content = json.dumps(self.routes[path]).encode('utf-8')
+            etag = '"{}"'.format(hashlib.md5(content).hexdigest())
+            response.headers['ETag'] = etag
+            if request.headers.get('If-None-Match') == etag:
+                response.status_code = 304
+                response._content = b''
+            else:
+                response.status_code = 200
+                response._content = content
+        else:
+            response.status_code = 404
+            response._content = b'{}'
+        return response
+
+    def close(self):
+        pass
+
+
+def mount(session, routes=None):
+    """Mounts a FakeAPIAdapter on given session and returns it"""
+    adapter = FakeAPIAdapter(routes)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
@@ -0,0 +1,186 @@
+"""
+    tests.test_aio
+
+    Tests asyncio based connector against a local server.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import asyncio
+import json
+import unittest
+
+from footballdata.datasets import Competition, Team, Player
+from footballdata.refresh import BackgroundRefresher
+
+from . import fake_api
+
+try:
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+    from footballdata.aio import AsyncConnector, AsyncDataSet
+except ImportError:
+    web = None
+
+
+@unittest.skipIf(web is None, 'aiohttp is not installed')
+class TestAsyncConnector(unittest.TestCase):
+    """Tests AsyncConnector and AsyncDataSet"""
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.routes = fake_api.build_routes()
+        self.requests = []
+
+    def tearDown(self):
+        self.loop.close()
+
+    async def handle(self, request):
+        """Serves fake API responses with links pointing to this server"""
+
+        self.requests.append(request.path)
+        path = request.path.split('/v1/', 1)[-1]
+        headers = fake_api.quota_headers(len(self.requests))
+        if path not in self.routes:
+            return web.json_response({}, status=404, headers=headers)
+        body = json.dumps(self.routes[path]).replace(fake_api.BASE_URL, self.base_url)
+        return web.Response(body=body, content_type='application/json', headers=headers)
+
+    def run_with_server(self, coroutine_function):
+        """Runs coroutine function with a connector pointed at a local server"""
+
+        async def run():
+            app = web.Application()
+            app.router.add_get('/{tail:.*}', self.handle)
+            server = TestServer(app)
+            await server.start_server()
+            self.base_url = str(server.make_url('/v1/'))
+            try:
+                async with AsyncConnector(api_key='secret') as connector:
+                    connector.competition_endpoint = self.base_url + 'competitions/'
+                    return await coroutine_function(connector)
+            finally:
+                await server.close()
+
+        return self.loop.run_until_complete(run())
+
+    def test_await_data_sets(self):
+        """Tests awaiting data sets through a competition tree"""
+
+        async def crawl(connector):
+            competitions = await connector.get_competitions()
+            self.assertTrue(isinstance(competitions, AsyncDataSet))
+            self.assertTrue(isinstance(competitions[0], Competition))
+
+            teams = await competitions[0].get_teams()
+            self.assertTrue(all(isinstance(team, Team) for team in teams))
+
+            players = await asyncio.gather(*(team.get_players() for team in teams))
+            return [len(team_players) for team_players in players], players[0][0]
+
+        counts, player = self.run_with_server(crawl)
+        self.assertEqual(counts, [2] * len(fake_api.TEAM_NAMES))
+        self.assertTrue(isinstance(player, Player))
+        self.assertEqual(len(self.requests), 2 + len(fake_api.TEAM_NAMES))
+
+    def test_async_iteration_and_shared_load(self):
+        """Tests async for, queries before loading and concurrent awaits of one data set"""
+
+        async def crawl(connector):
+            competition = (await connector.get_competitions())[0]
+            fixtures = competition.get_fixtures()
+            with self.assertRaises(RuntimeError):
+                len(fixtures)
+            for query in (lambda: fixtures.filter(status='FINISHED'), lambda: fixtures.order_by('date'),
+                          lambda: list(fixtures._rows())):
+                with self.assertRaises(RuntimeError):
+                    query()
+            await asyncio.gather(fixtures, fixtures.load())
+            self.assertEqual(len(fixtures.filter(status='FINISHED').order_by('-date')), len(fixtures))
+            return [fixture async for fixture in fixtures]
+
+        fixtures = self.run_with_server(crawl)
+        self.assertEqual(len(fixtures), len(fake_api.fixture_list()))
+        self.assertEqual(len(self.requests), 2)
+
+    def test_fixture_teams(self):
+        """Tests teams of fixtures are awaited and shared through the identity map"""
+
+        async def crawl(connector):
+            competition = (await connector.get_competitions())[0]
+            fixture = (await competition.get_fixtures())[0]
+            home_team = await fixture.get_home_team()
+            request_count = len(self.requests)
+            # Teams built by a loaded data set are not fetched again
+            team = (await competition.get_teams())[1]
+            away_team = await fixture.get_away_team()
+            players = await home_team.get_players()
+            return home_team, away_team, team, request_count, players
+
+        home_team, away_team, team, request_count, players = self.run_with_server(crawl)
+        self.assertTrue(isinstance(home_team, Team))
+        self.assertEqual(home_team.name, fake_api.TEAM_NAMES[0])
+        self.assertIs(away_team, team)
+        self.assertEqual(request_count, 3)
+        self.assertTrue(isinstance(players, AsyncDataSet))
+        self.assertEqual(len(self.requests), 5)
+
+    def test_compute_league_table(self):
+        """Tests league tables of async competitions are awaited with their fixtures"""
+
+        async def crawl(connector):
+            competition = (await connector.get_competitions())[0]
+            return await competition.compute_league_table(), await competition.compute_league_table(match_day=1)
+
+        standings, first_day = self.run_with_server(crawl)
+        self.assertEqual(len(standings), len(fake_api.TEAM_NAMES))
+        self.assertEqual([standing.position for standing in standings], [1, 2, 3, 4])
+        self.assertEqual(sum(standing.played_games for standing in first_day), 4)
+        self.assertEqual(len(self.requests), 2)
+
+    def test_refresh_and_stream(self):
+        """Tests awaiting refresh and stream of data sets, which background refreshers reject"""
+
+        async def crawl(connector):
+            fixtures = (await connector.get_competitions())[0].get_fixtures()
+            with self.assertRaises(TypeError):
+                BackgroundRefresher().register(fixtures)
+            streamed = [fixture async for fixture in fixtures.stream()]
+            refreshed = await fixtures.refresh()
+            return fixtures, streamed, refreshed
+
+        fixtures, streamed, refreshed = self.run_with_server(crawl)
+        self.assertTrue(refreshed)
+        self.assertEqual(len(streamed), len(fake_api.fixture_list()))
+        self.assertEqual(len(fixtures), len(streamed))
+        self.assertEqual(len(self.requests), 3)
+
+    def test_prefetch(self):
+        """Tests concurrent loading of a competition tree"""
+
+        async def crawl(connector):
+            competitions = await connector.prefetch()
+            request_count = len(self.requests)
+            teams = await competitions[0].get_teams()
+            players = await teams[0].get_players()
+            return request_count, len(players)
+
+        request_count, player_count = self.run_with_server(crawl)
+        self.assertEqual(request_count, 4 + 2 * len(fake_api.TEAM_NAMES))
+        self.assertEqual(len(self.requests), request_count)
+        self.assertEqual(player_count, 2)
+
+    def test_batch(self):
+        """Tests fetching competitions of seasons and their fixtures concurrently"""
+
+        async def crawl(connector):
+            competitions = await connector.get_competitions_for_seasons([2017])
+            fixtures = await connector.get_fixtures_for_competitions(competitions)
+            return competitions, fixtures
+
+        competitions, fixtures = self.run_with_server(crawl)
+        self.assertTrue(isinstance(fixtures, AsyncDataSet))
+        self.assertEqual(competitions[0].season, 2017)
+        self.assertEqual(len(fixtures.filter(season=2017, competition_id=445)), len(fake_api.fixture_list()))
+        self.assertEqual(len(self.requests), 2)
@@ -0,0 +1,113 @@
+"""
+    tests.test_batch
+
+    Tests fetching competitions and fixtures of several seasons at once.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+from footballdata import Connector
+from footballdata.datasets import Competition, Fixture
+
+from . import fake_api
+
+
+SEASONS = {'2015': 398, '2016': 426, '2017': 445}
+
+
+class SeasonAPIAdapter(fake_api.FakeAPIAdapter):
+    """Fake API answering competitions of the season asked for"""
+
+    def __init__(self):
+        routes = {}
+        for season, competition_id in SEASONS.items():
+            routes.update(fake_api.build_routes(competition_id=competition_id, year=season))
+        super().__init__(routes)
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+        season = parse_qs(url.query).get('season', ['2017'])[0]
+        self.routes['competitions/'] = [fake_api.competition_payload(SEASONS[season], season)]
+        return super().send(request, **kwargs)
+
+
+class TestBatch(unittest.TestCase):
+    """Tests batch get methods of connector"""
+
+    def setUp(self):
+        self.connector = Connector(api_key='test', scheduler=False)
+        self.adapter = SeasonAPIAdapter()
+        self.connector.session.mount('http://', self.adapter)
+
+    def tearDown(self):
+        self.connector.close()
+
+    def test_competitions_for_seasons(self):
+        """Tests competitions of seasons are merged, tagged and cached by season"""
+
+        competitions = self.connector.get_competitions_for_seasons(range(2015, 2018))
+
+        self.assertTrue(isinstance(competitions, self.connector.data_set_class))
+        self.assertEqual([competition.id for competition in competitions], [398, 426, 445])
+        self.assertEqual([competition.season for competition in competitions], [2015, 2016, 2017])
+        self.assertEqual(competitions.get(season=2016).year, '2016')
+        self.assertEqual(len(self.adapter.requests), 3)
+
+        # Seasons are cached separately
+        self.assertEqual(self.connector.get_competitions(season=2016)[0].id, 426)
+        self.assertEqual(self.connector.get_competitions()[0].id, 445)
+        self.connector.get_competitions_for_seasons([2016, 2017])
+        self.assertEqual(len(self.adapter.requests), 4)
+
+    def test_fixtures_for_competitions(self):
+        """Tests fixtures of competitions are merged and tagged with season and competition"""
+
+        competitions = self.connector.get_competitions_for_seasons([2016, 2017])
+        fixtures = self.connector.get_fixtures_for_competitions(competitions)
+
+        self.assertEqual(len(fixtures), 24)
+        self.assertTrue(all(isinstance(fixture, Fixture) for fixture in fixtures))
+        self.assertEqual(len(fixtures.filter(season=2016)), 12)
+        self.assertEqual(set(fixture.competition_id for fixture in fixtures.filter(season=2017)), {445})
+
+        # Fixtures are cached by competitions
+        requests = len(self.adapter.requests)
+        self.assertIs(competitions[0].get_fixtures()[0], fixtures[0])
+        self.assertEqual(len(self.adapter.requests), requests)
+
+    def test_fixtures_of_current_season(self):
+        """Tests fixtures of current season competitions are tagged with their year"""
+
+        fixtures = self.connector.get_fixtures_for_competitions()
+        self.assertEqual(len(fixtures), 12)
+        self.assertEqual(fixtures[0].season, 2017)
+
+    def test_snapshot(self):
+        """Tests competitions of all seasons are restored from a snapshot"""
+
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'snapshot')
+            self.connector.get_competitions_for_seasons([2016, 2017])
+            self.connector.save_snapshot(path)
+
+            with Connector(api_key='test', scheduler=False) as connector:
+                adapter = SeasonAPIAdapter()
+                connector.session.mount('http://', adapter)
+                connector.load_snapshot(path)
+                self.assertEqual(connector.get_competitions(season=2016)[0].id, 426)
+                self.assertTrue(isinstance(connector.get_competitions(season='2017')[0], Competition))
+                self.assertEqual(adapter.requests, [])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
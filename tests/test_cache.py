@@ -0,0 +1,72 @@
+"""
+    tests.test_cache
+
+    Tests persistent cache of API responses.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import shutil
+import tempfile
+import unittest
+
+from footballdata import Connector
+from footballdata.cache import FileCache, endpoint_key
+
+from . import fake_api
+
+
+class TestFileCache(unittest.TestCase):
+    """Tests FileCache"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def crawl(self, cache):
+        """Fetches competitions and teams with a new connector, returns fake adapter"""
+
+        with Connector(cache=cache) as connector:
+            adapter = fake_api.mount(connector.session)
+            competition = connector.get_competitions()[0]
+            self.assertEqual(len(competition.get_teams()), len(fake_api.TEAM_NAMES))
+        return adapter
+
+    def test_fresh_responses_survive_restart(self):
+        """Tests that fresh responses are served from disk by a new connector"""
+
+        self.assertEqual(len(self.crawl(FileCache(self.directory)).requests), 2)
+        self.assertEqual(len(self.crawl(FileCache(self.directory)).requests), 0)
+
+    def test_stale_responses_revalidated(self):
+        """Tests that stale responses are revalidated using ETag"""
+
+        self.crawl(FileCache(self.directory, ttl=0))
+        adapter = self.crawl(FileCache(self.directory, ttl=0))
+        self.assertEqual(len(adapter.requests), 2)
+        self.assertTrue(all('If-None-Match' in request.headers for request in adapter.requests))
+
+    def test_ttl_by_resource_type(self):
+        """Tests that TTL depends on resource type of endpoint"""
+
+        cache = FileCache(self.directory, ttl={'fixtures': 10})
+        self.assertEqual(cache.resource_type(fake_api.BASE_URL + 'competitions/445/leagueTable'), 'leagueTable')
+        self.assertEqual(cache.resource_type(fake_api.BASE_URL + 'teams/66'), 'teams')
+        self.assertEqual(cache.ttl_for(fake_api.BASE_URL + 'teams/66/fixtures'), 10)
+        self.assertEqual(cache.ttl_for(fake_api.BASE_URL + 'competitions/'), FileCache.default_ttls['competitions'])
+
+        cache = FileCache(self.directory, ttl=30)
+        self.assertEqual(cache.ttl_for(fake_api.BASE_URL + 'competitions/'), 30)
+        self.assertEqual(cache.ttl_for(fake_api.BASE_URL + 'unknown'), 30)
+
+    def test_endpoint_key(self):
+        """Tests that responses are keyed by endpoint and sorted options"""
+
+        endpoint = fake_api.BASE_URL + 'fixtures/'
+        self.assertEqual(endpoint_key(endpoint), endpoint)
+        self.assertEqual(endpoint_key(endpoint, {}), endpoint)
+        self.assertEqual(endpoint_key(endpoint, {'timeFrame': 'n7', 'league': 'PL'}),
+                         endpoint + '?league=PL&timeFrame=n7')
@@ -0,0 +1,85 @@
+"""
+    tests.test_columnar
+
+    Tests columnar representation of data sets.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import unittest
+
+from footballdata.datasets import DataSet, Fixture
+
+from . import fake_api
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class TestColumnarDataSet(unittest.TestCase):
+    """Tests ColumnarDataSet"""
+
+    def setUp(self):
+        payload = fake_api.fixture_list()
+        payload[-1]['status'] = 'TIMED'
+        payload[-1]['result'] = {'goalsHomeTeam': None, 'goalsAwayTeam': None}
+        self.fixtures = DataSet(klass=Fixture, endpoint=fake_api.BASE_URL + 'fixtures/')
+        self.fixtures._populate({'fixtures': payload})
+        self.columns = self.fixtures.to_columns()
+
+    def test_column_types(self):
+        """Tests dates, integers and dictionary encoded strings"""
+
+        self.assertEqual(len(self.columns), len(self.fixtures))
+        self.assertEqual(self.columns['date'].dtype, numpy.dtype('datetime64[s]'))
+        self.assertEqual(self.columns['date'][0], numpy.datetime64('2017-08-01T18:45:00'))
+        self.assertEqual(self.columns.columns['home_team_name'].dtype, numpy.int32)
+        self.assertEqual(list(self.columns.categories['status']), ['FINISHED', 'TIMED'])
+        self.assertEqual(self.columns['home_team_name'][0], 'Arsenal FC')
+        self.assertTrue(self.columns['goals_home_team'].mask[-1])
+
+    def test_filter_and_sum(self):
+        """Tests vectorized filters and sums match results from objects"""
+
+        finished = self.columns.filter(status='FINISHED', date__gte='2017-08-03')
+        expected = [fixture.result['goalsHomeTeam'] for fixture in self.fixtures.filter(status='FINISHED')
+                    if fixture.matchday >= 3]
+        self.assertEqual(len(finished), len(expected))
+        self.assertEqual(finished.sum('goals_home_team'), sum(expected))
+        self.assertEqual(len(self.columns.filter(self.columns['matchday'] <= 2, home_team_name='Arsenal FC')), 3)
+
+    def test_group_by(self):
+        """Tests aggregations by group"""
+
+        totals = self.columns.group_by('home_team_name').sum('goals_home_team').to_dict()
+        for name, goals in zip(totals['home_team_name'], totals['goals_home_team']):
+            expected = sum(fixture.result['goalsHomeTeam'] or 0
+                           for fixture in self.fixtures.filter(home_team_name=name))
+            self.assertEqual(goals, expected)
+
+        counts = self.columns.group_by('matchday').count()
+        self.assertEqual(counts['count'].tolist(), [2] * 6)
+        means = self.columns.group_by('away_team_name').mean('goals_away_team')
+        self.assertEqual(len(means), len(fake_api.TEAM_NAMES))
+
+    def test_unplayed_fixtures(self):
+        """Tests sums and means of fixtures without results"""
+
+        payload = fake_api.fixture_list()
+        for fixture in payload:
+            fixture['status'] = 'TIMED'
+            fixture['result'] = {'goalsHomeTeam': None, 'goalsAwayTeam': None}
+        fixtures = DataSet(klass=Fixture, endpoint=fake_api.BASE_URL + 'fixtures/')
+        fixtures._populate({'fixtures': payload})
+        columns = fixtures.to_columns()
+
+        self.assertEqual(columns.sum('goals_home_team'), 0)
+        self.assertEqual(columns.filter(status='FINISHED').sum('goals_home_team'), 0)
+        means = columns.group_by('home_team_name').mean('goals_home_team')
+        self.assertTrue(means['goals_home_team'].mask.all())
+        self.assertEqual(means.to_dict()['goals_home_team'], [None] * len(fake_api.TEAM_NAMES))
+
@@ -0,0 +1,175 @@
+"""
+    tests.test_datasets
+
+    Tests football data objects and data sets without API access.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import copy
+import pickle
+import unittest
+
+from footballdata.datasets import DataSet, Competition, Fixture, Team
+from footballdata.utils import clean_object
+
+from . import fake_api
+
+
+class TestFootballDataObjects(unittest.TestCase):
+    """Tests compact football data objects"""
+
+    def setUp(self):
+        self.fixtures = DataSet(klass=Fixture, endpoint=fake_api.BASE_URL + 'fixtures/', api_key='secret')
+        self.fixtures._populate({'fixtures': fake_api.fixture_list()})
+
+    def test_slots(self):
+        """Tests that objects have no instance dict"""
+
+        fixture = self.fixtures[0]
+        self.assertFalse(hasattr(fixture, '__dict__'))
+        self.assertEqual(fixture.home_team_name, fake_api.TEAM_NAMES[0])
+        self.assertEqual(fixture.matchday, 1)
+
+    def test_unknown_fields(self):
+        """Tests that fields without slots are accessible as attributes"""
+
+        payload = fake_api.team_payload(1)
+        payload['founded'] = 1886
+        team = Team(**clean_object(payload))
+        self.assertEqual(team.founded, 1886)
+        self.assertEqual(team.name, fake_api.TEAM_NAMES[0])
+        with self.assertRaises(AttributeError):
+            getattr(team, 'stadium')
+
+    def test_new_attributes(self):
+        """Tests that attributes can be added to objects, except over read only properties"""
+
+        fixture = self.fixtures[0]
+        fixture.note = 'derby'
+        fixture.status = 'POSTPONED'
+        self.assertEqual(fixture.note, 'derby')
+        self.assertEqual(fixture.status, 'POSTPONED')
+        with self.assertRaises(AttributeError):
+            fixture.api_key = 'other'
+
+    def test_pickle_and_copy(self):
+        """Tests that objects are pickled and copied without their context"""
+
+        fixture = self.fixtures[0]
+        fixture.note = 'derby'
+        for copied in (pickle.loads(pickle.dumps(fixture)), copy.deepcopy(fixture)):
+            self.assertIsNone(copied._context)
+            self.assertEqual(copied.home_team_name, fixture.home_team_name)
+            self.assertEqual(copied.date, fixture.date)
+            self.assertEqual(copied.links, fixture.links)
+            self.assertEqual(copied.note, 'derby')
+
+        competition = Competition(**clean_object(fake_api.competition_payload()))
+        copied = pickle.loads(pickle.dumps(competition))
+        self.assertEqual(copied.teams_endpoint, competition.teams_endpoint)
+        self.assertEqual(copied._cached_data_sets(), [])
+
+    def test_shared_state(self):
+        """Tests that API key, session and endpoints are read from data set"""
+
+        first, second = self.fixtures[0], self.fixtures[1]
+        self.assertEqual(first.api_key, 'secret')
+        self.assertIs(first._context, second._context)
+        self.assertEqual(first.base_endpoint, fake_api.BASE_URL + 'fixtures/1')
+        self.assertFalse(hasattr(first._context, 'records'))
+
+        competition = Competition(**clean_object(fake_api.competition_payload()))
+        self.assertEqual(competition.api_key, '')
+        self.assertEqual(competition.teams_endpoint, fake_api.BASE_URL + 'competitions/445/teams')
+        self.assertEqual(competition.base_endpoint, fake_api.BASE_URL + 'competitions/445')
+
+
+class TestLazyDataSet(unittest.TestCase):
+    """Tests on demand building of data set items"""
+
+    def setUp(self):
+        self.built = []
+        self.fixtures = DataSet(klass=Fixture, endpoint=fake_api.BASE_URL + 'fixtures/')
+        self.fixtures._populate({'fixtures': fake_api.fixture_list()})
+
+        # Record every object built from the store
+        store = self.fixtures._DataSet__store
+        build = store.build
+        store.build = lambda record: self.built.append(record) or build(record)
+
+    def test_length_and_index(self):
+        """Tests that only requested items are built"""
+
+        self.assertEqual(len(self.fixtures), 12)
+        self.assertEqual(self.built, [])
+        self.assertIs(self.fixtures[-1], self.fixtures[11])
+        self.assertEqual(len(self.built), 1)
+
+    def test_slice_views(self):
+        """Tests that slices share items with the data set they are created from"""
+
+        first_three = self.fixtures[:3]
+        self.assertTrue(isinstance(first_three, DataSet))
+        self.assertEqual(len(first_three), 3)
+        self.assertEqual(self.built, [])
+
+        reverse = first_three[::-1]
+        self.assertEqual([fixture.matchday for fixture in reverse], [2, 1, 1])
+        self.assertIs(reverse[0], self.fixtures[2])
+        self.assertEqual(len(self.built), 3)
+        with self.assertRaises(IndexError):
+            first_three[3]
+
+
+class TestDataSetQueries(unittest.TestCase):
+    """Tests filter, get and order_by"""
+
+    def setUp(self):
+        payload = fake_api.fixture_list()
+        payload[0]['status'] = 'TIMED'
+        payload[1]['date'] = None
+        self.fixtures = DataSet(klass=Fixture, endpoint=fake_api.BASE_URL + 'fixtures/')
+        self.fixtures._populate({'fixtures': payload})
+
+    def test_filter(self):
+        """Tests equality, membership and range lookups"""
+
+        arsenal = self.fixtures.filter(home_team_name='Arsenal FC', status='FINISHED')
+        self.assertEqual(len(arsenal), 2)
+        self.assertTrue(all(fixture.home_team_name == 'Arsenal FC' for fixture in arsenal))
+
+        window = self.fixtures.filter(date__gte='2017-08-02', date__lt='2017-08-04T00:00:00Z')
+        self.assertEqual([fixture.matchday for fixture in window], [2, 2, 3, 3])
+
+        self.assertEqual(len(self.fixtures.filter(matchday__in=[1, 6])), 4)
+        self.assertEqual(len(self.fixtures.filter(matchday__gt=5)), 2)
+        self.assertEqual(len(self.fixtures.filter(result={'goalsHomeTeam': 1, 'goalsAwayTeam': 0})), 2)
+
+    def test_filter_views(self):
+        """Tests that filters on views keep the order of the view"""
+
+        latest = self.fixtures[::-1].filter(matchday__lte=2)
+        self.assertEqual([fixture.matchday for fixture in latest], [2, 2, 1, 1])
+        self.assertIs(latest[-1], self.fixtures[0])
+
+    def test_get(self):
+        """Tests get returns a single item"""
+
+        self.assertEqual(self.fixtures.get(status='TIMED').matchday, 1)
+        with self.assertRaises(LookupError):
+            self.fixtures.get(status='POSTPONED')
+        with self.assertRaises(LookupError):
+            self.fixtures.get(matchday=1)
+
+    def test_order_by(self):
+        """Tests sorting on one or more fields"""
+
+        ordered = self.fixtures.order_by('-date')
+        self.assertEqual(ordered[0].matchday, 6)
+        self.assertIsNone(ordered[-1].date)
+
+        ordered = self.fixtures.order_by('away_team_name', '-matchday')
+        self.assertEqual([fixture.away_team_name for fixture in ordered][:3], ['Arsenal FC'] * 3)
+        self.assertEqual([fixture.matchday for fixture in ordered][:3], [5, 4, 2])
@@ -0,0 +1,118 @@
+"""
+    tests.test_decoding
+
+    Tests pluggable JSON decoders and compressed responses.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import gzip
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from footballdata import Connector
+from footballdata.decoding import accept_encoding, default_decoder
+from footballdata.instrumentation import REQUEST
+
+from . import fake_api
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class CompressingHandler(BaseHTTPRequestHandler):
+    """Serves fixtures of the fake API, gzip compressed if accepted"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.accept_encodings.append(self.headers.get('Accept-Encoding'))
+        body = json.dumps({'count': 1200, 'fixtures': fake_api.fixture_list() * 100}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDecoding(unittest.TestCase):
+    """Tests decoders and compression negotiated by connectors"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), CompressingHandler)
+        cls.server.daemon_threads = True
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = 'http://127.0.0.1:{}/v1/fixtures/'.format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def setUp(self):
+        self.server.accept_encodings = []
+        self.events = []
+
+    def fetch_fixtures(self, **kwargs):
+        """Returns number of fixtures fetched from the local server, reporting request events"""
+
+        with Connector(scheduler=False, **kwargs) as connector:
+            connector.fixtures_endpoint = self.url
+            connector.instrumentation.register(REQUEST, self.events.append)
+            return len(connector.get_fixtures())
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_default_decoder(self):
+        """Tests orjson is used if installed"""
+
+        self.assertIs(default_decoder(), orjson.loads)
+        with Connector() as connector:
+            self.assertIs(connector.session.decoder, orjson.loads)
+
+    def test_custom_decoder(self):
+        """Tests responses are decoded with the decoder given to connector"""
+
+        bodies = []
+
+        def decoder(content):
+            bodies.append(content)
+            return json.loads(content)
+
+        self.assertEqual(self.fetch_fixtures(decoder=decoder), 1200)
+        self.assertEqual(len(bodies), 1)
+        self.assertGreaterEqual(self.events[0]['decode'], 0)
+
+    def test_compression(self):
+        """Tests compressed responses are negotiated and wire bytes reported"""
+
+        self.assertEqual(self.fetch_fixtures(), 1200)
+        self.assertIn('gzip', self.server.accept_encodings[0])
+        self.assertIn('deflate', self.server.accept_encodings[0])
+        event = self.events[0]
+        self.assertLess(event['wire_bytes'] * 10, event['bytes'])
+
+    def test_without_compression(self):
+        """Tests uncompressed responses are asked for if compression is disabled"""
+
+        self.assertEqual(self.fetch_fixtures(compression=False), 1200)
+        self.assertEqual(self.server.accept_encodings, ['identity'])
+        self.assertEqual(self.events[0]['wire_bytes'], self.events[0]['bytes'])
+        self.assertEqual(accept_encoding(False), 'identity')
+
+
+if __name__ == '__main__':
+    unittest.main()
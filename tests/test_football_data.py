@@ -86,6 +86,17 @@ class TestFootballData(unittest.TestCase):
             for competition in competitions:
                 self.verify_competition(competition)
 
+    def test_get_competitions_for_seasons(self):
+        """Tests competition and fixture retrieval for all seasons at once"""
+
+        seasons = range(self.start_year, self.end_year+1)
+        competitions = self.connector.get_competitions_for_seasons(seasons)
+        self.verify_dataset(competitions, Competition)
+        self.assertTrue(set(competition.season for competition in competitions) <= set(seasons))
+
+        fixtures = self.connector.get_fixtures_for_competitions(competitions[:self.limit])
+        self.verify_dataset(fixtures, Fixture)
+
     def test_get_fixtures_current_season(self):
         """Tests fixture retrieval for current season"""
 
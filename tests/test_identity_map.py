@@ -0,0 +1,89 @@
+"""
+    tests.test_identity_map
+
+    Tests sharing of competition and team objects across data sets.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import unittest
+
+from footballdata import Connector
+from footballdata.datasets import DataSet, Team
+
+from . import fake_api
+
+
+class TestIdentityMap(unittest.TestCase):
+    """Tests identity map of connector session"""
+
+    def setUp(self):
+        self.connector = Connector(api_key='test')
+        self.routes = fake_api.build_routes()
+        self.routes.update(fake_api.build_routes(competition_id=446))
+        self.routes['competitions/'] = [fake_api.competition_payload(445), fake_api.competition_payload(446)]
+        self.adapter = fake_api.mount(self.connector.session, self.routes)
+
+    def tearDown(self):
+        self.connector.close()
+
+    def requested(self, path):
+        """Returns number of requests sent to path"""
+        return sum(request.url == fake_api.BASE_URL + path for request in self.adapter.requests)
+
+    def test_teams_shared_across_competitions(self):
+        """Tests a team playing in two competitions is one object with one cache"""
+
+        league, cup = self.connector.get_competitions()
+        league_team = league.get_teams()[0]
+        cup_team = cup.get_teams()[0]
+        self.assertIs(league_team, cup_team)
+
+        self.assertEqual(len(league_team.get_players()), 2)
+        self.assertEqual(len(cup_team.get_players()), 2)
+        self.assertEqual(self.requested('teams/1/players'), 1)
+
+    def test_refresh_updates_canonical_objects(self):
+        """Tests refreshed data sets update the objects already known"""
+
+        competition = self.connector.get_competitions()[0]
+        teams = competition.get_teams()
+        self.routes['competitions/'][0]['caption'] = 'Premier League 2017/18'
+
+        refreshed = self.connector.get_competitions(force_update=True)[0]
+        self.assertIs(refreshed, competition)
+        self.assertEqual(competition.caption, 'Premier League 2017/18')
+        self.assertIs(competition.get_teams(), teams)
+
+    def test_fixture_teams(self):
+        """Tests fixtures resolve home and away teams to canonical objects"""
+
+        competition = self.connector.get_competitions()[0]
+        fixture = competition.get_fixtures()[0]
+
+        # Team is fetched once if no data set has loaded it
+        home_team = fixture.get_home_team()
+        self.assertEqual(home_team.name, fixture.home_team_name)
+        self.assertIs(fixture.get_home_team(), home_team)
+        self.assertEqual(self.requested('teams/1'), 1)
+        self.assertIn(home_team, list(competition.get_teams()))
+
+        # Teams already loaded are not fetched
+        requests_before = len(self.adapter.requests)
+        away_team = fixture.get_away_team()
+        self.assertEqual(away_team.name, fixture.away_team_name)
+        self.assertEqual(len(self.adapter.requests), requests_before)
+
+    def test_data_set_without_session(self):
+        """Tests data sets without a session build separate objects"""
+
+        payload = {'teams': [fake_api.team_payload(1)]}
+        first, second = DataSet(klass=Team), DataSet(klass=Team)
+        first._populate(payload)
+        second._populate(payload)
+        self.assertIsNot(first[0], second[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
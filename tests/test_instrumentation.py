@@ -0,0 +1,171 @@
+"""
+    tests.test_instrumentation
+
+    Tests instrumentation events and the metrics collector.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import shutil
+import tempfile
+import unittest
+
+from footballdata import Connector
+from footballdata.cache import FileCache
+from footballdata.instrumentation import Histogram, Instrumentation, MetricsCollector, BUILD, LOAD, REQUEST
+
+from . import fake_api
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Tests events reported by a connector"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.events = []
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def connect(self, cache=None):
+        """Returns connector on the fake API reporting all events"""
+
+        connector = Connector(api_key='test', cache=cache, scheduler=False)
+        fake_api.mount(connector.session)
+        for event in (REQUEST, LOAD, BUILD):
+            connector.instrumentation.register(event, self.events.append)
+        return connector
+
+    def of(self, name):
+        return [event for event in self.events if event['event'] == name]
+
+    def test_events(self):
+        """Tests API calls, loads and builds are reported"""
+
+        with self.connect() as connector:
+            competitions = connector.get_competitions()
+            self.assertEqual(self.of(BUILD), [])
+            competitions[0].get_teams()[0]
+
+        request, _ = self.of(REQUEST)
+        self.assertEqual(request['endpoint'], connector.competition_endpoint)
+        self.assertEqual(request['status'], 200)
+        self.assertGreater(request['bytes'], 0)
+        self.assertIsNone(request['cache'])
+        self.assertEqual(request['retries'], 0)
+        self.assertGreaterEqual(request['latency'], 0)
+        self.assertGreaterEqual(request['decode'], 0)
+
+        load, teams_load = self.of(LOAD)
+        self.assertEqual(load['records'], 1)
+        self.assertEqual(load['source'], 'api')
+        self.assertEqual(teams_load['records'], 4)
+
+        self.assertEqual([event['klass'].__name__ for event in self.of(BUILD)], ['Competition', 'Team'])
+
+    def test_cache_events(self):
+        """Tests cache misses, hits and revalidations are reported"""
+
+        with self.connect(FileCache(self.directory)) as connector:
+            len(connector.get_competitions())
+        with self.connect(FileCache(self.directory)) as connector:
+            len(connector.get_competitions())
+        with self.connect(FileCache(self.directory, ttl=0)) as connector:
+            len(connector.get_competitions())
+
+        self.assertEqual([event['cache'] for event in self.of(REQUEST)], ['miss', 'hit', 'revalidated'])
+        self.assertEqual(self.of(REQUEST)[1]['status'], None)
+        self.assertEqual(self.of(REQUEST)[2]['status'], 304)
+
+    def test_stream_events(self):
+        """Tests streamed API calls report cache states and decode time"""
+
+        with self.connect(FileCache(self.directory)) as connector:
+            len(connector.get_fixtures())
+        with self.connect(FileCache(self.directory)) as connector:
+            self.assertEqual(len(list(connector.get_fixtures().stream())), 12)
+        with self.connect(FileCache(self.directory, ttl=0)) as connector:
+            self.assertEqual(len(list(connector.get_fixtures().stream())), 12)
+        with self.connect() as connector:
+            self.assertEqual(len(list(connector.get_fixtures().stream())), 12)
+
+        self.assertEqual([event['cache'] for event in self.of(REQUEST)], ['miss', 'hit', 'revalidated', None])
+        self.assertEqual(self.of(REQUEST)[2]['status'], 304)
+        streamed = self.of(REQUEST)[3]
+        self.assertEqual(streamed['status'], 200)
+        self.assertGreater(streamed['bytes'], 0)
+        self.assertGreaterEqual(streamed['decode'], 0)
+
+    def test_failing_callback(self):
+        """Tests errors of callbacks do not break API calls"""
+
+        def fail(event):
+            raise RuntimeError(event['event'])
+
+        with self.connect() as connector:
+            connector.instrumentation.register(REQUEST, fail)
+            with self.assertLogs('footballdata.instrumentation', 'ERROR'):
+                self.assertEqual(len(connector.get_competitions()), 1)
+
+    def test_registry(self):
+        """Tests callbacks are registered and removed by event"""
+
+        instrumentation = Instrumentation()
+        self.assertFalse(instrumentation.wants(REQUEST))
+        instrumentation.register(REQUEST, self.events.append)
+        self.assertTrue(instrumentation.wants(REQUEST))
+        self.assertFalse(instrumentation.wants(BUILD))
+        instrumentation.unregister(REQUEST, self.events.append)
+        self.assertFalse(instrumentation.wants(REQUEST))
+        with self.assertRaises(ValueError):
+            instrumentation.register('response', self.events.append)
+
+
+class TestMetricsCollector(unittest.TestCase):
+    """Tests aggregation of events into metrics"""
+
+    def test_crawl(self):
+        """Tests counters and histograms of a crawl"""
+
+        with Connector(api_key='test', scheduler=False) as connector:
+            fake_api.mount(connector.session)
+            collector = MetricsCollector().attach(connector)
+            for competition in connector.get_competitions():
+                len(competition.get_fixtures())
+                for team in competition.get_teams():
+                    list(team.get_players())
+            collector.detach(connector)
+            self.assertFalse(connector.instrumentation.wants(REQUEST))
+
+        metrics = collector.to_dict()
+        self.assertEqual(metrics['requests']['competitions']['requests'], 1)
+        self.assertEqual(metrics['requests']['teams']['requests'], 1)
+        self.assertEqual(metrics['requests']['teams']['records'], 4)
+        self.assertEqual(metrics['requests']['players']['requests'], 4)
+        self.assertEqual(metrics['requests']['players']['latency']['count'], 4)
+        self.assertEqual(metrics['requests']['fixtures']['records'], 12)
+        self.assertEqual(metrics['objects']['Player']['built'], 8)
+        self.assertEqual(metrics['objects']['Player']['clean']['count'], 8)
+        self.assertNotIn('Fixture', metrics['objects'])
+
+        collector.reset()
+        self.assertEqual(collector.to_dict(), {'requests': {}, 'objects': {}})
+
+    def test_histogram(self):
+        """Tests values are counted in buckets"""
+
+        histogram = Histogram(buckets=(1, 10, 100))
+        for value in (0.5, 5, 5, 50, 500):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.mean, 112.1)
+        self.assertEqual(histogram.quantile(0.5), 10)
+        self.assertEqual(histogram.quantile(1), 500)
+        self.assertEqual(histogram.to_dict()['buckets'], {'1': 1, '10': 2, '100': 1, '+Inf': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+    tests.test_mirror
+
+    Tests local mirror of API records in SQLite.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+from footballdata import Connector
+from footballdata.datasets import Competition, Fixture, Player, Team
+from footballdata.mirror import Mirror
+
+from . import fake_api
+
+
+class TestMirror(unittest.TestCase):
+    """Tests Mirror"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'mirror.sqlite3')
+        self.mirror = Mirror(self.path)
+
+    def tearDown(self):
+        self.mirror.close()
+        shutil.rmtree(self.directory)
+
+    def crawl(self, mirror):
+        """Fetches competitions, teams and fixtures with a new connector, returns fake adapter"""
+
+        with Connector(cache=mirror) as connector:
+            adapter = fake_api.mount(connector.session)
+            competition = connector.get_competitions()[0]
+            self.assertEqual(competition.caption, 'Premier League 2017')
+            self.assertEqual(len(competition.get_teams()), len(fake_api.TEAM_NAMES))
+            self.assertEqual(len(competition.get_fixtures()), 12)
+            self.assertEqual(len(competition.get_teams()[0].get_fixtures()), 6)
+        return adapter
+
+    def test_connector_served_from_mirror(self):
+        """Tests fresh responses are served from the mirror by a new connector"""
+
+        self.assertEqual(len(self.crawl(self.mirror).requests), 4)
+
+        mirror = Mirror(self.path)
+        self.assertEqual(len(self.crawl(mirror).requests), 0)
+        mirror.close()
+
+    def test_stale_responses_revalidated(self):
+        """Tests only stale endpoints are fetched, with validators"""
+
+        self.crawl(self.mirror)
+        mirror = Mirror(self.path, ttl={'fixtures': 0})
+        self.assertFalse(mirror.is_fresh(fake_api.BASE_URL + 'competitions/445/fixtures'))
+        self.assertTrue(mirror.is_fresh(fake_api.BASE_URL + 'competitions/445/teams'))
+
+        adapter = self.crawl(mirror)
+        self.assertEqual(len(adapter.requests), 2)
+        self.assertTrue(all(request.url.endswith('fixtures') for request in adapter.requests))
+        self.assertTrue(all('If-None-Match' in request.headers for request in adapter.requests))
+        mirror.close()
+
+    def test_records_upserted_by_url(self):
+        """Tests records returned by several endpoints are stored once"""
+
+        self.crawl(self.mirror)
+        self.crawl(self.mirror)
+        self.assertEqual(len(self.mirror.query(Fixture)), 12)
+        self.assertEqual(len(self.mirror.query(Team)), len(fake_api.TEAM_NAMES))
+        self.assertEqual(len(self.mirror.query(Fixture, endpoint=fake_api.BASE_URL + 'teams/1/fixtures')), 6)
+
+    def test_query_push_down(self):
+        """Tests lookups on indexed columns"""
+
+        self.crawl(self.mirror)
+
+        fixtures = self.mirror.query(Fixture, team='Arsenal FC')
+        self.assertEqual(len(fixtures), 6)
+        self.assertTrue(all('Arsenal FC' in (fixture.home_team_name, fixture.away_team_name) for fixture in fixtures))
+
+        fixtures = self.mirror.query(Fixture, date__gte=datetime(2017, 8, 5), order_by='-date')
+        self.assertEqual([fixture.matchday for fixture in fixtures], [6, 6, 5, 5])
+
+        self.assertEqual(len(self.mirror.query(Fixture, season=2017, status='FINISHED')), 12)
+        self.assertEqual(len(self.mirror.query(Fixture, season='2016')), 0)
+        self.assertEqual(len(self.mirror.query(Fixture, home_team_name__in=['Arsenal FC', 'Chelsea FC'])), 6)
+        self.assertEqual(len(self.mirror.query(Competition, year='2017')), 1)
+
+        # Lookups on columns which are not indexed are applied to objects
+        self.assertEqual(len(self.mirror.query(Fixture, team='Arsenal FC', odds=None)), 6)
+
+        with self.assertRaises(ValueError):
+            self.mirror.query(Fixture, order_by='odds')
+
+    def test_store_data_set(self):
+        """Tests storing a data set and replacing records without resource URL"""
+
+        with Connector() as connector:
+            fake_api.mount(connector.session)
+            players = connector.get_competitions()[0].get_teams()[0].get_players()
+            self.mirror.store(players)
+
+            endpoint = players.endpoint
+            self.assertEqual([player.name for player in self.mirror.query(Player, endpoint=endpoint)],
+                             ['Player 1', 'Player 2'])
+
+            self.mirror.store(players[:1], endpoint=endpoint)
+            self.assertEqual(len(self.mirror.query(Player, endpoint=endpoint)), 1)
+            self.assertEqual(len(self.mirror.query(Player)), 1)
+
+    def test_store_keeps_api_records(self):
+        """Tests records stored from a data set are read back as returned by the API"""
+
+        with Connector(cache=self.mirror) as connector:
+            fake_api.mount(connector.session)
+            fixtures = connector.get_fixtures()
+            fixtures[0].date
+            self.mirror.store(fixtures.filter(matchday=1), endpoint=connector.fixtures_endpoint,
+                              options={'matchday': 1})
+
+            records = self.mirror.get(connector.fixtures_endpoint).data['fixtures']
+            self.assertEqual(records, fake_api.fixture_list())
+            stored = self.mirror.get(connector.fixtures_endpoint, {'matchday': 1}).data['fixtures']
+            self.assertEqual(stored, fake_api.fixture_list()[:2])
+
+
+if __name__ == '__main__':
+    unittest.main()
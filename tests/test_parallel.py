@@ -0,0 +1,119 @@
+"""
+    tests.test_parallel
+
+    Tests parsing of large responses in a process pool.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+from footballdata import Connector
+from footballdata.cache import FileCache
+from footballdata.datasets import Fixture, Player
+from footballdata.parallel import PreparedRecords, ProcessPoolParser, prepare_records
+from footballdata.snapshot import Snapshot
+
+from . import fake_api
+
+
+def postponing_decoder(content):
+    """Decodes a response marking its fixtures as postponed, run by worker processes"""
+
+    data = json.loads(content)
+    for fixture in data.get('fixtures', []):
+        fixture['status'] = 'POSTPONED'
+    return data
+
+
+class TestProcessPoolParser(unittest.TestCase):
+    """Tests data sets loaded through a ProcessPoolParser"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.parser = ProcessPoolParser(max_workers=1, threshold=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.parser.close()
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def connect(self, parser=None, **kwargs):
+        """Returns connector on the fake API"""
+
+        connector = Connector(api_key='test', scheduler=False, parser=parser or self.parser, **kwargs)
+        fake_api.mount(connector.session)
+        return connector
+
+    def test_prepare_records(self):
+        """Tests records are cleaned, dates parsed and keys shared"""
+
+        content = json.dumps(fake_api.build_routes()['fixtures/']).encode('utf-8')
+        records = prepare_records(Fixture, content)
+
+        self.assertTrue(isinstance(records, PreparedRecords))
+        self.assertEqual(len(records), 12)
+        self.assertIs(records[0][0], records[1][0])
+        data = PreparedRecords.to_dict(records[0])
+        self.assertEqual(data['home_team_name'], 'Arsenal FC')
+        self.assertEqual(data['date'], datetime(2017, 8, 1, 18, 45, tzinfo=timezone.utc))
+
+    def test_data_sets(self):
+        """Tests objects built from prepared records equal objects built from API records"""
+
+        with self.connect() as connector, self.connect(parser=ProcessPoolParser(threshold=2 ** 30)) as inline:
+            fixtures = connector.get_fixtures()
+            self.assertEqual([(fixture.date, fixture.status, fixture.result) for fixture in fixtures],
+                             [(fixture.date, fixture.status, fixture.result) for fixture in inline.get_fixtures()])
+            self.assertEqual(list(fixtures._rows())[0]['date'], fixtures[0].date)
+
+            team = fixtures[0].get_home_team()
+            self.assertIs(team, connector.get_competitions()[0].get_teams()[0])
+            players = team.get_players()
+            self.assertTrue(all(isinstance(player, Player) for player in players))
+            self.assertEqual(len(fixtures.filter(date__gte='2017-08-01', status='FINISHED')), 12)
+
+    def test_decoder(self):
+        """Tests workers decode responses with the decoder of the session"""
+
+        with self.connect(decoder=postponing_decoder) as connector:
+            fixtures = connector.get_fixtures()
+            self.assertEqual({fixture.status for fixture in fixtures}, {'POSTPONED'})
+
+        with self.assertRaises(TypeError):
+            self.parser.decoder(Fixture, lambda content: json.loads(content))
+
+    def test_snapshot(self):
+        """Tests prepared records are written to snapshots"""
+
+        path = os.path.join(self.directory, 'snapshot')
+        with self.connect() as connector:
+            len(connector.get_fixtures())
+            connector.save_snapshot(path)
+
+        records = Snapshot(path).take(connector.fixtures_endpoint, {})
+        self.assertEqual(len(records), 12)
+        self.assertEqual(records[0]['date'], '2017-08-01T18:45:00+00:00')
+
+    def test_cached_responses(self):
+        """Tests responses are decoded as returned by the API if a cache stores them"""
+
+        with self.connect(cache=FileCache(self.directory)) as connector:
+            fixtures = connector.get_fixtures()
+            self.assertEqual(len(fixtures), 12)
+            self.assertFalse(isinstance(next(fixtures._rows())['date'], datetime))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+"""
+    tests.test_prefetch
+
+    Tests concurrent loading of competition trees.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import threading
+import time
+import unittest
+
+from footballdata import Connector
+
+from . import fake_api
+
+
+class SlowAPIAdapter(fake_api.FakeAPIAdapter):
+    """Fake API adapter which records the number of requests in flight"""
+
+    def __init__(self, delay=0.02):
+        super().__init__()
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        return super().send(request, **kwargs)
+
+
+class TestPrefetch(unittest.TestCase):
+    """Tests Connector.prefetch"""
+
+    def setUp(self):
+        self.connector = Connector(pool_size=8)
+        self.adapter = SlowAPIAdapter()
+        self.connector.session.mount('http://', self.adapter)
+
+    def tearDown(self):
+        self.connector.close()
+
+    def test_prefetch_fills_caches(self):
+        """Tests that prefetch loads the whole tree and get methods use the cache"""
+
+        competitions = self.connector.prefetch()
+        request_count = len(self.adapter.requests)
+        self.assertEqual(request_count, 4 + 2 * len(fake_api.TEAM_NAMES))
+
+        for competition in competitions:
+            self.assertEqual(len(competition.get_league_table()), 0)
+            self.assertEqual(len(competition.get_fixtures()), len(fake_api.fixture_list()))
+            for team in competition.get_teams():
+                self.assertEqual(len(team.get_players()), 2)
+                self.assertTrue(team.get_fixtures())
+        self.assertEqual(len(self.adapter.requests), request_count)
+        self.assertGreater(self.adapter.max_in_flight, 1)
+        self.assertLessEqual(self.adapter.max_in_flight, 8)
+
+    def test_prefetch_depth(self):
+        """Tests that depth 1 skips team level data sets"""
+
+        self.connector.prefetch(depth=1, max_workers=2)
+        self.assertEqual(len(self.adapter.requests), 4)
+        self.assertLessEqual(self.adapter.max_in_flight, 2)
@@ -0,0 +1,190 @@
+"""
+    tests.test_refresh
+
+    Tests refreshing data sets in place and in the background.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import shutil
+import tempfile
+import time
+import unittest
+
+from requests import ConnectionError
+
+from footballdata import Connector
+from footballdata.cache import FileCache
+from footballdata.instrumentation import LOAD
+from footballdata.refresh import BackgroundRefresher, FreshnessPolicy
+
+from . import fake_api
+
+
+class FailingAPIAdapter(fake_api.FakeAPIAdapter):
+    """Fake API raising connection errors while down"""
+
+    down = False
+
+    def send(self, request, **kwargs):
+        if self.down:
+            self.requests.append(request)
+            raise ConnectionError('API is down')
+        return super().send(request, **kwargs)
+
+
+def wait_until(condition, timeout=5):
+    """Waits until condition returns True, fails after timeout seconds"""
+
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Condition not met within {} seconds'.format(timeout))
+        time.sleep(0.01)
+
+
+class TestRefresh(unittest.TestCase):
+    """Tests refreshing data sets"""
+
+    def setUp(self):
+        self.connector = Connector(api_key='test', scheduler=False)
+        self.adapter = FailingAPIAdapter()
+        self.connector.session.mount('http://', self.adapter)
+
+    def tearDown(self):
+        self.connector.close()
+
+    def set_status(self, status):
+        """Changes status of first fixture returned by the fake API"""
+
+        fixtures = [dict(fixture) for fixture in self.adapter.routes['fixtures/']['fixtures']]
+        fixtures[0]['status'] = status
+        self.adapter.routes['fixtures/'] = {'count': len(fixtures), 'fixtures': fixtures}
+
+    def test_refresh(self):
+        """Tests objects of a data set are replaced in place"""
+
+        events = []
+        self.connector.instrumentation.register(LOAD, events.append)
+        fixtures = self.connector.get_fixtures()
+        view = fixtures[:1]
+        self.assertEqual(fixtures[0].status, 'FINISHED')
+
+        self.set_status('IN_PLAY')
+        self.assertTrue(fixtures.refresh())
+        self.assertIs(self.connector.get_fixtures(), fixtures)
+        self.assertEqual(fixtures[0].status, 'IN_PLAY')
+        self.assertEqual(len(fixtures), 12)
+        self.assertEqual(view[0].status, 'FINISHED')
+        self.assertEqual([event['source'] for event in events], ['api', 'refresh'])
+
+    def test_refresh_failure(self):
+        """Tests objects are kept if the API fails"""
+
+        fixtures = self.connector.get_fixtures()
+        fixture = fixtures[0]
+
+        self.adapter.down = True
+        self.assertRaises(ConnectionError, fixtures.refresh)
+        self.assertIs(fixtures[0], fixture)
+
+        self.adapter.down = False
+        del self.adapter.routes['fixtures/']
+        self.assertFalse(fixtures.refresh())
+        self.assertIs(fixtures[0], fixture)
+
+    def test_refresh_cached(self):
+        """Tests fresh responses of a cache are revalidated"""
+
+        directory = tempfile.mkdtemp()
+        try:
+            with Connector(api_key='test', scheduler=False, cache=FileCache(directory)) as connector:
+                adapter = fake_api.mount(connector.session)
+                fixtures = connector.get_fixtures()
+                self.assertEqual(len(fixtures), 12)
+                self.assertTrue(fixtures.refresh())
+                self.assertEqual(len(adapter.requests), 2)
+                self.assertIn('If-None-Match', adapter.requests[1].headers)
+                self.assertEqual(len(fixtures), 12)
+        finally:
+            shutil.rmtree(directory)
+
+    def test_policy(self):
+        """Tests refresh interval and retry backoff of policies"""
+
+        policy = FreshnessPolicy(60, refresh_ahead=0.25, retry_delay=10)
+        self.assertEqual(policy.interval, 45)
+        self.assertEqual([policy.retry_after(failures) for failures in range(1, 5)], [10, 20, 40, 45])
+        self.assertRaises(ValueError, FreshnessPolicy, 0)
+        self.assertRaises(ValueError, FreshnessPolicy, 60, refresh_ahead=1)
+
+        refresher = BackgroundRefresher(ttl={'fixtures': 30})
+        self.assertEqual(refresher.ttl_for(self.connector.fixtures_endpoint), 30)
+        self.assertEqual(refresher.ttl_for(self.connector.competition_endpoint), 24 * 60 * 60)
+
+    def test_background_refresh(self):
+        """Tests registered data sets are loaded and refreshed before they expire"""
+
+        with BackgroundRefresher() as refresher:
+            fixtures = refresher.register(self.connector.get_fixtures(), ttl=0.2)
+            status = refresher.status(fixtures)
+            wait_until(lambda: fixtures.loaded)
+            self.assertEqual(len(refresher), 1)
+
+            self.set_status('IN_PLAY')
+            wait_until(lambda: fixtures[0].status == 'IN_PLAY')
+            self.assertFalse(status.stale)
+            self.assertEqual(status.failures, 0)
+
+            refresher.unregister(fixtures)
+            self.assertIsNone(refresher.status(fixtures))
+
+    def test_background_failure(self):
+        """Tests last good data is served and failed refreshes are retried"""
+
+        with BackgroundRefresher() as refresher:
+            fixtures = refresher.register(self.connector.get_fixtures(),
+                                          policy=FreshnessPolicy(0.2, retry_delay=0.02))
+            wait_until(lambda: fixtures.loaded)
+            fixture = fixtures[0]
+            status = refresher.status(fixtures)
+
+            self.adapter.down = True
+            wait_until(lambda: status.failures >= 2)
+            self.assertTrue(isinstance(status.error, ConnectionError))
+            self.assertIs(fixtures[0], fixture)
+            wait_until(lambda: status.stale)
+
+            self.adapter.down = False
+            self.set_status('IN_PLAY')
+            wait_until(lambda: status.failures == 0)
+            self.assertEqual(fixtures[0].status, 'IN_PLAY')
+            self.assertIsNone(status.error)
+
+    def test_refresh_soon(self):
+        """Tests a registered data set is refreshed on demand and again after restart"""
+
+        fixtures = self.connector.get_fixtures()
+        len(fixtures)
+        refresher = BackgroundRefresher()
+        try:
+            refresher.register(fixtures, ttl=60)
+            self.set_status('IN_PLAY')
+            refresher.refresh_soon(fixtures)
+            wait_until(lambda: fixtures[0].status == 'IN_PLAY')
+
+            refresher.stop()
+            self.set_status('POSTPONED')
+            refresher.refresh_soon(fixtures)
+            time.sleep(0.05)
+            self.assertEqual(fixtures[0].status, 'IN_PLAY')
+            refresher.start()
+            wait_until(lambda: fixtures[0].status == 'POSTPONED')
+            self.assertRaises(KeyError, refresher.refresh_soon, self.connector.get_competitions())
+        finally:
+            refresher.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
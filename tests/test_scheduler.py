@@ -0,0 +1,102 @@
+"""
+    tests.test_scheduler
+
+    Tests scheduling of API calls within request quota.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+from footballdata.scheduler import RequestScheduler, priority, HIGH, LOW
+
+
+class FakeResponse:
+    """Minimal response object with status code and headers"""
+
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestRequestScheduler(unittest.TestCase):
+    """Tests RequestScheduler"""
+
+    def test_rate_limit(self):
+        """Tests that requests beyond the bucket size wait for refill"""
+
+        scheduler = RequestScheduler(rate=2, period=0.2)
+        start = time.monotonic()
+        for _ in range(5):
+            scheduler.request(FakeResponse)
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test_quota_headers(self):
+        """Tests that bucket follows remaining requests and reset reported by API"""
+
+        scheduler = RequestScheduler(rate=10, period=60)
+        scheduler.request(lambda: FakeResponse(headers={'X-Requests-Available-Minute': '49',
+                                                        'X-RequestCounter-Reset': '0.2'}))
+        self.assertEqual(scheduler.tokens, 49)
+
+        scheduler.request(lambda: FakeResponse(headers={'X-Requests-Available-Minute': '0',
+                                                        'X-RequestCounter-Reset': '0.2'}))
+        self.assertEqual(scheduler.tokens, 0)
+        start = time.monotonic()
+        scheduler.request(FakeResponse)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(scheduler.tokens, 49)
+
+    def test_priority(self):
+        """Tests that high priority requests are sent before queued low priority ones"""
+
+        scheduler = RequestScheduler(rate=1, period=0.3)
+        scheduler.acquire()
+        order = []
+
+        def send(name, level):
+            with priority(level):
+                scheduler.request(lambda: order.append(name) or FakeResponse())
+
+        low = threading.Thread(target=send, args=('low', LOW))
+        high = threading.Thread(target=send, args=('high', HIGH))
+        low.start()
+        time.sleep(0.05)
+        high.start()
+        low.join()
+        high.join()
+        self.assertEqual(order, ['high', 'low'])
+
+    def test_retries(self):
+        """Tests that server errors and 429 are retried"""
+
+        scheduler = RequestScheduler(backoff=0.01)
+        responses = [FakeResponse(503), FakeResponse(429, {'Retry-After': '0.05'}), FakeResponse(200)]
+        sent = list(responses)
+        response = scheduler.request(lambda: responses.pop(0))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.retries, 2)
+        # Retried responses release their connections
+        self.assertEqual([response.closed for response in sent], [True, True, False])
+
+        scheduler = RequestScheduler(backoff=0.01, max_retries=1)
+        response = scheduler.request(lambda: FakeResponse(500))
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.retries, 1)
+
+    def test_lazy_imports(self):
+        """Tests that asyncio and process pools are not imported with the package"""
+
+        code = ("import sys, footballdata; "
+                "print('asyncio' in sys.modules, 'concurrent.futures.process' in sys.modules)")
+        output = subprocess.check_output([sys.executable, '-c', code])
+        self.assertEqual(output.split(), [b'False', b'False'])
@@ -0,0 +1,61 @@
+"""
+    tests.test_session
+
+    Tests connection pooling shared by connector and data sets.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import unittest
+
+from footballdata import Connector
+from footballdata.utils import Session
+
+from . import fake_api
+
+
+class TestSession(unittest.TestCase):
+    """Tests pooled HTTP sessions"""
+
+    def setUp(self):
+        self.connector = Connector(api_key='secret', pool_size=4, timeout=5, headers={'X-Client': 'tests'})
+
+    def tearDown(self):
+        self.connector.close()
+
+    def test_session_configuration(self):
+        """Tests pool size, timeout and default headers of session"""
+
+        session = self.connector.session
+        self.assertTrue(isinstance(session, Session))
+        self.assertEqual(session.timeout, 5)
+        self.assertEqual(session.headers['X-Auth-Token'], 'secret')
+        self.assertEqual(session.headers['X-Client'], 'tests')
+        self.assertEqual(session.get_adapter('http://api.football-data.org/')._pool_maxsize, 4)
+
+    def test_session_shared_by_data_sets(self):
+        """Tests that every fetch in a crawl goes through connector session"""
+
+        adapter = fake_api.mount(self.connector.session)
+        competition = self.connector.get_competitions()[0]
+        self.assertIs(competition.session, self.connector.session)
+
+        team = competition.get_teams()[0]
+        self.assertIs(team.session, self.connector.session)
+        self.assertEqual(len(team.get_players()), 2)
+        self.assertEqual(len(adapter.requests), 3)
+        self.assertTrue(all(request.headers['X-Client'] == 'tests' for request in adapter.requests))
+
+    def test_context_manager_closes_session(self):
+        """Tests that leaving the context closes pooled connections"""
+
+        with Connector() as connector:
+            adapter = fake_api.mount(connector.session)
+            adapter.close_calls = 0
+
+            def close():
+                adapter.close_calls += 1
+            adapter.close = close
+
+        self.assertGreater(adapter.close_calls, 0)
@@ -0,0 +1,136 @@
+"""
+    tests.test_single_flight
+
+    Tests deduplication of concurrent API calls and thread safe loading.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from footballdata import Connector
+from footballdata.datasets import DataSet, Team
+from footballdata.utils import SingleFlight
+
+from . import fake_api
+
+
+THREADS = 8
+
+
+class SlowAPIAdapter(fake_api.FakeAPIAdapter):
+    """Fake API adapter which keeps requests in flight for a while"""
+
+    def send(self, request, **kwargs):
+        time.sleep(0.05)
+        return super().send(request, **kwargs)
+
+
+def run_concurrently(function):
+    """Calls function from several threads at once and returns the results"""
+
+    barrier = threading.Barrier(THREADS)
+
+    def call():
+        barrier.wait()
+        return function()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        futures = [executor.submit(call) for _ in range(THREADS)]
+        return [future.result() for future in futures]
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Tests SingleFlight"""
+
+    def test_concurrent_calls_share_result(self):
+        """Tests concurrent calls with the same key run the function once"""
+
+        flight = SingleFlight()
+        calls = []
+
+        def function():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        results = run_concurrently(lambda: flight.do('key', function))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.shared, THREADS - 1)
+
+        # Later calls run the function again
+        flight.do('key', function)
+        self.assertEqual(len(calls), 2)
+
+    def test_exception_is_shared(self):
+        """Tests callers waiting for a failed call receive its exception"""
+
+        flight = SingleFlight()
+
+        def function():
+            time.sleep(0.05)
+            raise ValueError('failed')
+
+        def call():
+            try:
+                flight.do('key', function)
+            except ValueError as error:
+                return error
+
+        errors = run_concurrently(call)
+        self.assertTrue(all(isinstance(error, ValueError) for error in errors))
+
+
+class TestConcurrentLoading(unittest.TestCase):
+    """Tests data sets and caches accessed from several threads"""
+
+    def setUp(self):
+        self.connector = Connector(api_key='test')
+        self.adapter = SlowAPIAdapter()
+        self.connector.session.mount('http://', self.adapter)
+
+    def tearDown(self):
+        self.connector.close()
+
+    def test_fetches_are_coalesced(self):
+        """Tests data sets of the same endpoint loaded at once send one request"""
+
+        endpoint = fake_api.BASE_URL + 'competitions/445/teams'
+
+        def load():
+            return len(DataSet(klass=Team, endpoint=endpoint, session=self.connector.session))
+
+        self.assertEqual(run_concurrently(load), [4] * THREADS)
+        self.assertEqual(len(self.adapter.requests), 1)
+
+    def test_data_set_loaded_once(self):
+        """Tests a data set is loaded once and builds each object once"""
+
+        teams = DataSet(klass=Team, endpoint=fake_api.BASE_URL + 'competitions/445/teams',
+                        session=self.connector.session)
+        results = run_concurrently(lambda: teams[0])
+        self.assertTrue(all(team is results[0] for team in results))
+        self.assertEqual(len(self.adapter.requests), 1)
+
+    def test_get_methods(self):
+        """Tests concurrent get calls return the same cached data set"""
+
+        data_sets = run_concurrently(self.connector.get_competitions)
+        self.assertTrue(all(data_set is data_sets[0] for data_set in data_sets))
+
+        competition = data_sets[0][0]
+        data_sets = run_concurrently(competition.get_teams)
+        self.assertTrue(all(data_set is data_sets[0] for data_set in data_sets))
+        self.assertEqual(len(self.adapter.requests), 1)
+
+        run_concurrently(lambda: len(competition.get_teams()))
+        self.assertEqual(len(self.adapter.requests), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+    tests.test_snapshot
+
+    Tests binary snapshots of loaded data sets.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from footballdata import Connector
+from footballdata.snapshot import Snapshot, HEADER, MAGIC
+
+from . import fake_api
+
+
+class TestSnapshot(unittest.TestCase):
+    """Tests Connector.save_snapshot and Connector.load_snapshot"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'connector.snapshot')
+
+        with Connector(api_key='secret-key') as connector:
+            fake_api.mount(connector.session)
+            connector.prefetch()
+            len(connector.get_fixtures())
+            connector.save_snapshot(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_warm_start(self):
+        """Tests a connector restored from snapshot serves the crawled tree without API calls"""
+
+        with Connector(api_key='other-key') as connector:
+            adapter = fake_api.mount(connector.session)
+            snapshot = connector.load_snapshot(self.path)
+            self.assertEqual(len(snapshot), 1 + 3 + 1 + 4 * 2)
+
+            competitions = connector.get_competitions()
+            self.assertFalse(competitions.loaded)
+            competition = competitions[0]
+            self.assertEqual(competition.caption, 'Premier League 2017')
+            self.assertEqual(len(competition.get_fixtures()), 12)
+            self.assertEqual(len(competition.get_league_table()), 0)
+            self.assertEqual(len(connector.get_fixtures()), 12)
+
+            for team in competition.get_teams():
+                self.assertEqual(len(team.get_fixtures()), 6)
+                self.assertEqual([player.name for player in team.get_players()], ['Player 1', 'Player 2'])
+                self.assertEqual(team.api_key, 'other-key')
+
+            self.assertEqual(adapter.requests, [])
+
+            # Refreshed data sets are fetched from API
+            self.assertEqual(len(connector.get_competitions(force_update=True)), 1)
+            self.assertEqual(len(adapter.requests), 1)
+            self.assertEqual(adapter.requests[0].headers['X-Auth-Token'], 'other-key')
+
+    def test_api_key_not_stored(self):
+        """Tests the API key is not written to the snapshot"""
+
+        with open(self.path, 'rb') as snapshot_file:
+            self.assertNotIn(b'secret-key', snapshot_file.read())
+
+    def test_records_decoded_on_access(self):
+        """Tests records are decoded individually from the snapshot"""
+
+        with Snapshot(self.path) as snapshot:
+            endpoint = fake_api.BASE_URL + 'competitions/445/fixtures'
+            records = snapshot.take(endpoint)
+            self.assertEqual(len(records), 12)
+            self.assertEqual(records[-1]['matchday'], 6)
+            self.assertEqual(records[0]['home_team_name'], 'Arsenal FC')
+            self.assertIsNone(snapshot.take(endpoint))
+
+        # Records taken before the file is closed are kept
+        self.assertEqual(records[-1]['matchday'], 6)
+
+    def test_close(self):
+        """Tests snapshots are closed when replaced and with their connector"""
+
+        with Connector(api_key='other-key') as connector:
+            adapter = fake_api.mount(connector.session)
+            first = connector.load_snapshot(self.path)
+            competitions = connector.get_competitions()
+            fixtures = competitions[0].get_fixtures()
+            len(fixtures)
+
+            second = connector.load_snapshot(self.path)
+            self.assertIsNone(first.take(connector.fixtures_endpoint))
+            self.assertEqual(fixtures[-1].matchday, 6)
+            self.assertEqual(len(connector.get_fixtures()), 12)
+            self.assertEqual(adapter.requests, [])
+
+        self.assertIsNone(connector.session.snapshot)
+        self.assertIsNone(second.take(fake_api.BASE_URL + 'competitions/445/fixtures'))
+
+    def test_invalid_files(self):
+        """Tests files with other contents or versions are rejected"""
+
+        with open(self.path, 'r+b') as snapshot_file:
+            header = HEADER.unpack(snapshot_file.read(HEADER.size))
+            snapshot_file.seek(0)
+            snapshot_file.write(HEADER.pack(MAGIC, header[1] + 1, *header[2:]))
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+        with open(self.path, 'wb') as snapshot_file:
+            snapshot_file.write(struct.pack('<Q', 0) * 8)
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
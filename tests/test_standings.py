@@ -0,0 +1,130 @@
+"""
+    tests.test_standings
+
+    Tests computation of league tables from fixtures.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import unittest
+
+from footballdata.connector import Connector
+from footballdata.datasets import DataSet, Fixture
+from footballdata.standings import LeagueTable
+from footballdata.utils import clean_object
+
+from . import fake_api
+
+
+def fixture_data_set(payload):
+    """Returns a loaded DataSet of fixtures"""
+    fixtures = DataSet(klass=Fixture, endpoint=fake_api.BASE_URL + 'fixtures/')
+    fixtures._populate({'fixtures': payload})
+    return fixtures
+
+
+class TestLeagueTable(unittest.TestCase):
+    """Tests LeagueTable"""
+
+    def setUp(self):
+        self.payload = fake_api.fixture_list()
+        self.fixtures = fixture_data_set(self.payload)
+
+    def test_totals(self):
+        """Tests totals of every team against the results of fixtures"""
+
+        standings = LeagueTable.from_fixtures(self.fixtures).standings()
+        self.assertEqual(len(standings), len(fake_api.TEAM_NAMES))
+
+        for standing in standings:
+            played = [fixture for fixture in self.payload
+                      if standing.team_name in (fixture['homeTeamName'], fixture['awayTeamName'])]
+            goals = goals_against = wins = draws = 0
+            for fixture in played:
+                home_goals, away_goals = fixture['result']['goalsHomeTeam'], fixture['result']['goalsAwayTeam']
+                if fixture['homeTeamName'] != standing.team_name:
+                    home_goals, away_goals = away_goals, home_goals
+                goals += home_goals
+                goals_against += away_goals
+                wins += home_goals > away_goals
+                draws += home_goals == away_goals
+
+            self.assertEqual(standing.played_games, len(played))
+            self.assertEqual(standing.goals, goals)
+            self.assertEqual(standing.goals_against, goals_against)
+            self.assertEqual(standing.goal_difference, goals - goals_against)
+            self.assertEqual(standing.wins, wins)
+            self.assertEqual(standing.draws, draws)
+            self.assertEqual(standing.losses, len(played) - wins - draws)
+            self.assertEqual(standing.points, 3 * wins + draws)
+            self.assertEqual(standing.home['wins'] + standing.away['wins'], wins)
+            self.assertEqual(standing.home['goals'] + standing.away['goals'], goals)
+            self.assertEqual(standing.home['goalsAgainst'] + standing.away['goalsAgainst'], goals_against)
+
+    def test_positions(self):
+        """Tests teams are ordered by points, goal difference and goals"""
+
+        standings = list(LeagueTable.from_fixtures(self.fixtures).standings())
+        self.assertEqual([standing.position for standing in standings], [1, 2, 3, 4])
+        keys = [(-standing.points, -standing.goal_difference, -standing.goals) for standing in standings]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_match_day(self):
+        """Tests table as of a match day only counts fixtures up to that match day"""
+
+        standings = LeagueTable.from_fixtures(self.fixtures, match_day=2).standings()
+        self.assertEqual(len(standings), len(fake_api.TEAM_NAMES))
+        self.assertEqual(sum(standing.played_games for standing in standings), 2 * 4)
+
+        expected = LeagueTable.from_fixtures(self.fixtures.filter(matchday__lte=2)).standings()
+        self.assertEqual([(standing.team_name, standing.points) for standing in standings],
+                         [(standing.team_name, standing.points) for standing in expected])
+
+    def test_unfinished_fixtures(self):
+        """Tests fixtures which are not finished are not counted"""
+
+        self.payload[0]['status'] = 'TIMED'
+        self.payload[0]['result'] = {'goalsHomeTeam': None, 'goalsAwayTeam': None}
+        self.payload[1]['status'] = 'IN_PLAY'
+        standings = LeagueTable.from_fixtures(fixture_data_set(self.payload)).standings()
+        self.assertEqual(sum(standing.played_games for standing in standings), 2 * (len(self.payload) - 2))
+
+    def test_update(self):
+        """Tests updating a result replaces its previous result"""
+
+        table = LeagueTable.from_fixtures(self.fixtures)
+
+        self.payload[3]['result'] = {'goalsHomeTeam': 5, 'goalsAwayTeam': 0}
+        table.update(Fixture(**clean_object(self.payload[3], Fixture.key_map)))
+        expected = LeagueTable.from_fixtures(fixture_data_set(self.payload)).standings()
+
+        summary = [(standing.team_name, standing.points, standing.goals, standing.played_games)
+                   for standing in table.standings()]
+        self.assertEqual(summary, [(standing.team_name, standing.points, standing.goals, standing.played_games)
+                                   for standing in expected])
+
+        table.remove(self.fixtures[3])
+        self.assertEqual(sum(standing.played_games for standing in table.standings()),
+                         2 * (len(self.payload) - 1))
+
+
+class TestComputeLeagueTable(unittest.TestCase):
+    """Tests computing league table of a competition"""
+
+    def test_compute_league_table(self):
+        """Tests the league table is computed from fixtures without requesting it"""
+
+        connector = Connector(api_key='test')
+        adapter = fake_api.mount(connector.session)
+        competition = connector.get_competitions()[0]
+
+        standings = competition.compute_league_table(match_day=3)
+        self.assertEqual(len(standings), len(fake_api.TEAM_NAMES))
+        self.assertEqual(sum(standing.played_games for standing in standings), 2 * 6)
+        self.assertFalse(any(request.url.endswith('leagueTable') for request in adapter.requests))
+        connector.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
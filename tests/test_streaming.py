@@ -0,0 +1,146 @@
+"""
+    tests.test_streaming
+
+    Tests incremental parsing of API responses.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import io
+import json
+import unittest
+
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from footballdata import Connector
+from footballdata.datasets import Fixture
+from footballdata.streaming import iter_json_items, stream_data_from_api
+
+from . import fake_api
+
+
+def split(data, size):
+    """Returns data in chunks of given size"""
+    return [data[index:index + size] for index in range(0, len(data), size)]
+
+
+class StreamingAdapter(BaseAdapter):
+    """Adapter answering with a body read from a stream"""
+
+    def __init__(self, payload):
+        super().__init__()
+        self.body = io.BytesIO(json.dumps(payload).encode('utf-8'))
+
+    def send(self, request, **kwargs):
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        response.raw = self.body
+        return response
+
+    def close(self):
+        pass
+
+
+class TestIterJSONItems(unittest.TestCase):
+    """Tests parsing lists from chunks of JSON documents"""
+
+    def test_chunk_sizes(self):
+        """Tests items are parsed whatever the chunk boundaries"""
+
+        payload = {'_links': {'self': {'href': 'fixtures'}}, 'count': 12345,
+                   'fixtures': [{'id': index, 'name': 'München – {}'.format(index), 'score': [1.5e3, None]}
+                                for index in range(20)]}
+        data = json.dumps(payload, indent=1, ensure_ascii=False).encode('utf-8')
+        for size in (1, 2, 3, 7, 64, len(data)):
+            self.assertEqual(list(iter_json_items(split(data, size), 'fixtures')), payload['fixtures'])
+
+    def test_numbers_split_across_chunks(self):
+        """Tests numbers are parsed whole when a chunk ends inside them"""
+
+        documents = [(b'{"count": 1.5, "fixtures": [{"a": 1}, {"b": 2}]}', 'fixtures'),
+                     (b'[1.25, 2e3, 3, -4.5E-2, 12345]', None)]
+        for data, key in documents:
+            expected = json.loads(data) if key is None else json.loads(data)[key]
+            for size in range(1, len(data) + 1):
+                self.assertEqual(list(iter_json_items(split(data, size), key)), expected)
+
+    def test_list_document(self):
+        """Tests items of a document which is a list"""
+
+        data = b'[1, 23, {"a": [4]}, "five"]'
+        self.assertEqual(list(iter_json_items(split(data, 2))), [1, 23, {'a': [4]}, 'five'])
+
+    def test_missing_and_empty_lists(self):
+        """Tests documents without list items yield nothing"""
+
+        self.assertEqual(list(iter_json_items([b'{}'], 'teams')), [])
+        self.assertEqual(list(iter_json_items([b'{"count": 0, "teams": []}'], 'teams')), [])
+        self.assertEqual(list(iter_json_items([b'{"teams": null, "count": 2}'], 'teams')), [])
+        self.assertEqual(list(iter_json_items([b'[]'])), [])
+
+    def test_invalid_document(self):
+        """Tests malformed and truncated documents raise ValueError"""
+
+        with self.assertRaises(ValueError):
+            list(iter_json_items([b'{"teams": [1, 2'], 'teams'))
+        with self.assertRaises(ValueError):
+            list(iter_json_items([b'{"teams": [1 2]}'], 'teams'))
+
+
+class TestDataSetStream(unittest.TestCase):
+    """Tests streaming objects of data sets"""
+
+    def test_stream(self):
+        """Tests objects are built from the API response without loading the data set"""
+
+        with Connector(api_key='test', scheduler=False) as connector:
+            adapter = fake_api.mount(connector.session)
+            fixtures = connector.get_fixtures()
+            streamed = list(fixtures.stream())
+
+            self.assertEqual(len(streamed), 12)
+            self.assertTrue(all(isinstance(fixture, Fixture) for fixture in streamed))
+            self.assertEqual(streamed[0].get_home_team().name, 'Arsenal FC')
+            self.assertFalse(fixtures.loaded)
+
+            # Loaded data sets are streamed from memory
+            self.assertEqual(len(fixtures), 12)
+            requests = len(adapter.requests)
+            self.assertEqual(list(fixtures.stream()), list(fixtures))
+            self.assertEqual(len(adapter.requests), requests)
+
+    def test_tiny_chunks(self):
+        """Tests records of a response read one byte at a time equal the decoded response"""
+
+        payload = {'count': 1.5, 'fixtures': fake_api.fixture_list()}
+        payload['fixtures'][0]['odds'] = {'homeWin': 1.25, 'draw': 3e3, 'awayWin': -4.5E-2}
+        with Connector(api_key='test', scheduler=False) as connector:
+            adapter = StreamingAdapter(payload)
+            connector.session.mount('http://', adapter)
+            records = stream_data_from_api(connector.fixtures_endpoint, key='fixtures', session=connector.session,
+                                           chunk_size=1)
+            self.assertEqual(list(records), json.loads(json.dumps(payload))['fixtures'])
+
+    def test_first_records_before_download_completes(self):
+        """Tests records are available before the whole body is read"""
+
+        payload = {'count': 2400, 'fixtures': fake_api.fixture_list() * 200}
+        with Connector(api_key='test', scheduler=False) as connector:
+            adapter = StreamingAdapter(payload)
+            connector.session.mount('http://', adapter)
+
+            stream = connector.get_fixtures().stream()
+            first = next(stream)
+            self.assertEqual(first.matchday, 1)
+            self.assertLess(adapter.body.tell(), len(adapter.body.getvalue()) / 10)
+            self.assertEqual(sum(1 for _ in stream), 2399)
+
+
+if __name__ == '__main__':
+    unittest.main()
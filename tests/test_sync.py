@@ -0,0 +1,104 @@
+"""
+    tests.test_sync
+
+    Tests incremental synchronisation of fixtures.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import unittest
+from urllib.parse import parse_qs, urlsplit
+
+from footballdata.connector import Connector
+from footballdata.sync import FixtureSync, ADDED, CHANGED, REMOVED
+
+from . import fake_api
+
+
+class TestFixtureSync(unittest.TestCase):
+    """Tests FixtureSync"""
+
+    def setUp(self):
+        self.connector = Connector(api_key='test')
+        self.routes = fake_api.build_routes()
+        self.adapter = fake_api.mount(self.connector.session, self.routes)
+        self.fixtures = self.routes['fixtures/']['fixtures']
+
+    def tearDown(self):
+        self.connector.close()
+
+    def test_first_poll(self):
+        """Tests first poll fetches all fixtures and reports them as added"""
+
+        events = []
+        sync = FixtureSync(self.connector, leagues=['PL', 'BL1'], callback=events.append)
+        self.assertEqual(len(sync.poll()), len(self.fixtures))
+        self.assertEqual(len(events), len(self.fixtures))
+        self.assertTrue(all(event.kind == ADDED for event in events))
+        self.assertEqual(len(sync), len(self.fixtures))
+
+        query = parse_qs(urlsplit(self.adapter.requests[0].url).query)
+        self.assertEqual(query, {'league': ['PL,BL1']})
+
+    def test_changes(self):
+        """Tests later polls only fetch time frames and report changed fixtures"""
+
+        sync = FixtureSync(self.connector)
+        sync.poll()
+        self.assertEqual(sync.poll(), [])
+
+        self.fixtures[2]['status'] = 'IN_PLAY'
+        self.fixtures[2]['result'] = {'goalsHomeTeam': 1, 'goalsAwayTeam': 0}
+        requests_before = len(self.adapter.requests)
+        events = sync.poll()
+
+        self.assertEqual(len(events), 1)
+        event = events[0]
+        self.assertEqual(event.kind, CHANGED)
+        self.assertEqual(event.key, self.fixtures[2]['_links']['self']['href'])
+        self.assertEqual(event.fixture.status, 'IN_PLAY')
+        self.assertEqual(set(event.changes), {'status', 'result'})
+        self.assertEqual(event.changes['status'][1], 'IN_PLAY')
+
+        time_frames = [parse_qs(urlsplit(request.url).query)['timeFrame'][0]
+                       for request in self.adapter.requests[requests_before:]]
+        self.assertEqual(time_frames, ['p1', 'n1'])
+
+    def test_removed(self):
+        """Tests full polls report removed fixtures"""
+
+        sync = FixtureSync(self.connector, time_frames=('n7',))
+        sync.poll()
+        removed = self.fixtures.pop()
+
+        self.assertEqual(sync.poll(), [])
+        events = sync.poll(full=True)
+        self.assertEqual([event.kind for event in events], [REMOVED])
+        self.assertEqual(events[0].fixture.home_team_name, removed['homeTeamName'])
+        self.assertEqual(len(sync), len(self.fixtures))
+
+    def test_competition(self):
+        """Tests fixtures of a competition are synced from its endpoint"""
+
+        competition = self.connector.get_competitions()[0]
+        sync = FixtureSync(self.connector, competition=competition)
+        sync.poll()
+        self.assertTrue(self.adapter.requests[-1].url.startswith(competition.fixtures_endpoint))
+
+    def test_watch(self):
+        """Tests watch yields events of every poll"""
+
+        sync = FixtureSync(self.connector)
+        events = sync.watch(interval=0)
+        for _ in self.fixtures:
+            self.assertEqual(next(events).kind, ADDED)
+
+        self.fixtures[0]['odds'] = {'homeWin': 1.5}
+        event = next(events)
+        self.assertEqual(event.kind, CHANGED)
+        self.assertEqual(set(event.changes), {'odds'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+    tests.test_transport
+
+    Tests pluggable transports with record and replay.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from requests.exceptions import ConnectionError
+
+from footballdata import Connector
+from footballdata.cache import FileCache
+from footballdata.scheduler import RequestScheduler
+from footballdata.transport import HTTPTransport, RecordingTransport, ReplayTransport
+
+from . import fake_api
+
+
+class TestTransport(unittest.TestCase):
+    """Tests transports"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.recordings = os.path.join(self.directory, 'recordings')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def crawl(self, connector):
+        """Fetches competitions, teams and players, returns names of players of first team"""
+
+        with connector:
+            competition = connector.get_competitions()[0]
+            team = competition.get_teams()[0]
+            self.assertEqual(len(competition.get_fixtures()), 12)
+            return [player.name for player in team.get_players()]
+
+    def record(self):
+        """Records a crawl of the fake API, returns fake adapter"""
+
+        adapter = fake_api.FakeAPIAdapter()
+        self.crawl(Connector(api_key='secret-key', transport=RecordingTransport(self.recordings, adapter)))
+        return adapter
+
+    def test_default_transport(self):
+        """Tests connector sends calls through an HTTPTransport by default"""
+
+        with Connector(pool_size=3) as connector:
+            self.assertTrue(isinstance(connector.session.transport, HTTPTransport))
+            self.assertIs(connector.session.get_adapter(fake_api.BASE_URL), connector.session.transport)
+            self.assertIsNone(connector.session.scheduler)
+        with Connector(scheduler=True) as connector:
+            self.assertTrue(isinstance(connector.session.scheduler, RequestScheduler))
+
+    def test_record_and_replay(self):
+        """Tests recorded responses are replayed without network access"""
+
+        adapter = self.record()
+        self.assertEqual(len(os.listdir(self.recordings)), len(adapter.requests))
+        for name in os.listdir(self.recordings):
+            with open(os.path.join(self.recordings, name), encoding='utf-8') as recording:
+                self.assertNotIn('secret-key', recording.read())
+
+        transport = ReplayTransport(self.recordings)
+        connector = Connector(transport=transport, scheduler=True)
+        self.assertIsNone(connector.session.scheduler)
+        self.assertEqual(self.crawl(connector), ['Player 1', 'Player 2'])
+        self.assertEqual(transport.served, len(adapter.requests))
+
+    def test_replay_latency(self):
+        """Tests replayed responses are delayed by simulated latency"""
+
+        self.record()
+        start = time.monotonic()
+        self.crawl(Connector(transport=ReplayTransport(self.recordings, latency=(0.02, 0.03))))
+        self.assertGreaterEqual(time.monotonic() - start, 4 * 0.02)
+
+    def test_replay_revalidation(self):
+        """Tests replay answers conditional requests with matching ETag with 304"""
+
+        self.record()
+        cache = FileCache(os.path.join(self.directory, 'cache'), ttl=0)
+        self.crawl(Connector(cache=cache, transport=ReplayTransport(self.recordings)))
+
+        statuses = []
+
+        class StatusReplayTransport(ReplayTransport):
+            def send(self, request, **kwargs):
+                response = super().send(request, **kwargs)
+                statuses.append(response.status_code)
+                return response
+
+        with Connector(cache=cache, transport=StatusReplayTransport(self.recordings)) as connector:
+            self.assertEqual(len(connector.get_competitions()), 1)
+        self.assertEqual(statuses, [304])
+
+    def test_missing_recording(self):
+        """Tests calls without recorded response fail"""
+
+        with Connector(transport=ReplayTransport(self.recordings)) as connector:
+            with self.assertRaises(ConnectionError):
+                len(connector.get_fixtures())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+    tests.test_utils
+
+    Tests helpers used to clean data returned from API.
+
+    :copyright: (c) 2018 Tony Joseph
+    :license: BSD 3-Clause
+"""
+
+import datetime
+import unittest
+
+from dateutil.parser import parse as dateutil_parse
+
+from footballdata.datasets import Fixture, Player, Team
+from footballdata.utils import parse_datetime, clean_object, camel_to_snake
+
+from . import fake_api
+
+
+class TestParseDatetime(unittest.TestCase):
+    """Tests parse_datetime"""
+
+    def test_api_formats(self):
+        """Tests formats returned by API match dateutil results"""
+
+        for value in ['2017-08-11T18:45:00Z', '2017-08-11T18:45:00', '1990-11-07', '2017-08-11T18:45:00+01:00']:
+            self.assertEqual(parse_datetime(value), dateutil_parse(value))
+        self.assertEqual(parse_datetime('2017-08-11T18:45:00Z').tzinfo, datetime.timezone.utc)
+
+    def test_fallback(self):
+        """Tests unexpected formats are parsed by dateutil"""
+
+        self.assertEqual(parse_datetime('11 Aug 2017 18:45'), datetime.datetime(2017, 8, 11, 18, 45))
+
+
+class TestCleanObject(unittest.TestCase):
+    """Tests clean_object"""
+
+    def test_keys(self):
+        """Tests keys are converted to snake case without leading underscore"""
+
+        self.assertEqual(camel_to_snake('goalsAgainst'), 'goals_against')
+        self.assertEqual(camel_to_snake('crestURI'), 'crest_uri')
+        cleaned = clean_object({'_links': {}, 'homeTeamName': 'Arsenal FC', 'crestURI': ''})
+        self.assertEqual(sorted(cleaned), ['crest_uri', 'home_team_name', 'links'])
+
+    def test_translation_table(self):
+        """Tests converted keys are memoized in a translation table per class"""
+
+        self.assertIsNot(Fixture.key_map, Team.key_map)
+        key_map = {}
+        clean_object(fake_api.fixture_payload(1, 1, 2, 1), key_map)
+        self.assertEqual(key_map['homeTeamName'], 'home_team_name')
+        self.assertEqual(key_map['_links'], 'links')
+
+        # Keys present in table are not converted again
+        key_map['status'] = 'state'
+        self.assertEqual(clean_object({'status': 'FINISHED'}, key_map), {'state': 'FINISHED'})
+
+
+class TestLazyDates(unittest.TestCase):
+    """Tests dates of football data objects are parsed on first access"""
+
+    def test_fixture_date(self):
+        """Tests fixture date is parsed on access"""
+
+        fixture = Fixture(**clean_object(fake_api.fixture_payload(1, 1, 2, 1)))
+        self.assertEqual(fixture._date, '2017-08-11T18:45:00Z')
+        self.assertEqual(fixture.date, datetime.datetime(2017, 8, 11, 18, 45, tzinfo=datetime.timezone.utc))
+        self.assertTrue(isinstance(fixture._date, datetime.datetime))
+
+    def test_player_dates(self):
+        """Tests empty player dates stay empty"""
+
+        payload = fake_api.player_payload(1)
+        payload['contractUntil'] = None
+        player = Player(**clean_object(payload))
+        self.assertEqual(player.date_of_birth, datetime.datetime(1990, 11, 7))
+        self.assertIsNone(player.contract_until)